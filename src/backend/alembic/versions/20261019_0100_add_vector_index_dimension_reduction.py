@@ -0,0 +1,28 @@
+"""Add dimension reduction columns to vector_indices
+
+Revision ID: 002_vector_index_dimensions
+Revises: 001_graph_rag_v2
+Create Date: 2026-10-19 01:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002_vector_index_dimensions'
+down_revision = '001_graph_rag_v2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 임베딩 차원 축소 방식 기록 (None | "native" | "pca")
+    op.add_column('vector_indices', sa.Column('source_dimension', sa.Integer(), nullable=True))
+    op.add_column('vector_indices', sa.Column('dimension_reduction', sa.String(length=16), nullable=True))
+    op.add_column('vector_indices', sa.Column('projection_uri', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('vector_indices', 'projection_uri')
+    op.drop_column('vector_indices', 'dimension_reduction')
+    op.drop_column('vector_indices', 'source_dimension')
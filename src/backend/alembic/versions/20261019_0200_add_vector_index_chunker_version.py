@@ -0,0 +1,31 @@
+"""Add chunker_version to vector_indices for snapshot reuse
+
+Revision ID: 003_vector_index_reuse
+Revises: 002_vector_index_dimensions
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_vector_index_reuse'
+down_revision = '002_vector_index_dimensions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('vector_indices', sa.Column('chunker_version', sa.String(length=32), nullable=True))
+
+    # (commit_hash, embedding_model, chunker_version) 재사용 조회용 인덱스
+    op.create_index(
+        'ix_vector_indices_reuse_key',
+        'vector_indices',
+        ['commit_hash', 'embedding_model', 'chunker_version']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vector_indices_reuse_key', table_name='vector_indices')
+    op.drop_column('vector_indices', 'chunker_version')
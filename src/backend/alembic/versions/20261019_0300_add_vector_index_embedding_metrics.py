@@ -0,0 +1,28 @@
+"""Add embedding_metrics to vector_indices
+
+Revision ID: 004_vector_index_metrics
+Revises: 003_vector_index_reuse
+Create Date: 2026-10-19 03:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '004_vector_index_metrics'
+down_revision = '003_vector_index_reuse'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 임베딩 run 지표 (요청 수, 배치 크기, 토큰, 캐시 히트, p50/p95 지연, 예상 비용)
+    op.add_column(
+        'vector_indices',
+        sa.Column('embedding_metrics', postgresql.JSON(astext_type=sa.Text()), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('vector_indices', 'embedding_metrics')
@@ -1,4 +1,5 @@
 from .base import IVectorService
 from .local_service import LocalVectorService
+from .hnsw_service import HNSWVectorService
 
-__all__ = ["IVectorService", "LocalVectorService"]
+__all__ = ["IVectorService", "LocalVectorService", "HNSWVectorService"]
@@ -49,6 +49,53 @@ class IVectorService(ABC):
         """
         pass
 
+    @abstractmethod
+    async def batch_search(
+        self,
+        query_vectors: List[np.ndarray],
+        k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        index_name: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """다중 쿼리 벡터 배치 검색 (k-NN)
+
+        Args:
+            query_vectors: 쿼리 벡터 리스트
+            k: 쿼리당 반환할 결과 수
+            filter_dict: 공통 메타데이터 필터
+            index_name: 검색할 인덱스 이름
+
+        Returns:
+            query_vectors 순서와 정렬된 검색 결과 리스트
+        """
+        pass
+
+    @abstractmethod
+    async def search_similar(
+        self,
+        doc_id: Optional[str] = None,
+        file_path: Optional[str] = None,
+        k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        index_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """저장된 벡터 기반 유사도 검색 ("more like this")
+
+        쿼리 임베딩 없이 인덱스에 저장된 청크 벡터(doc_id) 또는
+        파일 청크 벡터들의 centroid(file_path)로 k-NN 검색하며, 자기 자신은 제외합니다.
+
+        Args:
+            doc_id: 기준 청크 문서 ID
+            file_path: 기준 파일 경로 (doc_id가 없을 때 사용)
+            k: 반환할 결과 수
+            filter_dict: 메타데이터 필터 (기준 벡터 조회에도 적용)
+            index_name: 검색할 인덱스 이름
+
+        Returns:
+            검색 결과 리스트 (각 결과는 score, metadata 포함)
+        """
+        pass
+
     @abstractmethod
     async def delete_by_analysis_id(
         self,
@@ -66,6 +113,21 @@ class IVectorService(ABC):
         """
         pass
 
+    @abstractmethod
+    async def drop_index(self, index_name: str) -> bool:
+        """인덱스(스냅샷) 전체 삭제
+
+        per-snapshot 인덱스 레이아웃에서는 문서 단위 delete_by_query 대신
+        이전 스냅샷 인덱스를 통째로 삭제합니다.
+
+        Args:
+            index_name: 삭제할 인덱스 이름
+
+        Returns:
+            삭제 여부 (인덱스가 없으면 False)
+        """
+        pass
+
     @abstractmethod
     async def create_index(
         self,
@@ -0,0 +1,613 @@
+import asyncio
+import heapq
+import json
+import math
+import shutil
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Callable
+
+import numpy as np
+
+from .base import IVectorService
+
+
+# IVectorService metric 이름 → 내부 metric (OpenSearch space_type 별칭 포함)
+METRIC_ALIASES = {
+    "cosine": "cosine",
+    "cosinesimil": "cosine",
+    "dot_product": "dot_product",
+    "innerproduct": "dot_product",
+    "euclidean": "euclidean",
+    "l2": "euclidean",
+}
+
+
+class HNSWIndex:
+    """numpy 기반 HNSW(Hierarchical Navigable Small World) 그래프
+
+    점수는 항상 "클수록 유사" 기준:
+    - cosine: 정규화 벡터 내적
+    - dot_product: 내적
+    - euclidean: -(L2 거리 제곱)
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        metric: str = "cosine",
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        seed: int = 42
+    ):
+        if metric not in METRIC_ALIASES:
+            raise ValueError(f"Unsupported metric: {metric}")
+
+        self.dimension = dimension
+        self.metric = METRIC_ALIASES[metric]
+        self.m = m
+        self.m0 = m * 2
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.level_mult = 1 / math.log(m)
+        self._rng = np.random.default_rng(seed)
+
+        self.vectors = np.zeros((0, dimension), dtype=np.float32)
+        self.count = 0
+        self.levels: List[int] = []
+        # graph[node][level] = 이웃 노드 ID 리스트
+        self.graph: List[List[List[int]]] = []
+        self.deleted: set = set()
+        self.entry_point: Optional[int] = None
+        self.max_level = -1
+
+    # ------------------------------------------------------------------
+    # 점수 계산
+    # ------------------------------------------------------------------
+
+    def _prepare(self, vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dimension:
+            raise ValueError(f"Vector dimension mismatch: {vector.shape[0]} != {self.dimension}")
+        if self.metric == "cosine":
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector = vector / norm
+        return vector
+
+    def _scores(self, query: np.ndarray, ids: List[int]) -> np.ndarray:
+        candidates = self.vectors[ids]
+        if self.metric == "euclidean":
+            diff = candidates - query
+            return -np.einsum("ij,ij->i", diff, diff)
+        return candidates @ query
+
+    # ------------------------------------------------------------------
+    # 삽입
+    # ------------------------------------------------------------------
+
+    def _ensure_capacity(self, extra: int):
+        needed = self.count + extra
+        if needed <= self.vectors.shape[0]:
+            return
+        capacity = max(needed, self.vectors.shape[0] * 2, 64)
+        grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+        grown[:self.count] = self.vectors[:self.count]
+        self.vectors = grown
+
+    def add(self, vector: np.ndarray) -> int:
+        """벡터 삽입 후 노드 ID 반환"""
+        vector = self._prepare(vector)
+        self._ensure_capacity(1)
+
+        node = self.count
+        self.vectors[node] = vector
+        self.count += 1
+
+        level = int(-math.log(max(self._rng.random(), 1e-12)) * self.level_mult)
+        self.levels.append(level)
+        self.graph.append([[] for _ in range(level + 1)])
+
+        if self.entry_point is None:
+            self.entry_point = node
+            self.max_level = level
+            return node
+
+        # 상위 레벨: greedy 탐색으로 진입점만 좁힘
+        entry = self.entry_point
+        for lvl in range(self.max_level, level, -1):
+            entry = self._search_layer(vector, [entry], 1, lvl)[0][1]
+
+        # 하위 레벨: ef_construction 후보에서 이웃 선택 후 양방향 연결
+        entries = [entry]
+        for lvl in range(min(level, self.max_level), -1, -1):
+            candidates = self._search_layer(vector, entries, self.ef_construction, lvl)
+            max_links = self.m0 if lvl == 0 else self.m
+            neighbors = [candidate for _, candidate in candidates[:max_links]]
+            self.graph[node][lvl] = neighbors
+
+            for neighbor in neighbors:
+                links = self.graph[neighbor][lvl]
+                links.append(node)
+                if len(links) > max_links:
+                    scores = self._scores(self.vectors[neighbor], links)
+                    keep = np.argsort(-scores)[:max_links]
+                    self.graph[neighbor][lvl] = [links[i] for i in keep]
+
+            entries = [candidate for _, candidate in candidates]
+
+        if level > self.max_level:
+            self.entry_point = node
+            self.max_level = level
+
+        return node
+
+    # ------------------------------------------------------------------
+    # 탐색
+    # ------------------------------------------------------------------
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entries: List[int],
+        ef: int,
+        level: int,
+        accept: Optional[Callable[[int], bool]] = None
+    ) -> List[tuple]:
+        """단일 레벨 best-first 탐색
+
+        accept가 주어지면 조건을 만족하는 노드만 결과에 포함하되,
+        그래프 탐색은 모든 노드를 경유합니다 (필터를 탐색 중에 적용).
+
+        Returns:
+            [(score, node), ...] 점수 내림차순
+        """
+        visited = set(entries)
+        entry_scores = self._scores(query, entries)
+
+        candidates = []   # max-heap (음수 점수)
+        results = []      # min-heap (점수)
+        for score, node in zip(entry_scores.tolist(), entries):
+            heapq.heappush(candidates, (-score, node))
+            if accept is None or accept(node):
+                heapq.heappush(results, (score, node))
+
+        while candidates:
+            neg_score, node = heapq.heappop(candidates)
+            if len(results) >= ef and -neg_score < results[0][0]:
+                break
+
+            links = self.graph[node][level] if level < len(self.graph[node]) else []
+            fresh = [neighbor for neighbor in links if neighbor not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+
+            for score, neighbor in zip(self._scores(query, fresh).tolist(), fresh):
+                if len(results) < ef or score > results[0][0]:
+                    heapq.heappush(candidates, (-score, neighbor))
+                    if accept is None or accept(neighbor):
+                        heapq.heappush(results, (score, neighbor))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        accept: Optional[Callable[[int], bool]] = None,
+        ef: Optional[int] = None
+    ) -> List[tuple]:
+        """k-NN 검색
+
+        Args:
+            query: 쿼리 벡터
+            k: 반환할 결과 수
+            accept: 노드 필터 (삭제 노드는 항상 제외)
+            ef: 탐색 후보 수 (None이면 max(ef_search, k))
+
+        Returns:
+            [(score, node), ...] 점수 내림차순
+        """
+        if self.entry_point is None:
+            return []
+
+        query = self._prepare(query)
+        ef = max(ef or self.ef_search, k)
+
+        def is_live(node: int) -> bool:
+            return node not in self.deleted and (accept is None or accept(node))
+
+        entry = self.entry_point
+        for lvl in range(self.max_level, 0, -1):
+            entry = self._search_layer(query, [entry], 1, lvl)[0][1]
+
+        return self._search_layer(query, [entry], ef, 0, accept=is_live)[:k]
+
+    def brute_force(self, query: np.ndarray, ids: List[int], k: int) -> List[tuple]:
+        """소수 후보에 대한 정확 검색 (선택도가 높은 필터용)"""
+        ids = [node for node in ids if node not in self.deleted]
+        if not ids:
+            return []
+        scores = self._scores(self._prepare(query), ids)
+        top = np.argsort(-scores)[:k]
+        return [(float(scores[i]), ids[i]) for i in top]
+
+    # ------------------------------------------------------------------
+    # 영속화
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path):
+        """npz(벡터 + CSR 인접 리스트) + JSON(파라미터)으로 저장"""
+        path.mkdir(parents=True, exist_ok=True)
+
+        indptr = [0]
+        indices: List[int] = []
+        for node in range(self.count):
+            for lvl in range(self.levels[node] + 1):
+                indices.extend(self.graph[node][lvl])
+                indptr.append(len(indices))
+
+        np.savez(
+            path / "hnsw.npz",
+            vectors=self.vectors[:self.count],
+            levels=np.asarray(self.levels, dtype=np.int32),
+            indptr=np.asarray(indptr, dtype=np.int64),
+            indices=np.asarray(indices, dtype=np.int32),
+            deleted=np.asarray(sorted(self.deleted), dtype=np.int64)
+        )
+        with open(path / "hnsw.json", "w") as f:
+            json.dump({
+                "dimension": self.dimension,
+                "metric": self.metric,
+                "m": self.m,
+                "ef_construction": self.ef_construction,
+                "ef_search": self.ef_search,
+                "entry_point": self.entry_point,
+                "max_level": self.max_level
+            }, f)
+
+    @classmethod
+    def load(cls, path: Path) -> "HNSWIndex":
+        with open(path / "hnsw.json") as f:
+            params = json.load(f)
+
+        index = cls(
+            dimension=params["dimension"],
+            metric=params["metric"],
+            m=params["m"],
+            ef_construction=params["ef_construction"],
+            ef_search=params["ef_search"]
+        )
+
+        data = np.load(path / "hnsw.npz")
+        index.vectors = np.array(data["vectors"], dtype=np.float32)
+        index.count = index.vectors.shape[0]
+        index.levels = data["levels"].tolist()
+        index.deleted = set(data["deleted"].tolist())
+
+        indptr = data["indptr"]
+        indices = data["indices"].tolist()
+        position = 0
+        for node in range(index.count):
+            node_links = []
+            for _ in range(index.levels[node] + 1):
+                node_links.append(indices[indptr[position]:indptr[position + 1]])
+                position += 1
+            index.graph.append(node_links)
+
+        index.entry_point = params["entry_point"]
+        index.max_level = params["max_level"]
+        return index
+
+
+class HNSWVectorService(IVectorService):
+    """프로세스 내 HNSW 벡터 서비스
+
+    OpenSearch 클러스터 없이 단일 저장소 분석/테스트/벤치마크를 수행하기 위한 구현체.
+    인덱스(스냅샷)별로 storage_dir/{index_name}/ 에 저장하고 필요 시 로드합니다.
+    """
+
+    # 필터 통과 노드가 이 비율 이하이면 그래프 탐색 대신 정확 검색
+    BRUTE_FORCE_FILTER_RATIO = 0.05
+
+    def __init__(
+        self,
+        storage_dir: str,
+        default_index: str = "code_embeddings",
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64
+    ):
+        """
+        Args:
+            storage_dir: 인덱스 저장 디렉토리
+            default_index: 기본 인덱스 이름
+            m: 노드당 최대 연결 수 (레벨 0은 2*m)
+            ef_construction: 삽입 시 후보 수
+            ef_search: 검색 시 후보 수
+        """
+        self.storage_dir = Path(storage_dir)
+        self.default_index = default_index
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+
+        # index_name → {"hnsw": HNSWIndex, "metadata": [...], "ids": {doc_id: node}}
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+
+    def _index_path(self, index_name: str) -> Path:
+        return self.storage_dir / index_name
+
+    def _get_index(self, index_name: str) -> Optional[Dict[str, Any]]:
+        """메모리에 없으면 디스크에서 로드"""
+        if index_name in self._indexes:
+            return self._indexes[index_name]
+
+        path = self._index_path(index_name)
+        if not (path / "hnsw.json").exists():
+            return None
+
+        with open(path / "metadata.json") as f:
+            metadata = json.load(f)
+
+        entry = {
+            "hnsw": HNSWIndex.load(path),
+            "metadata": metadata,
+            "ids": {meta.get("id"): node for node, meta in enumerate(metadata) if meta.get("id")}
+        }
+        self._indexes[index_name] = entry
+        return entry
+
+    def _persist(self, index_name: str):
+        entry = self._indexes[index_name]
+        path = self._index_path(index_name)
+        entry["hnsw"].save(path)
+        with open(path / "metadata.json", "w") as f:
+            json.dump(entry["metadata"], f)
+
+    def _create(self, index_name: str, dimension: int, metric: str) -> Dict[str, Any]:
+        entry = {
+            "hnsw": HNSWIndex(
+                dimension=dimension,
+                metric=metric,
+                m=self.m,
+                ef_construction=self.ef_construction,
+                ef_search=self.ef_search
+            ),
+            "metadata": [],
+            "ids": {}
+        }
+        self._indexes[index_name] = entry
+        return entry
+
+    @staticmethod
+    def _matches(meta: Dict[str, Any], filter_dict: Dict[str, Any]) -> bool:
+        for key, value in filter_dict.items():
+            if isinstance(value, (list, tuple, set)):
+                if meta.get(key) not in value:
+                    return False
+            elif meta.get(key) != value:
+                return False
+        return True
+
+    def _index_sync(self, embeddings, metadata, index_name) -> int:
+        entry = self._get_index(index_name)
+        dimension = entry["hnsw"].dimension if entry is not None else len(np.asarray(embeddings[0]).reshape(-1))
+
+        # 그래프를 수정하기 전에 전체 배치 검증 (거부된 배치가 인덱스를 일부만 바꾸지 않도록)
+        for i, embedding in enumerate(embeddings):
+            size = np.asarray(embedding).reshape(-1).shape[0]
+            if size != dimension:
+                raise ValueError(f"Vector dimension mismatch at {i}: {size} != {dimension}")
+
+        if entry is None:
+            entry = self._create(index_name, dimension, "cosine")
+        hnsw = entry["hnsw"]
+
+        for i, (embedding, meta) in enumerate(zip(embeddings, metadata)):
+            doc_id = meta.get("id", f"{meta.get('analysis_id')}_{i}")
+
+            # 같은 ID 재인덱싱 시 기존 노드는 tombstone 처리
+            previous = entry["ids"].get(doc_id)
+            if previous is not None:
+                hnsw.deleted.add(previous)
+
+            node = hnsw.add(embedding)
+            entry["metadata"].append({**meta, "id": doc_id})
+            entry["ids"][doc_id] = node
+
+        self._persist(index_name)
+        return len(embeddings)
+
+    def _search_sync(self, query_vector, k, filter_dict, index_name) -> List[Dict[str, Any]]:
+        entry = self._get_index(index_name)
+        if entry is None:
+            return []
+
+        hnsw = entry["hnsw"]
+        metadata = entry["metadata"]
+
+        if filter_dict:
+            matching = [node for node, meta in enumerate(metadata) if self._matches(meta, filter_dict)]
+            if len(matching) <= max(k, hnsw.count * self.BRUTE_FORCE_FILTER_RATIO):
+                hits = hnsw.brute_force(query_vector, matching, k)
+            else:
+                allowed = set(matching)
+                hits = hnsw.search(query_vector, k, accept=allowed.__contains__)
+        else:
+            hits = hnsw.search(query_vector, k)
+
+        return [
+            {
+                "id": metadata[node].get("id"),
+                "score": score,
+                "metadata": metadata[node],
+                "vector": hnsw.vectors[node].tolist()
+            }
+            for score, node in hits
+        ]
+
+    def _search_similar_sync(self, doc_id, file_path, k, filter_dict, index_name) -> List[Dict[str, Any]]:
+        entry = self._get_index(index_name)
+        if entry is None:
+            return []
+
+        hnsw = entry["hnsw"]
+        metadata = entry["metadata"]
+
+        if doc_id:
+            node = entry["ids"].get(doc_id)
+            if node is None or node in hnsw.deleted:
+                raise ValueError(f"No stored vector for document: {doc_id}")
+            excluded = {node}
+            query_vector = hnsw.vectors[node]
+        elif file_path:
+            excluded = {node for node, meta in enumerate(metadata) if meta.get("file_path") == file_path}
+            live = [
+                node for node in sorted(excluded)
+                if node not in hnsw.deleted and (not filter_dict or self._matches(metadata[node], filter_dict))
+            ]
+            if not live:
+                raise ValueError(f"No stored vectors for file: {file_path}")
+            matrix = hnsw.vectors[live]
+            matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+            query_vector = matrix.mean(axis=0)
+        else:
+            raise ValueError("doc_id 또는 file_path가 필요합니다")
+
+        def accept(node: int) -> bool:
+            return node not in excluded and (not filter_dict or self._matches(metadata[node], filter_dict))
+
+        hits = hnsw.search(query_vector, k, accept=accept)
+        return [
+            {
+                "id": metadata[node].get("id"),
+                "score": score,
+                "metadata": metadata[node],
+                "vector": hnsw.vectors[node].tolist()
+            }
+            for score, node in hits
+        ]
+
+    def _delete_sync(self, analysis_id, index_name) -> int:
+        entry = self._get_index(index_name)
+        if entry is None:
+            return 0
+
+        hnsw = entry["hnsw"]
+        deleted = 0
+        for node, meta in enumerate(entry["metadata"]):
+            if meta.get("analysis_id") == analysis_id and node not in hnsw.deleted:
+                hnsw.deleted.add(node)
+                deleted += 1
+
+        if deleted:
+            self._persist(index_name)
+        return deleted
+
+    async def index_embeddings(
+        self,
+        embeddings: List[np.ndarray],
+        metadata: List[Dict[str, Any]],
+        index_name: Optional[str] = None
+    ) -> int:
+        """임베딩 벡터를 HNSW 그래프에 삽입 후 디스크에 저장"""
+        if not embeddings or len(embeddings) != len(metadata):
+            raise ValueError("embeddings와 metadata 길이가 일치해야 합니다")
+
+        async with self._lock:
+            return await asyncio.to_thread(
+                self._index_sync, embeddings, metadata, index_name or self.default_index
+            )
+
+    async def search(
+        self,
+        query_vector: np.ndarray,
+        k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        index_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """k-NN 벡터 검색 (메타데이터 필터는 그래프 탐색 중에 적용)"""
+        return await asyncio.to_thread(
+            self._search_sync, query_vector, k, filter_dict, index_name or self.default_index
+        )
+
+    async def batch_search(
+        self,
+        query_vectors: List[np.ndarray],
+        k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        index_name: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """다중 쿼리 k-NN 검색 (스레드 전환 1회로 순차 처리)"""
+        index = index_name or self.default_index
+
+        def run() -> List[List[Dict[str, Any]]]:
+            return [self._search_sync(query_vector, k, filter_dict, index) for query_vector in query_vectors]
+
+        return await asyncio.to_thread(run)
+
+    async def search_similar(
+        self,
+        doc_id: Optional[str] = None,
+        file_path: Optional[str] = None,
+        k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        index_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """저장된 벡터(청크 또는 파일 centroid) 기반 k-NN 검색, 자기 자신 제외"""
+        return await asyncio.to_thread(
+            self._search_similar_sync, doc_id, file_path, k, filter_dict,
+            index_name or self.default_index
+        )
+
+    async def delete_by_analysis_id(
+        self,
+        analysis_id: str,
+        index_name: Optional[str] = None
+    ) -> int:
+        """특정 분석 ID의 모든 벡터 삭제 (tombstone)"""
+        async with self._lock:
+            return await asyncio.to_thread(
+                self._delete_sync, analysis_id, index_name or self.default_index
+            )
+
+    async def drop_index(self, index_name: str) -> bool:
+        """인덱스(스냅샷) 전체 삭제 (메모리 + 디스크)"""
+        async with self._lock:
+            self._indexes.pop(index_name, None)
+            path = self._index_path(index_name)
+            if not path.exists():
+                return False
+            await asyncio.to_thread(shutil.rmtree, path)
+            return True
+
+    async def create_index(
+        self,
+        index_name: str,
+        dimension: int,
+        metric: str = "cosine"
+    ) -> bool:
+        """벡터 인덱스 생성"""
+        async with self._lock:
+            if self._get_index(index_name) is not None:
+                return True  # 이미 존재하는 경우 성공으로 처리
+            self._create(index_name, dimension, metric)
+            await asyncio.to_thread(self._persist, index_name)
+            return True
+
+    async def check_health(self) -> bool:
+        """저장 디렉토리 접근 가능 여부 확인"""
+        try:
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
+            return True
+        except OSError:
+            return False
+
+    async def close(self):
+        """메모리에 로드된 인덱스 해제"""
+        self._indexes.clear()
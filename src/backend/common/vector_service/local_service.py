@@ -6,6 +6,14 @@ from opensearchpy.exceptions import NotFoundError, RequestError
 from .base import IVectorService
 
 
+# IVectorService metric 이름 → OpenSearch space_type
+SPACE_TYPES = {
+    "cosine": "cosinesimil",
+    "euclidean": "l2",
+    "dot_product": "innerproduct",
+}
+
+
 class LocalVectorService(IVectorService):
     """로컬 OpenSearch 벡터 서비스"""
 
@@ -28,6 +36,8 @@ class LocalVectorService(IVectorService):
         self.password = password
         self.default_index = default_index
         self._client = None
+        # 인덱스 → knn 절 filter 지원 여부 (nmslib 엔진 인덱스는 미지원)
+        self._knn_filter_support: Dict[str, bool] = {}
 
     def _get_client(self):
         """OpenSearch 클라이언트 Lazy 초기화"""
@@ -75,57 +85,219 @@ class LocalVectorService(IVectorService):
         indexed_count = sum(1 for item in response["items"] if item["index"]["status"] == 201)
         return indexed_count
 
-    async def search(
-        self,
+    async def _supports_knn_filter(self, index: str) -> bool:
+        """인덱스 vector 필드 엔진이 knn 절 filter를 지원하는지 (lucene/faiss)
+
+        이전에 생성된 nmslib 인덱스는 knn.filter를 거부하므로 매핑에서 엔진을 확인합니다.
+        """
+        if index in self._knn_filter_support:
+            return self._knn_filter_support[index]
+
+        try:
+            mappings = await self._get_client().indices.get_mapping(index=index)
+        except Exception as e:
+            # 판단 불가: 모든 엔진에서 동작하는 후처리 필터 사용 (캐싱하지 않음)
+            print(f"⚠️  Failed to read mapping for {index}: {e}")
+            return False
+
+        supported = True
+        for mapping in mappings.values():
+            vector_field = mapping.get("mappings", {}).get("properties", {}).get("vector", {})
+            engine = vector_field.get("method", {}).get("engine", "nmslib")
+            if engine not in ("lucene", "faiss"):
+                supported = False
+
+        if not supported:
+            print(f"⚠️  Index {index} uses the nmslib engine: metadata filters are applied after k-NN "
+                  f"(may return fewer than k hits). Recreate it as a lucene index for filtered k-NN.")
+        self._knn_filter_support[index] = supported
+        return supported
+
+    @staticmethod
+    def _build_knn_query(
         query_vector: np.ndarray,
-        k: int = 5,
+        k: int,
         filter_dict: Optional[Dict[str, Any]] = None,
-        index_name: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        """k-NN 벡터 검색"""
-        index = index_name or self.default_index
-        client = self._get_client()
+        must_not: Optional[List[Dict[str, Any]]] = None,
+        efficient_filter: bool = True
+    ) -> Dict[str, Any]:
+        """k-NN 검색 바디 구성
 
-        # k-NN 쿼리 구성
-        query_body = {
-            "size": k,
-            "query": {
-                "knn": {
-                    "vector": {
-                        "vector": query_vector.tolist(),
-                        "k": k
+        filter_dict는 knn 절의 filter로 전달되어 lucene/faiss 엔진이 그래프 탐색 중에 적용합니다.
+        전역 top-k 이후 후처리 필터링이 아니므로 필터 범위 내에서 정확히 k개를 반환합니다.
+        efficient_filter=False (nmslib 인덱스)면 knn을 bool 쿼리로 감싸 후처리 필터링합니다.
+        """
+        knn = {"vector": query_vector.tolist(), "k": k}
+
+        if (filter_dict or must_not) and not efficient_filter:
+            return {
+                "size": k,
+                "query": {
+                    "bool": {
+                        "must": [{"knn": {"vector": knn}}],
+                        "filter": LocalVectorService._term_filters(filter_dict),
+                        "must_not": must_not or []
                     }
                 }
             }
-        }
 
-        # 필터 추가
-        if filter_dict:
-            query_body["query"] = {
+        if filter_dict or must_not:
+            knn["filter"] = {
                 "bool": {
-                    "must": [
-                        {"knn": {"vector": {"vector": query_vector.tolist(), "k": k}}}
-                    ],
-                    "filter": [
-                        {"term": {f"metadata.{key}": value}}
-                        for key, value in filter_dict.items()
-                    ]
+                    "filter": LocalVectorService._term_filters(filter_dict),
+                    "must_not": must_not or []
                 }
             }
 
-        response = await client.search(index=index, body=query_body)
+        return {"size": k, "query": {"knn": {"vector": knn}}}
+
+    @staticmethod
+    def _term_filters(filter_dict: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """메타데이터 필터 → term/terms 절 (값이 리스트이면 terms)"""
+        return [
+            {"terms": {f"metadata.{key}": list(value)}}
+            if isinstance(value, (list, tuple, set))
+            else {"term": {f"metadata.{key}": value}}
+            for key, value in (filter_dict or {}).items()
+        ]
 
-        # 결과 변환
+    @staticmethod
+    def _to_results(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """OpenSearch 응답 → 검색 결과 리스트"""
         results = []
         for hit in response["hits"]["hits"]:
             results.append({
+                "id": hit.get("_id"),
                 "score": hit["_score"],
                 "metadata": hit["_source"]["metadata"],
                 "vector": hit["_source"]["vector"]
             })
+        return results
+
+    async def search(
+        self,
+        query_vector: np.ndarray,
+        k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        index_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """k-NN 벡터 검색"""
+        index = index_name or self.default_index
+        client = self._get_client()
+
+        # k-NN 쿼리 구성 (필터는 k-NN 탐색 내부에서 적용)
+        query_body = self._build_knn_query(
+            query_vector, k, filter_dict, efficient_filter=await self._supports_knn_filter(index)
+        )
+
+        response = await client.search(index=index, body=query_body)
+        return self._to_results(response)
+
+    async def batch_search(
+        self,
+        query_vectors: List[np.ndarray],
+        k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        index_name: Optional[str] = None,
+        batch_size: int = 100
+    ) -> List[List[Dict[str, Any]]]:
+        """다중 쿼리 k-NN 검색 (batch_size 단위 _msearch, 개별 실패는 빈 결과)"""
+        index = index_name or self.default_index
+        client = self._get_client()
+
+        efficient_filter = await self._supports_knn_filter(index)
+        results = []
+        for start in range(0, len(query_vectors), batch_size):
+            body = []
+            for query_vector in query_vectors[start:start + batch_size]:
+                body.append({"index": index})
+                body.append(self._build_knn_query(
+                    np.asarray(query_vector), k, filter_dict, efficient_filter=efficient_filter
+                ))
+
+            response = await client.msearch(body=body)
+            for item in response["responses"]:
+                results.append([] if "error" in item else self._to_results(item))
 
         return results
 
+    async def search_similar(
+        self,
+        doc_id: Optional[str] = None,
+        file_path: Optional[str] = None,
+        k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        index_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """저장된 벡터(청크 또는 파일 centroid) 기반 k-NN 검색, 자기 자신 제외"""
+        index = index_name or self.default_index
+        client = self._get_client()
+
+        if doc_id:
+            document = await client.get(index=index, id=doc_id, _source_includes=["vector"])
+            query_vector = np.asarray(document["_source"]["vector"], dtype=np.float32)
+            must_not = [{"ids": {"values": [doc_id]}}]
+        elif file_path:
+            query_vector = await self._file_centroid(file_path, filter_dict, index)
+            must_not = [{"term": {"metadata.file_path": file_path}}]
+        else:
+            raise ValueError("doc_id 또는 file_path가 필요합니다")
+
+        query_body = self._build_knn_query(
+            query_vector, k, filter_dict, must_not=must_not,
+            efficient_filter=await self._supports_knn_filter(index)
+        )
+        response = await client.search(index=index, body=query_body)
+        return self._to_results(response)
+
+    async def _file_centroid(
+        self,
+        file_path: str,
+        filter_dict: Optional[Dict[str, Any]],
+        index: str,
+        page_size: int = 1000
+    ) -> np.ndarray:
+        """파일 청크 벡터들의 centroid (정규화 평균)
+
+        청크 수가 많아도 잘리지 않도록 scroll(_doc 정렬)로 페이지 단위로 읽습니다.
+        """
+        client = self._get_client()
+        total: Optional[np.ndarray] = None
+        count = 0
+
+        response = await client.search(index=index, scroll="1m", body={
+            "size": page_size,
+            "sort": ["_doc"],
+            "_source": ["vector"],
+            "query": {
+                "bool": {
+                    "filter": [{"term": {"metadata.file_path": file_path}}] + self._term_filters(filter_dict)
+                }
+            }
+        })
+        scroll_id = response.get("_scroll_id")
+        try:
+            while response["hits"]["hits"]:
+                matrix = np.asarray([hit["_source"]["vector"] for hit in response["hits"]["hits"]], dtype=np.float32)
+                matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+                total = matrix.sum(axis=0) if total is None else total + matrix.sum(axis=0)
+                count += len(matrix)
+
+                if len(matrix) < page_size or not scroll_id:
+                    break
+                response = await client.scroll(scroll_id=scroll_id, scroll="1m")
+                scroll_id = response.get("_scroll_id", scroll_id)
+        finally:
+            if scroll_id:
+                try:
+                    await client.clear_scroll(scroll_id=scroll_id)
+                except Exception:
+                    pass
+
+        if total is None:
+            raise ValueError(f"No stored vectors for file: {file_path}")
+        return total / count
+
     async def delete_by_analysis_id(
         self,
         analysis_id: str,
@@ -146,6 +318,17 @@ class LocalVectorService(IVectorService):
         response = await client.delete_by_query(index=index, body=query_body)
         return response.get("deleted", 0)
 
+    async def drop_index(self, index_name: str) -> bool:
+        """인덱스(스냅샷) 전체 삭제"""
+        client = self._get_client()
+
+        if not await client.indices.exists(index=index_name):
+            return False
+
+        await client.indices.delete(index=index_name)
+        self._knn_filter_support.pop(index_name, None)
+        return True
+
     async def create_index(
         self,
         index_name: str,
@@ -159,19 +342,29 @@ class LocalVectorService(IVectorService):
         index_body = {
             "settings": {
                 "index": {
-                    "knn": True,
-                    "knn.algo_param.ef_search": 100
+                    "knn": True
                 }
             },
             "mappings": {
+                # metadata 문자열은 keyword로 매핑 (term 필터 정확 일치)
+                "dynamic_templates": [
+                    {
+                        "metadata_strings": {
+                            "path_match": "metadata.*",
+                            "match_mapping_type": "string",
+                            "mapping": {"type": "keyword", "ignore_above": 1024}
+                        }
+                    }
+                ],
                 "properties": {
                     "vector": {
                         "type": "knn_vector",
                         "dimension": dimension,
                         "method": {
                             "name": "hnsw",
-                            "space_type": metric,
-                            "engine": "nmslib",
+                            "space_type": SPACE_TYPES.get(metric, metric),
+                            # lucene 엔진: k-NN 그래프 탐색 중 필터 적용 (efficient filtering)
+                            "engine": "lucene",
                             "parameters": {
                                 "ef_construction": 128,
                                 "m": 24
@@ -187,6 +380,7 @@ class LocalVectorService(IVectorService):
 
         try:
             await client.indices.create(index=index_name, body=index_body)
+            self._knn_filter_support[index_name] = True
             return True
         except RequestError as e:
             if "resource_already_exists_exception" in str(e):
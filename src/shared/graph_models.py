@@ -81,6 +81,12 @@ class VectorIndex(Base):
     chunk_count = Column(Integer, default=0)
     embedding_dimension = Column(Integer, default=1536)  # OpenAI: 1536, Titan: 1024
     embedding_model = Column(String, nullable=False)  # "openai/text-embedding-3-large"
+    chunker_version = Column(String(32), nullable=True)  # code_chunker.CHUNKER_VERSION (재사용 판단)
+
+    # 차원 축소 (EMBEDDING_DIMENSIONS)
+    source_dimension = Column(Integer, nullable=True)  # 모델 원본 차원 (축소 시)
+    dimension_reduction = Column(String(16), nullable=True)  # None | "native" (provider 파라미터) | "pca"
+    projection_uri = Column(String, nullable=True)  # PCA 투영 저장 위치 (s3://... 또는 로컬 경로)
 
     # OpenSearch 설정
     opensearch_endpoint = Column(String, nullable=True)
@@ -89,6 +95,7 @@ class VectorIndex(Base):
     # 상태 관리
     is_valid = Column(Boolean, default=True)
     indexing_duration_seconds = Column(Integer, nullable=True)
+    embedding_metrics = Column(JSON, nullable=True)  # 요청/배치/토큰/캐시 히트/지연/비용 (EmbeddingMetrics)
 
     # 타임스탬프
     created_at = Column(DateTime(timezone=True), default=utc_now, index=True)
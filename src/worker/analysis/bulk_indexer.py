@@ -0,0 +1,278 @@
+"""
+Graph-RAG v2: 스트리밍 병렬 Bulk 인덱서
+
+전체 벡터를 하나의 bulk 바디로 만들면 클라이언트 메모리가 문서 수에 비례하고
+OpenSearch http.max_content_length(기본 100MB)를 초과하기 쉽습니다.
+
+Workflow:
+1. 인덱싱 동안 refresh_interval=-1, number_of_replicas=0 설정 (종료 후 원복 + refresh)
+   이미 refresh가 비활성화된 인덱스 (다른 적재 진행 중)는 설정을 건드리지 않음
+2. 문서를 하나씩 NDJSON 직렬화하여 max_chunk_bytes 단위 bulk 바디로 묶음
+3. bulk 요청을 thread_count개까지 동시에 전송 (in-flight 바디 수 제한 → 메모리 상한)
+4. 요청 단위 오류(429/타임아웃)는 청크 전체를, 항목 단위 실패(429 등)는 실패 항목만
+   묶은 sub-bulk를 지수 백오프로 재시도 (풀 스레드에서 실행, 수집 스레드는 대기하지 않음)
+"""
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+# 재시도 가능한 bulk 항목 상태 (too many requests / 일시적 서버 오류)
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+@dataclass
+class BulkIndexResult:
+    """Bulk 인덱싱 결과"""
+    indexed: int = 0
+    failed: int = 0
+    retried: int = 0
+    requests: int = 0
+    duration_seconds: float = 0.0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class StreamingBulkIndexer:
+    """
+    바이트 단위 청킹 + 병렬 bulk 요청 인덱서 (opensearch-py 동기 클라이언트)
+
+    Usage:
+        indexer = StreamingBulkIndexer(opensearch_client)
+        result = indexer.index(index_name, documents)  # documents: (doc_id, source) 이터레이터
+    """
+
+    def __init__(
+        self,
+        client,
+        max_chunk_bytes: int = 10 * 1024 * 1024,
+        max_chunk_docs: int = 2000,
+        thread_count: int = 4,
+        max_retries: int = 3,
+        base_delay: float = 1.0
+    ):
+        """
+        Args:
+            client: opensearchpy.OpenSearch
+            max_chunk_bytes: bulk 요청 바디 최대 크기 (bytes)
+            max_chunk_docs: bulk 요청당 최대 문서 수
+            thread_count: 동시에 전송할 bulk 요청 수
+            max_retries: 청크/실패 항목 sub-bulk 재시도 횟수
+            base_delay: 재시도 지수 백오프 기본 대기 시간 (초)
+        """
+        self.client = client
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_chunk_docs = max_chunk_docs
+        self.thread_count = thread_count
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+
+    # ------------------------------------------------------------------
+    # 직렬화
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _serialize(index_name: str, doc_id: str, source: Dict[str, Any]) -> bytes:
+        """bulk 액션 + 문서 NDJSON 2줄"""
+        action = json.dumps({"index": {"_index": index_name, "_id": doc_id}})
+        document = json.dumps(source, default=_json_default)
+        return f"{action}\n{document}\n".encode("utf-8")
+
+    def _iter_chunks(
+        self,
+        index_name: str,
+        documents: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> Iterable[List[Tuple[str, bytes]]]:
+        """문서를 max_chunk_bytes / max_chunk_docs 이내 청크로 묶음"""
+        chunk: List[Tuple[str, bytes]] = []
+        size = 0
+        for doc_id, source in documents:
+            line = self._serialize(index_name, doc_id, source)
+            if chunk and (size + len(line) > self.max_chunk_bytes or len(chunk) >= self.max_chunk_docs):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append((doc_id, line))
+            size += len(line)
+        if chunk:
+            yield chunk
+
+    # ------------------------------------------------------------------
+    # 인덱스 설정
+    # ------------------------------------------------------------------
+
+    def _prepare_index(self, index_name: str) -> Optional[Dict[str, Any]]:
+        """refresh/replica 비활성화, 원래 설정 반환
+
+        같은 인덱스에 대한 다른 적재가 이미 refresh를 끈 상태라면 그 값을 원래 설정으로
+        기록해 영구히 복원하지 않도록 설정을 변경하지 않고 None을 반환합니다.
+        """
+        settings = self.client.indices.get_settings(index=index_name)
+        current = next(iter(settings.values()))["settings"]["index"]
+        if str(current.get("refresh_interval")) == "-1":
+            print(f"ℹ️  Refresh already disabled on {index_name}, leaving index settings unchanged")
+            return None
+
+        original = {
+            "refresh_interval": current.get("refresh_interval", "1s"),
+            "number_of_replicas": current.get("number_of_replicas", "1"),
+        }
+        self.client.indices.put_settings(
+            index=index_name,
+            body={"index": {"refresh_interval": "-1", "number_of_replicas": 0}}
+        )
+        return original
+
+    def _restore_index(self, index_name: str, original: Optional[Dict[str, Any]]):
+        """설정 원복 + refresh (실패는 로그만 남겨 bulk 오류를 가리지 않음)"""
+        try:
+            if original is not None:
+                self.client.indices.put_settings(index=index_name, body={"index": original})
+            self.client.indices.refresh(index=index_name)
+        except Exception as e:
+            print(f"⚠️  Failed to restore index settings for {index_name}: {e}")
+
+    # ------------------------------------------------------------------
+    # 전송
+    # ------------------------------------------------------------------
+
+    def _send(self, chunk: List[Tuple[str, bytes]]) -> List[Tuple[str, bytes, Dict[str, Any]]]:
+        """bulk 요청 1회, 실패 항목 [(doc_id, line, item)] 반환"""
+        body = b"".join(line for _, line in chunk)
+        response = self.client.bulk(body=body)
+        if not response.get("errors"):
+            return []
+
+        failures = []
+        for (doc_id, line), item in zip(chunk, response["items"]):
+            result = item.get("index", {})
+            if result.get("status") not in (200, 201):
+                failures.append((doc_id, line, result))
+        return failures
+
+    @staticmethod
+    def _is_retryable_error(error: Exception) -> bool:
+        """요청 단위 예외의 재시도 가능 여부
+
+        opensearch-py TransportError는 status_code (연결 오류/타임아웃은 'N/A')를 가집니다.
+        """
+        status = getattr(error, "status_code", None)
+        if status in RETRYABLE_STATUSES or status == "N/A":
+            return True
+        return isinstance(error, (ConnectionError, TimeoutError))
+
+    def _process_chunk(self, chunk: List[Tuple[str, bytes]]) -> BulkIndexResult:
+        """청크 1개 전송 + 재시도 (풀 스레드에서 실행)
+
+        - 요청 단위 오류 (429 TransportError, ConnectionTimeout 등): 청크 전체를 백오프 후 재전송
+        - 항목 단위 재시도 가능 실패: 실패 항목만 묶은 sub-bulk를 백오프 후 재전송
+        - 재시도 불가/횟수 초과: 실패로 집계 (전체 로드는 계속 진행)
+        """
+        outcome = BulkIndexResult()
+        pending = chunk
+        attempt = 0
+
+        while True:
+            outcome.requests += 1
+            try:
+                failures = self._send(pending)
+            except Exception as e:
+                if not self._is_retryable_error(e) or attempt >= self.max_retries:
+                    outcome.failed += len(pending)
+                    if len(outcome.errors) < 20:
+                        outcome.errors.append({
+                            "id": pending[0][0],
+                            "documents": len(pending),
+                            "status": getattr(e, "status_code", None),
+                            "error": str(e)
+                        })
+                    return outcome
+                time.sleep(self.base_delay * (2 ** attempt))
+                attempt += 1
+                outcome.retried += len(pending)
+                continue
+
+            retryable = [(doc_id, line) for doc_id, line, item in failures if item.get("status") in RETRYABLE_STATUSES]
+            outcome.indexed += len(pending) - len(failures)
+
+            final_failures = failures if attempt >= self.max_retries else [
+                failure for failure in failures if failure[2].get("status") not in RETRYABLE_STATUSES
+            ]
+            outcome.failed += len(final_failures)
+            for doc_id, _, item in final_failures:
+                if len(outcome.errors) < 20:
+                    outcome.errors.append({"id": doc_id, "status": item.get("status"), "error": item.get("error")})
+
+            if not retryable or attempt >= self.max_retries:
+                return outcome
+
+            time.sleep(self.base_delay * (2 ** attempt))
+            attempt += 1
+            outcome.retried += len(retryable)
+            pending = retryable
+
+    def index(
+        self,
+        index_name: str,
+        documents: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> BulkIndexResult:
+        """
+        문서 스트림 인덱싱
+
+        Args:
+            index_name: 대상 인덱스 (사전 생성 필요)
+            documents: (doc_id, source) 이터레이터 (lazy 생성 권장)
+
+        Returns:
+            BulkIndexResult
+        """
+        result = BulkIndexResult()
+        started = time.time()
+        original = self._prepare_index(index_name)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.thread_count) as executor:
+                in_flight = {}
+
+                def collect(done):
+                    for future in done:
+                        chunk = in_flight.pop(future)
+                        try:
+                            outcome = future.result()
+                        except Exception as e:
+                            # _process_chunk 내부에서 처리되지 않은 예외 (직렬화 등)
+                            outcome = BulkIndexResult(
+                                failed=len(chunk),
+                                errors=[{"id": chunk[0][0], "documents": len(chunk), "error": str(e)}]
+                            )
+                        result.indexed += outcome.indexed
+                        result.failed += outcome.failed
+                        result.retried += outcome.retried
+                        result.requests += outcome.requests
+                        result.errors.extend(outcome.errors[:max(0, 20 - len(result.errors))])
+
+                for chunk in self._iter_chunks(index_name, documents):
+                    # in-flight 바디 수 제한 (클라이언트 메모리 상한)
+                    if len(in_flight) >= self.thread_count:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    in_flight[executor.submit(self._process_chunk, chunk)] = chunk
+
+                done, _ = wait(in_flight)
+                collect(done)
+        finally:
+            self._restore_index(index_name, original)
+
+        result.duration_seconds = time.time() - started
+        return result
+
+
+def _json_default(value):
+    """numpy 타입 JSON 직렬화"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
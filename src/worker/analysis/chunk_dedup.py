@@ -0,0 +1,86 @@
+"""
+Graph-RAG v2: 청크 중복 제거
+
+vendored 라이브러리, 보일러플레이트, 포크 저장소 등으로 인해
+동일한 청크 텍스트가 반복해서 임베딩되는 것을 방지합니다.
+
+Workflow:
+1. 청크 텍스트 정규화 (개행/후행 공백 통일) 후 SHA-256 해시
+2. 고유 텍스트만 임베딩
+3. 임베딩을 해당 텍스트를 참조하는 모든 청크 메타데이터로 fan-out
+
+분석 간(cross-analysis) 중복은 고유 텍스트가 임베딩 캐시 키를 공유하므로
+계층형 임베딩 캐시에서 처리됩니다.
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+
+def normalize_chunk_text(text: str) -> str:
+    """중복 판정용 정규화 (CRLF → LF, 라인 후행 공백 및 앞뒤 빈 줄 제거)"""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def content_hash(text: str) -> str:
+    """정규화된 청크 텍스트의 SHA-256 해시"""
+    return hashlib.sha256(normalize_chunk_text(text).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class DedupStats:
+    """청크 중복 제거 통계"""
+    total_chunks: int
+    unique_chunks: int
+
+    @property
+    def duplicate_chunks(self) -> int:
+        return self.total_chunks - self.unique_chunks
+
+    @property
+    def dedup_ratio(self) -> float:
+        """전체 청크 대비 중복 청크 비율 (0.0 ~ 1.0)"""
+        if self.total_chunks == 0:
+            return 0.0
+        return self.duplicate_chunks / self.total_chunks
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_chunks": self.total_chunks,
+            "unique_chunks": self.unique_chunks,
+            "duplicate_chunks": self.duplicate_chunks,
+            "dedup_ratio": round(self.dedup_ratio, 4)
+        }
+
+
+def dedup_chunks(chunks: List[Dict[str, Any]]) -> Tuple[List[str], List[int], DedupStats]:
+    """
+    청크 리스트에서 고유 텍스트 추출
+
+    각 청크 메타데이터에 content_hash를 기록합니다.
+
+    Args:
+        chunks: [{"text": "...", "metadata": {...}}, ...]
+
+    Returns:
+        (unique_texts, assignments, stats)
+        - unique_texts: 임베딩할 고유 텍스트 (첫 등장 원문)
+        - assignments: 각 청크가 참조하는 unique_texts 인덱스
+    """
+    unique_texts: List[str] = []
+    positions: Dict[str, int] = {}
+    assignments: List[int] = []
+
+    for chunk in chunks:
+        digest = content_hash(chunk["text"])
+        chunk["metadata"]["content_hash"] = digest
+
+        position = positions.get(digest)
+        if position is None:
+            position = len(unique_texts)
+            positions[digest] = position
+            unique_texts.append(chunk["text"])
+        assignments.append(position)
+
+    return unique_texts, assignments, DedupStats(len(chunks), len(unique_texts))
@@ -0,0 +1,358 @@
+"""
+Graph-RAG v2: 심볼 단위 코드 청킹
+
+GraphLoader가 추출한 Function/Class 노드의 라인 범위를 사용하여
+심볼 하나당 청크 하나를 생성합니다.
+
+Rules:
+- 각 라인은 그 라인을 포함하는 가장 안쪽 심볼에 귀속
+  (클래스 청크는 메서드를 제외한 헤더/속성 라인만 포함)
+- max_tokens를 넘는 심볼은 본문 들여쓰기 기준 statement 경계에서 분할
+  (단일 statement가 max_tokens를 넘으면 그 statement만 토큰 윈도우로 분할)
+- 청크 메타데이터의 line_spans에 실제 포함된 (비어있지 않은) 라인 구간만 기록
+- 어떤 심볼에도 속하지 않는 최상위 코드만 토큰 슬라이딩 윈도우로 청킹
+- 청크 메타데이터에 graph_node_id를 기록하여 그래프 노드와 직접 연결
+
+토큰 윈도우는 토큰 경계의 문자 오프셋을 파일당 한 번만 계산하고
+원본 문자열을 슬라이싱하여 만듭니다 (윈도우마다 decode하지 않음).
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# 청커 버전 (청킹 규칙 변경 시 증가 → 벡터 인덱스 재사용 판단에 사용)
+CHUNKER_VERSION = "symbol-v2"
+
+SYMBOL_NODE_TYPES = ("Function", "Class")
+
+
+def group_symbols_by_file(nodes: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """GraphLoader 노드 리스트를 파일별 Function/Class 노드로 그룹화"""
+    symbols = defaultdict(list)
+    for node in nodes:
+        if node.get("type") in SYMBOL_NODE_TYPES and node.get("start_line"):
+            symbols[node["file_path"]].append(node)
+    return dict(symbols)
+
+
+def token_char_offsets(tokenizer, text: str) -> List[int]:
+    """
+    토큰 경계의 문자 오프셋 계산 (파일당 encode 1회 + decode 1회)
+
+    Returns:
+        offsets: 길이 len(tokens) + 1, offsets[i]는 i번째 토큰 시작 문자 위치,
+                 마지막 원소는 len(text)
+    """
+    tokens = tokenizer.encode(text)
+    if not tokens:
+        return [0]
+    _, offsets = tokenizer.decode_with_offsets(tokens)
+    return list(offsets) + [len(text)]
+
+
+def iter_token_windows(
+    tokenizer,
+    text: str,
+    window_size: int = 200,
+    overlap: int = 50
+) -> Iterator[Tuple[str, int, int]]:
+    """
+    토큰 슬라이딩 윈도우를 원본 문자열 슬라이스로 생성
+
+    Yields:
+        (window_text, start_token, end_token)
+    """
+    offsets = token_char_offsets(tokenizer, text)
+    token_count = len(offsets) - 1
+    step = max(1, window_size - overlap)
+
+    start = 0
+    while start < token_count:
+        end = min(start + window_size, token_count)
+        yield text[offsets[start]:offsets[end]], start, end
+        if end == token_count:
+            break
+        start += step
+
+
+def iter_window_chunks(
+    tokenizer,
+    files: Iterable[Tuple[str, str]],
+    chunk_size: int = 200,
+    overlap: int = 50
+) -> Iterator[Dict[str, Any]]:
+    """
+    (file_path, file_content) 이터레이터를 받아 윈도우 청크를 lazy하게 생성
+
+    Yields:
+        {"text": "...", "metadata": {...}} (chunk_code와 동일한 메타데이터)
+    """
+    for file_path, file_content in files:
+        windows = iter_token_windows(tokenizer, file_content, chunk_size, overlap)
+        for chunk_idx, (text, start, end) in enumerate(windows):
+            yield {
+                "text": text,
+                "metadata": {
+                    "file_path": file_path,
+                    "chunk_index": chunk_idx,
+                    "token_count": end - start,
+                    "start_token": start,
+                    "end_token": end
+                }
+            }
+
+
+def _indent_of(line: str) -> int:
+    return len(line) - len(line.lstrip(" \t"))
+
+
+def _line_extra(lines: List[str], line_indices: List[int]) -> Dict[str, Any]:
+    """
+    청크에 실제 포함된 라인 구간 메타데이터
+
+    클래스 청크처럼 중간에 메서드가 빠진 경우 start_line~end_line이 연속 범위가
+    아니므로, 연속 구간을 line_spans([[start, end], ...], 1-based)로 기록합니다.
+    구간 양끝의 빈 라인은 제외하고, 빈 라인만 있는 구간은 버립니다.
+    """
+    runs: List[List[int]] = []
+    for i in line_indices:
+        if runs and i == runs[-1][-1] + 1:
+            runs[-1].append(i)
+        else:
+            runs.append([i])
+
+    spans: List[List[int]] = []
+    for run in runs:
+        content = [i for i in run if lines[i].strip()]
+        if content:
+            spans.append([content[0] + 1, content[-1] + 1])
+    if not spans:
+        spans = [[line_indices[0] + 1, line_indices[-1] + 1]]
+
+    return {
+        "start_line": spans[0][0],
+        "end_line": spans[-1][1],
+        "line_spans": spans,
+    }
+
+
+class SymbolChunker:
+    """
+    그래프 노드 라인 범위 기반 청커
+
+    Usage:
+        chunker = SymbolChunker(tokenizer)
+        symbols = group_symbols_by_file(nodes)
+        chunks = chunker.chunk_file(content, path, symbols.get(path, []))
+    """
+
+    def __init__(
+        self,
+        tokenizer,
+        max_tokens: int = 512,
+        window_size: int = 200,
+        window_overlap: int = 50
+    ):
+        """
+        Args:
+            tokenizer: tiktoken Encoding
+            max_tokens: 심볼 청크 최대 토큰 수 (초과 시 statement 경계 분할)
+            window_size: 최상위 잔여 코드 윈도우 크기 (토큰)
+            window_overlap: 최상위 잔여 코드 윈도우 오버랩 (토큰)
+        """
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.window_size = window_size
+        self.window_overlap = window_overlap
+
+    def chunk_file(
+        self,
+        file_content: str,
+        file_path: str,
+        symbol_nodes: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        단일 파일을 심볼 단위로 청킹
+
+        Args:
+            file_content: 파일 전체 내용
+            file_path: 파일 경로 (그래프 노드의 file_path와 동일해야 함)
+            symbol_nodes: 해당 파일의 Function/Class 노드
+
+        Returns:
+            chunks: [{"text": "...", "metadata": {...}}, ...] (라인 순서)
+        """
+        lines = file_content.splitlines(keepends=True)
+        owners = self._assign_owners(len(lines), symbol_nodes)
+
+        pieces: List[Tuple[int, Dict[str, Any], str, Dict[str, Any]]] = []
+
+        owned_lines: Dict[int, List[int]] = defaultdict(list)
+        for i, owner in enumerate(owners):
+            if owner is not None:
+                owned_lines[id(owner)].append(i)
+
+        # 심볼별 청크
+        for node in symbol_nodes:
+            owned = owned_lines.get(id(node))
+            if not owned or not "".join(lines[i] for i in owned).strip():
+                continue
+
+            for part_lines, part_tokens in self._split_symbol(lines, owned):
+                if part_tokens <= self.max_tokens:
+                    text = "".join(lines[i] for i in part_lines)
+                    pieces.append((part_lines[0], node, text, _line_extra(lines, part_lines)))
+                    continue
+                # 단일 statement가 max_tokens 초과 → 토큰 윈도우로 분할
+                for window_lines, text, start_token, end_token in self._statement_windows(lines, part_lines):
+                    extra = _line_extra(lines, window_lines)
+                    extra.update({"start_token": start_token, "end_token": end_token})
+                    pieces.append((window_lines[0], node, text, extra))
+
+        # 최상위 잔여 코드 (윈도우)
+        for run in self._leftover_runs(owners):
+            text = "".join(lines[i] for i in run)
+            if not text.strip():
+                continue
+            for window_text, start_token, end_token in self._windows(text):
+                pieces.append((run[0], None, window_text, {
+                    "start_line": run[0] + 1,
+                    "end_line": run[-1] + 1,
+                    "start_token": start_token,
+                    "end_token": end_token,
+                }))
+
+        pieces.sort(key=lambda piece: piece[0])
+
+        chunks = []
+        for chunk_idx, (_, node, text, extra) in enumerate(pieces):
+            metadata = {
+                "file_path": file_path,
+                "chunk_index": chunk_idx,
+                "token_count": (
+                    extra["end_token"] - extra["start_token"]
+                    if "end_token" in extra else len(self.tokenizer.encode(text))
+                ),
+                "chunker": CHUNKER_VERSION,
+                "graph_node_id": node["id"] if node else f"file:{file_path}",
+                "symbol_type": node["type"] if node else "File",
+                "symbol_name": node.get("name") if node else None,
+            }
+            metadata.update(extra)
+            chunks.append({"text": text, "metadata": metadata})
+
+        return chunks
+
+    def _assign_owners(self, line_count: int, symbol_nodes: List[Dict[str, Any]]) -> List[Optional[Dict]]:
+        """각 라인을 포함하는 가장 안쪽 심볼 계산 (큰 범위부터 칠하고 작은 범위로 덮어씀)"""
+        owners: List[Optional[Dict]] = [None] * line_count
+
+        def span(node):
+            end = node.get("end_line") or node["start_line"]
+            return end - node["start_line"]
+
+        for node in sorted(symbol_nodes, key=span, reverse=True):
+            start = node["start_line"] - 1
+            end = min(line_count, node.get("end_line") or node["start_line"])
+            for i in range(max(0, start), end):
+                owners[i] = node
+
+        return owners
+
+    def _leftover_runs(self, owners: List[Optional[Dict]]) -> List[List[int]]:
+        """어떤 심볼에도 속하지 않는 연속 라인 묶음"""
+        runs, current = [], []
+        for i, owner in enumerate(owners):
+            if owner is None:
+                current.append(i)
+            elif current:
+                runs.append(current)
+                current = []
+        if current:
+            runs.append(current)
+        return runs
+
+    def _split_symbol(self, lines: List[str], owned: List[int]) -> List[Tuple[List[int], int]]:
+        """
+        max_tokens 초과 심볼을 statement 경계에서 분할
+
+        본문 첫 라인의 들여쓰기와 같거나 얕은 라인을 statement 시작으로 보고,
+        statement 묶음을 max_tokens 이내로 greedy 패킹합니다.
+        max_tokens를 넘는 statement는 단독 part로 남으며 호출자가 윈도우로 분할합니다.
+
+        Returns:
+            [(part_lines, token_count), ...]
+        """
+        text = "".join(lines[i] for i in owned)
+        total_tokens = len(self.tokenizer.encode(text))
+        if total_tokens <= self.max_tokens:
+            return [(owned, total_tokens)]
+
+        body = [i for i in owned[1:] if lines[i].strip()]
+        body_indent = _indent_of(lines[body[0]]) if body else 0
+
+        # statement 단위 그룹 (헤더는 첫 statement에 포함)
+        statements: List[List[int]] = []
+        for position, i in enumerate(owned):
+            starts_statement = (
+                position > 0
+                and lines[i].strip()
+                and _indent_of(lines[i]) <= body_indent
+            )
+            if not statements or starts_statement:
+                statements.append([i])
+            else:
+                statements[-1].append(i)
+
+        parts: List[Tuple[List[int], int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for statement in statements:
+            tokens = len(self.tokenizer.encode("".join(lines[i] for i in statement)))
+            if current and (current_tokens + tokens > self.max_tokens or current_tokens > self.max_tokens):
+                parts.append((current, current_tokens))
+                current, current_tokens = [], 0
+            current.extend(statement)
+            current_tokens += tokens
+        if current:
+            parts.append((current, current_tokens))
+
+        return parts
+
+    def _statement_windows(
+        self,
+        lines: List[str],
+        part_lines: List[int]
+    ) -> Iterator[Tuple[List[int], str, int, int]]:
+        """
+        max_tokens 초과 statement를 max_tokens 크기 토큰 윈도우로 분할
+
+        Yields:
+            (window_lines, window_text, start_token, end_token)
+            window_lines는 윈도우 텍스트가 걸친 라인 인덱스
+        """
+        text = "".join(lines[i] for i in part_lines)
+        line_starts, position = [], 0
+        for i in part_lines:
+            line_starts.append(position)
+            position += len(lines[i])
+
+        offsets = token_char_offsets(self.tokenizer, text)
+        token_count = len(offsets) - 1
+        step = max(1, self.max_tokens - min(self.window_overlap, self.max_tokens - 1))
+
+        start = 0
+        while start < token_count:
+            end = min(start + self.max_tokens, token_count)
+            char_start, char_end = offsets[start], offsets[end]
+            first = bisect_right(line_starts, char_start) - 1
+            last = bisect_right(line_starts, max(char_start, char_end - 1)) - 1
+            yield part_lines[first:last + 1], text[char_start:char_end], start, end
+            if end == token_count:
+                break
+            start += step
+
+    def _windows(self, text: str) -> Iterator[Tuple[str, int, int]]:
+        """토큰 슬라이딩 윈도우 (최상위 잔여 코드 전용)"""
+        return iter_token_windows(self.tokenizer, text, self.window_size, self.window_overlap)
@@ -0,0 +1,284 @@
+"""
+커밋 단위 numstat 저장소 (SQLite)
+
+한 번 분석한 저장소를 다시 분석할 때 전체 히스토리를 재생하지 않도록
+커밋별 numstat 기록을 (저장소 키, 커밋 해시) 키로 보관합니다.
+저장소 키는 "origin URL#브랜치"로, 같은 저장소의 브랜치별 기록을 분리합니다.
+
+Workflow (GitAnalyzer.sync_commit_store):
+1. 저장된 마지막 HEAD가 현재 HEAD의 조상이면 last_hash..HEAD 범위만 git log로 읽어 추가
+   (임시 키에 저장 후 HEAD 갱신과 같은 트랜잭션에서 이동)
+2. 조상이 아니면 (force-push, 히스토리 재작성) 저장소 기록을 전체 재구축
+3. 저자별 집계는 저장된 기록에서 SQL로 계산 (HEAD 확인과 같은 읽기 트랜잭션)
+
+Tables:
+- repositories(repo_key, head_commit, updated_at)
+- commits(repo_key, commit_hash, author_name, author_email, timestamp, added_lines, deleted_lines)
+- commit_files(repo_key, commit_hash, path)
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .git_analyzer import AuthorContribution, CommitRecord
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS repositories (
+    repo_key TEXT PRIMARY KEY,
+    head_commit TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS commits (
+    repo_key TEXT NOT NULL,
+    commit_hash TEXT NOT NULL,
+    author_name TEXT NOT NULL,
+    author_email TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    added_lines INTEGER NOT NULL,
+    deleted_lines INTEGER NOT NULL,
+    PRIMARY KEY (repo_key, commit_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_commits_author ON commits (repo_key, author_name, author_email);
+CREATE TABLE IF NOT EXISTS commit_files (
+    repo_key TEXT NOT NULL,
+    commit_hash TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (repo_key, commit_hash, path)
+) WITHOUT ROWID;
+"""
+
+# executemany 1회당 커밋 수
+_INSERT_BATCH_SIZE = 1000
+
+
+class CommitStatsStore:
+    """저장소별 커밋 numstat 기록 (SQLite, 여러 워커 프로세스 공유 가능)"""
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: SQLite 파일 경로
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            # 동시 워커: 읽기는 쓰기와 병행 (WAL)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # 상태
+    # ------------------------------------------------------------------
+
+    def get_head(self, repo_key: str) -> Optional[str]:
+        """마지막으로 동기화한 HEAD 커밋"""
+        with self._lock:
+            return self._get_head(repo_key)
+
+    # ------------------------------------------------------------------
+    # 쓰기
+    # ------------------------------------------------------------------
+    # git log 스트림은 수 분이 걸릴 수 있으므로 임시 키로 배치마다 커밋하여 쓰기
+    # 잠금을 짧게 유지하고, 모든 기록이 저장된 뒤 짧은 트랜잭션 1회로 저장소 키로
+    # 옮기면서 HEAD를 갱신합니다. 동기화 중이거나 실패한 기록은 조회에 보이지 않습니다.
+
+    def append(self, repo_key: str, records: Iterable[CommitRecord], head_commit: str) -> int:
+        """새 커밋 기록 추가 후 HEAD 갱신
+
+        Returns:
+            추가한 커밋 수
+        """
+        return self._stage_and_swap(repo_key, records, head_commit, replace=False)
+
+    def replace(self, repo_key: str, records: Iterable[CommitRecord], head_commit: str) -> int:
+        """저장소 기록 전체 재구축 (force-push / 히스토리 재작성)
+
+        Returns:
+            저장한 커밋 수
+        """
+        return self._stage_and_swap(repo_key, records, head_commit, replace=True)
+
+    def _stage_and_swap(
+        self,
+        repo_key: str,
+        records: Iterable[CommitRecord],
+        head_commit: str,
+        replace: bool
+    ) -> int:
+        """임시 키로 배치 저장 후 한 트랜잭션에서 저장소 키로 이동 + HEAD 갱신"""
+        staging_key = f"{repo_key}@staging-{os.getpid()}-{threading.get_ident()}"
+        try:
+            count = self._insert(staging_key, records)
+            with self._lock, self._conn:
+                if replace:
+                    self._delete(repo_key)
+                # 재처리된 범위는 기존 행을 덮어씀 (멱등)
+                self._conn.execute(
+                    "UPDATE OR REPLACE commits SET repo_key = ? WHERE repo_key = ?", (repo_key, staging_key)
+                )
+                self._conn.execute(
+                    "UPDATE OR REPLACE commit_files SET repo_key = ? WHERE repo_key = ?", (repo_key, staging_key)
+                )
+                self._set_head(repo_key, head_commit)
+        except BaseException:
+            with self._lock, self._conn:
+                self._delete(staging_key)
+            raise
+        return count
+
+    def _insert(self, repo_key: str, records: Iterable[CommitRecord]) -> int:
+        count = 0
+        for batch in _batched(records, _INSERT_BATCH_SIZE):
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (repo_key, record.commit_hash, record.author_name, record.author_email,
+                         record.timestamp, record.added_lines, record.deleted_lines)
+                        for record in batch
+                    ]
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO commit_files VALUES (?, ?, ?)",
+                    [
+                        (repo_key, record.commit_hash, path)
+                        for record in batch
+                        for path in record.files
+                    ]
+                )
+            count += len(batch)
+        return count
+
+    def _delete(self, repo_key: str):
+        self._conn.execute("DELETE FROM commit_files WHERE repo_key = ?", (repo_key,))
+        self._conn.execute("DELETE FROM commits WHERE repo_key = ?", (repo_key,))
+
+    def _set_head(self, repo_key: str, head_commit: str):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO repositories VALUES (?, ?, ?)",
+            (repo_key, head_commit, time.time())
+        )
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    # 조회는 읽기 트랜잭션 1회 안에서 HEAD를 확인합니다. 동기화 이후 다른 워커가
+    # 같은 키를 다른 HEAD로 갱신했다면 None을 반환하여 호출자가 git log로 대체합니다.
+
+    def author_contributions(
+        self,
+        repo_key: str,
+        head_commit: Optional[str] = None
+    ) -> Optional[Dict[str, AuthorContribution]]:
+        """저자 identity ("name <email>") 단위 집계
+
+        Returns:
+            identity → AuthorContribution (head_commit과 저장된 HEAD가 다르면 None)
+        """
+        with self._lock:
+            with self._read_transaction():
+                if head_commit is not None and self._get_head(repo_key) != head_commit:
+                    return None
+                totals = self._conn.execute(
+                    "SELECT author_name, author_email, COUNT(*), SUM(added_lines), SUM(deleted_lines) "
+                    "FROM commits WHERE repo_key = ? GROUP BY author_name, author_email",
+                    (repo_key,)
+                ).fetchall()
+                file_rows = self._conn.execute(
+                    "SELECT DISTINCT c.author_name, c.author_email, f.path "
+                    "FROM commit_files f JOIN commits c "
+                    "ON c.repo_key = f.repo_key AND c.commit_hash = f.commit_hash "
+                    "WHERE f.repo_key = ?",
+                    (repo_key,)
+                ).fetchall()
+
+        files: Dict[Tuple[str, str], List[str]] = {}
+        for name, email, path in file_rows:
+            files.setdefault((name, email), []).append(path)
+
+        return {
+            f"{name} <{email}>": AuthorContribution(
+                author_name=name,
+                author_email=email,
+                commits=commits,
+                added_lines=added,
+                deleted_lines=deleted,
+                files=sorted(files.get((name, email), []))
+            )
+            for name, email, commits, added, deleted in totals
+        }
+
+    def commit_records(
+        self,
+        repo_key: str,
+        identities: Iterable[Tuple[str, str]],
+        head_commit: Optional[str] = None
+    ) -> Optional[List[CommitRecord]]:
+        """저자 identity (name, email) 목록의 커밋 기록 (최신순)
+
+        Returns:
+            CommitRecord 목록 (head_commit과 저장된 HEAD가 다르면 None)
+        """
+        records: Dict[str, CommitRecord] = {}
+        with self._lock:
+            with self._read_transaction():
+                if head_commit is not None and self._get_head(repo_key) != head_commit:
+                    return None
+                for name, email in identities:
+                    rows = self._conn.execute(
+                        "SELECT commit_hash, author_name, author_email, timestamp, added_lines, deleted_lines "
+                        "FROM commits WHERE repo_key = ? AND author_name = ? AND author_email = ?",
+                        (repo_key, name, email)
+                    ).fetchall()
+                    for row in rows:
+                        records[row[0]] = CommitRecord(*row)
+
+                    file_rows = self._conn.execute(
+                        "SELECT f.commit_hash, f.path FROM commit_files f JOIN commits c "
+                        "ON c.repo_key = f.repo_key AND c.commit_hash = f.commit_hash "
+                        "WHERE f.repo_key = ? AND c.author_name = ? AND c.author_email = ?",
+                        (repo_key, name, email)
+                    ).fetchall()
+                    for commit_hash, path in file_rows:
+                        records[commit_hash].files.append(path)
+
+        return sorted(records.values(), key=lambda record: record.timestamp, reverse=True)
+
+    def _get_head(self, repo_key: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT head_commit FROM repositories WHERE repo_key = ?", (repo_key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    @contextmanager
+    def _read_transaction(self):
+        """WAL 스냅샷 읽기 (트랜잭션 내 SELECT는 같은 시점의 데이터를 봄)"""
+        self._conn.execute("BEGIN")
+        try:
+            yield
+        finally:
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _batched(records: Iterable[CommitRecord], size: int) -> Iterator[List[CommitRecord]]:
+    batch: List[CommitRecord] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
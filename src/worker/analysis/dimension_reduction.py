@@ -0,0 +1,88 @@
+"""
+Graph-RAG v2: 임베딩 차원 축소 (PCA 투영)
+
+provider가 출력 차원 파라미터를 지원하지 않는 모델(Titan v1, ada-002 등)은
+인덱스 빌드 시 해당 인덱스 임베딩으로 PCA 투영을 학습하고, 같은 투영을
+쿼리 임베딩에도 적용합니다.
+
+투영은 인덱스 단위 아티팩트로 저장됩니다:
+- 로컬: {EMBEDDING_CACHE_DIR}/projections/{index_name}.npz
+- S3:   projections/{index_name}.npz (S3 캐시 버킷이 설정된 경우)
+"""
+import io
+from pathlib import Path
+from typing import List, Union
+
+import numpy as np
+
+
+class PCAProjection:
+    """원본 임베딩 차원 → target 차원 선형 투영"""
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray):
+        """
+        Args:
+            mean: 학습 샘플 평균 (source_dimension,)
+            components: 주성분 행렬 (target_dimension, source_dimension)
+        """
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+
+    @property
+    def source_dimension(self) -> int:
+        return self.components.shape[1]
+
+    @property
+    def target_dimension(self) -> int:
+        return self.components.shape[0]
+
+    @classmethod
+    def fit(cls, samples: Union[np.ndarray, List[np.ndarray]], target_dimension: int) -> "PCAProjection":
+        """
+        샘플 임베딩으로 PCA 학습
+
+        샘플 수가 target_dimension보다 적으면 남는 차원은 0 성분으로 채웁니다
+        (코사인 유사도에 영향 없음).
+        """
+        matrix = np.asarray(np.stack(samples), dtype=np.float32)
+        if target_dimension >= matrix.shape[1]:
+            raise ValueError(f"target dimension {target_dimension} >= source dimension {matrix.shape[1]}")
+
+        # 정규화 후 학습 (코사인 기준 방향 분산)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        mean = matrix.mean(axis=0)
+        _, _, vt = np.linalg.svd(matrix - mean, full_matrices=False)
+
+        components = np.zeros((target_dimension, matrix.shape[1]), dtype=np.float32)
+        rank = min(target_dimension, vt.shape[0])
+        components[:rank] = vt[:rank]
+        return cls(mean, components)
+
+    def transform(self, vectors: Union[np.ndarray, List[np.ndarray]]) -> np.ndarray:
+        """벡터 (n x source) → (n x target) 투영"""
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        return (matrix - self.mean) @ self.components.T
+
+    # ------------------------------------------------------------------
+    # 직렬화
+    # ------------------------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez(buffer, mean=self.mean, components=self.components)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PCAProjection":
+        with np.load(io.BytesIO(data)) as arrays:
+            return cls(arrays["mean"], arrays["components"])
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "PCAProjection":
+        return cls.from_bytes(Path(path).read_bytes())
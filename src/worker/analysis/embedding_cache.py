@@ -0,0 +1,236 @@
+"""
+Graph-RAG v2: 계층형 임베딩 캐시
+
+임베딩 캐시를 3단계로 구성하여 원격 호출을 최소화
+
+Tiers:
+1. LRUEmbeddingCache   - 프로세스 내 메모리 LRU
+2. DiskEmbeddingCache  - 로컬 디스크 SQLite (호스트 단위 재사용)
+3. S3EmbeddingCache    - S3 객체 (embeddings/{model}/{sha256}.npy)
+   또는 ShardedS3EmbeddingCache (embedding_shards.py, prefix 단위 샤드)
+
+모든 tier는 SHA-256 캐시 키 기반의 배치 API(get_many/put_many)를 제공하며,
+TieredEmbeddingCache가 하위 tier에서 찾은 항목을 상위 tier로 승격합니다.
+"""
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class LRUEmbeddingCache:
+    """프로세스 내 메모리 LRU 캐시"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                embedding = self._entries.get(key)
+                if embedding is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = embedding
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        with self._lock:
+            for key, embedding in items.items():
+                self._entries[key] = embedding
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskEmbeddingCache:
+    """
+    로컬 디스크 SQLite 캐시
+
+    동일 호스트에서 같은 저장소를 재분석할 때 네트워크 호출 없이
+    임베딩을 재사용합니다. (model, key) 단위로 float32 벡터를 BLOB으로 저장
+    """
+
+    name = "disk"
+
+    # SQLite 바인딩 변수 제한 (SQLITE_MAX_VARIABLE_NUMBER) 회피
+    _QUERY_BATCH = 500
+
+    def __init__(self, cache_dir: str, embedding_model: str):
+        """
+        Args:
+            cache_dir: 캐시 디렉토리
+            embedding_model: 임베딩 모델 ID (모델별로 캐시 분리)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.embedding_model = embedding_model
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.cache_dir / "embeddings.sqlite3"),
+            check_same_thread=False,
+            timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                key TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, key)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), self._QUERY_BATCH):
+                batch = keys[i:i + self._QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                    [self.embedding_model, *batch]
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, vector) VALUES (?, ?, ?)",
+                [
+                    (self.embedding_model, key, np.asarray(embedding, dtype=np.float32).tobytes())
+                    for key, embedding in items.items()
+                ]
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class S3EmbeddingCache:
+    """
+    S3 객체 캐시 (embeddings/{model}/{sha256}.npy)
+
+    키 하나당 객체 하나이므로 배치 요청은 스레드 풀로 병렬 실행합니다.
+    """
+
+    name = "s3"
+
+    def __init__(self, s3_client, bucket: str, embedding_model: str, max_workers: int = 16):
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.embedding_model = embedding_model
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-cache")
+
+    def _object_key(self, key: str) -> str:
+        return f"embeddings/{self.embedding_model}/{key}.npy"
+
+    def _get(self, key: str) -> Optional[np.ndarray]:
+        try:
+            obj = self.s3.get_object(Bucket=self.bucket, Key=self._object_key(key))
+            return np.frombuffer(obj['Body'].read(), dtype=np.float32)
+
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        except Exception as e:
+            print(f"⚠️  Cache read error: {e}")
+            return None
+
+    def _put(self, key: str, embedding: np.ndarray):
+        try:
+            self.s3.put_object(
+                Bucket=self.bucket,
+                Key=self._object_key(key),
+                Body=np.asarray(embedding, dtype=np.float32).tobytes()
+            )
+        except Exception as e:
+            print(f"⚠️  Cache write error: {e}")
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        for key, embedding in zip(keys, self._executor.map(self._get, keys)):
+            if embedding is not None:
+                found[key] = embedding
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        list(self._executor.map(lambda item: self._put(*item), items.items()))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+class TieredEmbeddingCache:
+    """
+    상위 tier부터 순서대로 조회하는 계층형 캐시
+
+    - get_many(): 상위 tier에서 못 찾은 키만 하위 tier로 전달,
+                  하위 tier hit는 상위 tier 전체로 승격
+    - put_many(): 모든 tier에 기록
+    """
+
+    def __init__(self, tiers: List):
+        self.tiers = tiers
+        self.hits: Dict[str, int] = {tier.name: 0 for tier in tiers}
+        self.misses = 0
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        remaining = list(dict.fromkeys(keys))
+
+        for level, tier in enumerate(self.tiers):
+            if not remaining:
+                break
+
+            tier_found = tier.get_many(remaining)
+            if not tier_found:
+                continue
+
+            self.hits[tier.name] += len(tier_found)
+            found.update(tier_found)
+            remaining = [key for key in remaining if key not in tier_found]
+
+            # 상위 tier로 승격
+            for upper in self.tiers[:level]:
+                upper.put_many(tier_found)
+
+        self.misses += len(remaining)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        for tier in self.tiers:
+            tier.put_many(items)
+
+    def flush(self, force: bool = False):
+        """쓰기를 버퍼링하는 tier(샤드 캐시 등) 업로드"""
+        for tier in self.tiers:
+            if hasattr(tier, 'flush'):
+                tier.flush(force=force)
+
+    def close(self):
+        for tier in self.tiers:
+            if hasattr(tier, 'close'):
+                tier.close()
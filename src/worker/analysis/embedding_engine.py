@@ -0,0 +1,374 @@
+"""
+Graph-RAG v2: 비동기 임베딩 엔진
+
+asyncio 기반으로 임베딩 요청을 동시에 실행하면서
+provider의 RPM/TPM 한도를 토큰 버킷으로 준수
+
+Features:
+- 동시 실행 요청 수 제한 (Semaphore)
+- RPM/TPM 토큰 버킷 레이트 리미터
+- 429/Throttling 에러 시 적응형 백오프 (AIMD)
+- 기존 동기 호출자를 위한 sync 래퍼
+- 실패 항목 지연 재시도 큐 (스테이지 종료 시 배치 재시도)
+"""
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .embedding_metrics import EmbeddingMetrics
+
+
+# Throttling으로 간주하는 에러 코드 (Bedrock/AWS)
+THROTTLING_ERROR_CODES = {
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceQuotaExceededException',
+    'ModelNotReadyException',
+}
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """provider 에러가 레이트 리밋(429/Throttling)인지 판별"""
+    # botocore ClientError
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        code = response.get('Error', {}).get('Code')
+        if code in THROTTLING_ERROR_CODES:
+            return True
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+        if status == 429:
+            return True
+
+    # openai.RateLimitError 등 status_code 속성을 가진 에러
+    if getattr(error, 'status_code', None) == 429:
+        return True
+
+    return type(error).__name__ in ('RateLimitError', 'ThrottlingException')
+
+
+class TokenBucket:
+    """
+    분당 한도(RPM/TPM)를 초당 보충률로 환산한 토큰 버킷
+
+    Throttling 발생 시 penalize()로 보충률을 절반으로 줄이고,
+    성공할 때마다 reward()로 원래 한도까지 서서히 회복 (AIMD)
+    """
+
+    def __init__(self, limit_per_minute: float, min_ratio: float = 0.1):
+        """
+        Args:
+            limit_per_minute: 분당 허용량 (요청 수 또는 토큰 수)
+            min_ratio: 백오프 시 허용하는 최소 보충률 비율
+        """
+        self.base_rate = limit_per_minute / 60.0
+        self.rate = self.base_rate
+        self.min_rate = self.base_rate * min_ratio
+        # 최대 10초 분량의 burst 허용
+        self.capacity = max(1.0, self.base_rate * 10)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        """현재 이벤트 루프에 바인딩된 Lock 반환 (sync 래퍼가 루프를 새로 만들 수 있음)"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """amount만큼 토큰이 찰 때까지 대기 후 차감"""
+        amount = min(amount, self.capacity)
+        async with self._get_lock():
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    def penalize(self):
+        """Throttling 발생: 보충률 절반으로 감소, 잔여 토큰 소진"""
+        self.rate = max(self.min_rate, self.rate * 0.5)
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+
+    def reward(self):
+        """요청 성공: 보충률을 base_rate까지 점진적으로 회복"""
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate * 1.05)
+
+
+class AsyncEmbeddingEngine:
+    """
+    동시성 제한 + 레이트 리밋 기반 임베딩 실행기
+
+    provider 호출 자체는 동기 함수(boto3/openai)이므로
+    ThreadPoolExecutor에서 실행하고, asyncio로 in-flight 요청 수와
+    요청/토큰 속도를 제어합니다.
+
+    Usage:
+        engine = AsyncEmbeddingEngine(embed_batch_fn, count_tokens_fn)
+        vectors = engine.embed_sync(texts)   # 실패한 항목은 None
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[np.ndarray]],
+        count_tokens: Callable[[str], int],
+        max_concurrency: int = 8,
+        requests_per_minute: int = 1000,
+        tokens_per_minute: int = 300000,
+        batch_size: int = 1,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0
+    ):
+        """
+        Args:
+            embed_batch: 텍스트 배치를 임베딩하는 동기 함수 (실패 시 예외 발생)
+            count_tokens: 텍스트 토큰 수 계산 함수 (TPM 계산용)
+            max_concurrency: 동시 in-flight 요청 수
+            requests_per_minute: provider RPM 한도
+            tokens_per_minute: provider TPM 한도
+            batch_size: 요청 1회당 텍스트 수
+            max_retries: Throttling 시 최대 재시도 횟수
+            base_delay: 백오프 시작 지연 (초)
+            max_delay: 백오프 최대 지연 (초)
+        """
+        self.embed_batch = embed_batch
+        self.count_tokens = count_tokens
+        self.max_concurrency = max_concurrency
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="embedding"
+        )
+
+        # 통계
+        self.throttle_events = 0
+        self.failed_requests = 0
+
+    async def embed(
+        self,
+        texts: List[str],
+        metrics: Optional[EmbeddingMetrics] = None
+    ) -> List[Optional[np.ndarray]]:
+        """
+        텍스트 리스트를 동시에 임베딩
+
+        Args:
+            texts: 임베딩할 텍스트 리스트
+            metrics: 요청/실패/Throttling을 기록할 run 단위 지표 (호출마다 전달, 엔진은 공유 가능)
+
+        Returns:
+            입력 순서와 정렬된 임베딩 리스트 (영구 실패 항목은 None)
+        """
+        if not texts:
+            return []
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batches = [
+            (start, texts[start:start + self.batch_size])
+            for start in range(0, len(texts), self.batch_size)
+        ]
+
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+
+        async def run(start: int, batch: List[str]):
+            async with semaphore:
+                vectors = await self._embed_with_backoff(batch, metrics)
+            for offset, vector in enumerate(vectors):
+                results[start + offset] = vector
+
+        await asyncio.gather(*(run(start, batch) for start, batch in batches))
+        return results
+
+    async def _embed_with_backoff(
+        self,
+        batch: List[str],
+        metrics: Optional[EmbeddingMetrics] = None
+    ) -> List[Optional[np.ndarray]]:
+        """레이트 리밋 준수 + Throttling 백오프를 적용한 단일 배치 요청"""
+        loop = asyncio.get_running_loop()
+        batch_tokens = sum(self.count_tokens(text) for text in batch)
+
+        for attempt in range(self.max_retries + 1):
+            await self.request_bucket.acquire(1)
+            await self.token_bucket.acquire(batch_tokens)
+
+            started = time.monotonic()
+            try:
+                vectors = await loop.run_in_executor(self._executor, self.embed_batch, batch)
+                self.request_bucket.reward()
+                self.token_bucket.reward()
+                if metrics is not None:
+                    metrics.record_request(len(batch), batch_tokens, time.monotonic() - started)
+                return list(vectors)
+
+            except Exception as e:
+                if not is_throttling_error(e) or attempt == self.max_retries:
+                    print(f"❌ Embedding request failed ({len(batch)} texts): {e}")
+                    self.failed_requests += 1
+                    if metrics is not None:
+                        metrics.record_failure()
+                    return [None] * len(batch)
+
+                # 적응형 백오프: 버킷 보충률 감소 + 지수 백오프(jitter)
+                self.throttle_events += 1
+                if metrics is not None:
+                    metrics.record_throttle()
+                self.request_bucket.penalize()
+                self.token_bucket.penalize()
+                delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+                delay = random.uniform(delay / 2, delay)
+                print(f"⚠️  Embedding throttled, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+
+        return [None] * len(batch)
+
+    def embed_sync(
+        self,
+        texts: List[str],
+        metrics: Optional[EmbeddingMetrics] = None
+    ) -> List[Optional[np.ndarray]]:
+        """
+        기존 동기 호출자를 위한 래퍼
+
+        이미 이벤트 루프가 실행 중인 스레드(예: FastAPI)에서 호출되면
+        별도 스레드에서 새 루프를 돌려 결과를 반환합니다.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.embed(texts, metrics))
+
+        result: List[Optional[np.ndarray]] = []
+        error: List[BaseException] = []
+
+        def runner():
+            try:
+                result.extend(asyncio.run(self.embed(texts, metrics)))
+            except BaseException as e:  # 호출 스레드로 전달
+                error.append(e)
+
+        thread = threading.Thread(target=runner, name="embedding-loop")
+        thread.start()
+        thread.join()
+
+        if error:
+            raise error[0]
+        return result
+
+    def close(self):
+        """스레드 풀 정리"""
+        self._executor.shutdown(wait=False)
+
+
+@dataclass
+class EmbeddingFailureStats:
+    """임베딩 실패/재시도 통계 (스테이지 단위)"""
+    queued: int = 0
+    recovered: int = 0
+    failed: int = 0
+    dimension_mismatch: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "recovered": self.recovered,
+            "failed": self.failed,
+            "dimension_mismatch": self.dimension_mismatch
+        }
+
+
+class EmbeddingRetryQueue:
+    """
+    실패한 임베딩 지연 재시도 큐
+
+    요청 단위 재시도(엔진의 Throttling 백오프)로도 실패한 텍스트를 모아 두었다가
+    스테이지 마지막에 라운드별 지수 백오프 후 배치로 다시 요청합니다.
+    끝까지 실패한 텍스트는 결과에서 제외되며 제로 벡터로 대체하지 않습니다.
+
+    Usage:
+        queue = EmbeddingRetryQueue()
+        queue.add(text)
+        recovered = queue.drain(engine.embed_sync, validate)   # {text: vector}
+        queue.pending  # 영구 실패 텍스트
+    """
+
+    def __init__(self, max_rounds: int = 3, base_delay: float = 5.0, max_delay: float = 60.0):
+        """
+        Args:
+            max_rounds: 재시도 라운드 수
+            base_delay: 첫 라운드 전 대기 시간 (초, 라운드마다 2배)
+            max_delay: 라운드 간 최대 대기 시간 (초)
+        """
+        self.max_rounds = max_rounds
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._pending: Dict[str, None] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def pending(self) -> List[str]:
+        return list(self._pending)
+
+    def add(self, text: str):
+        self._pending[text] = None
+
+    def drain(
+        self,
+        embed: Callable[[List[str]], List[Optional[np.ndarray]]],
+        validate: Callable[[np.ndarray], bool]
+    ) -> Dict[str, np.ndarray]:
+        """
+        대기 중인 텍스트를 라운드별로 재시도
+
+        Args:
+            embed: 텍스트 배치 임베딩 함수 (실패 항목은 None)
+            validate: 결과 벡터 검증 함수 (False면 실패로 간주)
+
+        Returns:
+            {text: vector} 복구된 임베딩
+        """
+        recovered: Dict[str, np.ndarray] = {}
+
+        for round_index in range(self.max_rounds):
+            if not self._pending:
+                break
+
+            delay = min(self.max_delay, self.base_delay * (2 ** round_index))
+            delay = random.uniform(delay / 2, delay)
+            print(f"🔁 Retrying {len(self._pending)} failed embeddings in {delay:.1f}s "
+                  f"(round {round_index + 1}/{self.max_rounds})")
+            time.sleep(delay)
+
+            texts = list(self._pending)
+            for text, vector in zip(texts, embed(texts)):
+                if vector is not None and validate(vector):
+                    recovered[text] = vector
+                    del self._pending[text]
+
+        return recovered
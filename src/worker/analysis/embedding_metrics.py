@@ -0,0 +1,135 @@
+"""
+Graph-RAG v2: 임베딩 처리량/비용 지표
+
+generate_embeddings 1회(run) 단위로 요청 수, 배치 크기, 토큰 수,
+캐시 tier별 히트, 요청 지연(p50/p95), Throttling 횟수, 예상 비용을 수집합니다.
+
+수집 경로:
+- AsyncEmbeddingEngine: 요청 단위 기록 (record_request / record_throttle / record_failure)
+- SemanticSearch: 캐시 히트, 실패 통계, 소요 시간 기록 후 metrics_callback 호출
+- VectorIndexRegistry: VectorIndex.embedding_metrics(JSON)에 저장
+"""
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+# 모델별 임베딩 가격 (USD / 1M input tokens)
+EMBEDDING_PRICES_PER_1M_TOKENS = {
+    "amazon.titan-embed-text-v1": 0.10,
+    "amazon.titan-embed-text-v2:0": 0.02,
+    "amazon.titan-embed-g1-text-02": 0.10,
+    "text-embedding-ada-002": 0.10,
+    "text-embedding-3-small": 0.02,
+    "text-embedding-3-large": 0.13,
+}
+
+
+def price_per_1m_tokens(model: str) -> Optional[float]:
+    """모델 토큰 가격 (EMBEDDING_COST_PER_1M_TOKENS 환경변수 우선)"""
+    override = os.environ.get('EMBEDDING_COST_PER_1M_TOKENS')
+    if override:
+        return float(override)
+    return EMBEDDING_PRICES_PER_1M_TOKENS.get(model)
+
+
+@dataclass
+class EmbeddingMetrics:
+    """임베딩 run 단위 지표"""
+    provider: str
+    model: str
+    texts: int = 0
+    requests: int = 0
+    failed_requests: int = 0
+    throttle_events: int = 0
+    tokens_embedded: int = 0
+    cache_hits: Dict[str, int] = field(default_factory=dict)
+    cache_misses: int = 0
+    failures: Dict[str, int] = field(default_factory=dict)
+    duration_seconds: float = 0.0
+    batch_sizes: List[int] = field(default_factory=list, repr=False)
+    latencies: List[float] = field(default_factory=list, repr=False)
+    started_at: float = field(default_factory=time.monotonic, repr=False)
+
+    # ------------------------------------------------------------------
+    # 기록 (AsyncEmbeddingEngine)
+    # ------------------------------------------------------------------
+
+    def record_request(self, batch_size: int, tokens: int, latency: float):
+        """성공한 요청 1회"""
+        self.requests += 1
+        self.batch_sizes.append(batch_size)
+        self.tokens_embedded += tokens
+        self.latencies.append(latency)
+
+    def record_throttle(self):
+        """Throttling으로 거절된 요청 1회"""
+        self.requests += 1
+        self.throttle_events += 1
+
+    def record_failure(self):
+        """영구 실패한 요청 1회"""
+        self.requests += 1
+        self.failed_requests += 1
+
+    def finish(self):
+        self.duration_seconds = time.monotonic() - self.started_at
+
+    # ------------------------------------------------------------------
+    # 집계
+    # ------------------------------------------------------------------
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return float(np.percentile(self.latencies, percentile))
+
+    @property
+    def estimated_cost_usd(self) -> Optional[float]:
+        price = price_per_1m_tokens(self.model)
+        if price is None:
+            return None
+        return self.tokens_embedded / 1_000_000 * price
+
+    @property
+    def throughput_texts_per_second(self) -> float:
+        if self.duration_seconds <= 0:
+            return 0.0
+        return self.texts / self.duration_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        cost = self.estimated_cost_usd
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "texts": self.texts,
+            "requests": self.requests,
+            "failed_requests": self.failed_requests,
+            "throttle_events": self.throttle_events,
+            "avg_batch_size": round(float(np.mean(self.batch_sizes)), 2) if self.batch_sizes else 0.0,
+            "max_batch_size": max(self.batch_sizes, default=0),
+            "tokens_embedded": self.tokens_embedded,
+            "cache_hits": dict(self.cache_hits),
+            "cache_misses": self.cache_misses,
+            "failures": dict(self.failures),
+            "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "duration_seconds": round(self.duration_seconds, 3),
+            "throughput_texts_per_second": round(self.throughput_texts_per_second, 2),
+            "estimated_cost_usd": round(cost, 6) if cost is not None else None
+        }
+
+    def summary(self) -> str:
+        """한 줄 요약 (로그용)"""
+        data = self.to_dict()
+        cost = f"${data['estimated_cost_usd']:.4f}" if data['estimated_cost_usd'] is not None else "n/a"
+        return (
+            f"{data['requests']} requests (avg batch {data['avg_batch_size']}), "
+            f"{data['tokens_embedded']} tokens, p50/p95 {data['latency_p50_ms']}/{data['latency_p95_ms']} ms, "
+            f"{data['throttle_events']} throttled, cache hits {data['cache_hits']}, cost {cost}"
+        )
@@ -0,0 +1,560 @@
+"""
+Graph-RAG v2: 샤드 단위 S3 임베딩 캐시
+
+임베딩을 키 하나당 S3 객체 하나(embeddings/{model}/{sha256}.npy)로 저장하면
+수백만 개의 작은 객체와 요청당 지연, PUT 비용이 발생합니다.
+이 모듈은 SHA-256 prefix 단위로 임베딩을 샤드 파일에 묶어 저장합니다.
+
+S3 Layout (prefix별 불변 part):
+    embeddings/{model}/shards/{prefix}/{time_ns}-{writer}.shard
+
+- flush()는 기존 part를 수정하지 않고 새 part를 PUT 하므로 여러 워커가 같은
+  prefix를 동시에 flush해도 서로의 행을 덮어쓰지 않음 (조건부 쓰기 불필요)
+- part 수가 max_parts를 넘으면 하나로 병합(compaction) 후 병합된 part만 삭제
+  (그 사이 다른 워커가 추가한 part는 그대로 유지)
+- 이전 버전의 단일 샤드 객체 shards/{prefix}.shard 도 part 하나로 읽음
+
+Part Layout (index를 파일 끝에 배치):
+    [row matrix: count x dim (float32|float16)]
+    [index JSON: {"dtype", "dim", "keys": [...]}]
+    [footer: matrix_bytes(u64) + index_bytes(u64) + MAGIC(8)]
+
+- 동기화는 prefix당 LIST 1회 + 로컬에 없는 part의 index만 ranged GET (파일 끝)
+- 행은 필요한 행 범위만 ranged GET (인접 행은 요청 1회로 병합),
+  요청 행이 part의 상당 부분이면 part 전체를 내려받아 로컬 memmap으로 전환
+- 직접 업로드했거나 이전 실행에서 내려받은 part는 로컬 사본을 np.memmap으로 읽음
+- S3 요청은 잠금 밖에서 수행 (동시 조회가 네트워크 I/O를 기다리지 않음)
+- 기존 per-object 레이아웃은 read_legacy=True일 때만 읽기 fallback (마이그레이션)
+"""
+import json
+import struct
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .embedding_cache import S3EmbeddingCache
+
+
+SHARD_MAGIC = b"SESHARD1"
+FOOTER = struct.Struct("<QQ8s")
+
+# index 조회 시 파일 끝에서 한 번에 읽는 크기 (부족하면 index 범위만 추가 GET)
+TAIL_READ_BYTES = 64 * 1024
+# 행 범위 병합 기준: 사이 간격이 이 크기 이하이면 요청 1회로 읽음
+RANGE_GAP_BYTES = 64 * 1024
+# 행 범위 요청 수가 이보다 많거나 요청 바이트가 part의 절반 이상이면 전체 다운로드
+MAX_RANGE_REQUESTS = 8
+
+
+def encode_shard(matrix: np.ndarray, keys: List[str]) -> bytes:
+    """행렬 + 키 인덱스를 샤드 바이트로 직렬화"""
+    matrix = np.ascontiguousarray(matrix)
+    index = json.dumps({
+        "dtype": matrix.dtype.name,
+        "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "keys": keys
+    }).encode("utf-8")
+    matrix_bytes = matrix.tobytes()
+    return matrix_bytes + index + FOOTER.pack(len(matrix_bytes), len(index), SHARD_MAGIC)
+
+
+def read_shard_footer(path: Path) -> Tuple[int, int]:
+    """샤드 파일 footer 파싱
+
+    Returns:
+        (matrix_bytes, index_bytes)
+
+    Raises:
+        ValueError: 샤드 형식이 아닌 경우
+    """
+    with open(path, "rb") as f:
+        f.seek(-FOOTER.size, 2)
+        matrix_bytes, index_bytes, magic = FOOTER.unpack(f.read(FOOTER.size))
+    if magic != SHARD_MAGIC:
+        raise ValueError(f"Invalid shard file: {path}")
+    return matrix_bytes, index_bytes
+
+
+class EmbeddingShard:
+    """로컬 샤드 파일을 memmap으로 연 읽기 전용 뷰"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.matrix_bytes, index_bytes = read_shard_footer(path)
+
+        with open(path, "rb") as f:
+            f.seek(self.matrix_bytes)
+            index = json.loads(f.read(index_bytes))
+
+        self.dtype = np.dtype(index["dtype"])
+        self.dim = index["dim"]
+        self.keys: List[str] = index["keys"]
+        self.rows: Dict[str, int] = {key: row for row, key in enumerate(self.keys)}
+
+        if self.keys:
+            self.matrix = np.memmap(
+                path, dtype=self.dtype, mode="r", offset=0,
+                shape=(len(self.keys), self.dim)
+            )
+        else:
+            self.matrix = np.zeros((0, self.dim), dtype=self.dtype)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        return np.asarray(self.matrix[row], dtype=np.float32)
+
+    def read_rows(self, rows: List[int]) -> np.ndarray:
+        """행 번호 목록의 행렬 (rows 순서)"""
+        return np.asarray(self.matrix[rows])
+
+
+class RemoteEmbeddingShard:
+    """S3 part를 ranged GET으로 읽는 뷰 (index만 선조회, 행은 필요할 때 읽음)
+
+    Raises:
+        ValueError: 샤드 형식이 아닌 경우 (생성 시)
+    """
+
+    def __init__(self, s3_client, bucket: str, object_key: str, size: int, local_path: Path):
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.object_key = object_key
+        self.size = size
+        self.local_path = local_path
+        self._local: Optional[EmbeddingShard] = None
+        self._download_lock = threading.Lock()
+
+        tail = self._get_range(max(0, size - TAIL_READ_BYTES), size - 1)
+        if len(tail) < FOOTER.size:
+            raise ValueError(f"Invalid shard part: {object_key}")
+        self.matrix_bytes, index_bytes, magic = FOOTER.unpack(tail[-FOOTER.size:])
+        if magic != SHARD_MAGIC:
+            raise ValueError(f"Invalid shard part: {object_key}")
+
+        index_end = len(tail) - FOOTER.size
+        if index_bytes <= index_end:
+            index_raw = tail[index_end - index_bytes:index_end]
+        else:
+            index_raw = self._get_range(self.matrix_bytes, self.matrix_bytes + index_bytes - 1)
+        index = json.loads(index_raw)
+
+        self.dtype = np.dtype(index["dtype"])
+        self.dim = index["dim"]
+        self.keys: List[str] = index["keys"]
+        self.rows: Dict[str, int] = {key: row for row, key in enumerate(self.keys)}
+        self.row_bytes = self.dim * self.dtype.itemsize
+
+    def _get_range(self, start: int, end: int) -> bytes:
+        response = self.s3.get_object(Bucket=self.bucket, Key=self.object_key, Range=f"bytes={start}-{end}")
+        return response["Body"].read()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        return np.asarray(self.read_rows([row])[0], dtype=np.float32)
+
+    def read_rows(self, rows: List[int]) -> np.ndarray:
+        """행 번호 목록의 행렬 (rows 순서, 인접 행은 ranged GET 1회로 병합)"""
+        if self._local is not None:
+            return self._local.read_rows(rows)
+        if not rows:
+            return np.zeros((0, self.dim), dtype=self.dtype)
+
+        # 간격이 RANGE_GAP_BYTES 이하인 행들을 [first, last] 범위 하나로 병합
+        gap_rows = max(1, RANGE_GAP_BYTES // max(self.row_bytes, 1))
+        ranges: List[List[int]] = []
+        for row in sorted(set(rows)):
+            if ranges and row - ranges[-1][1] <= gap_rows:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+
+        requested_bytes = sum((last - first + 1) * self.row_bytes for first, last in ranges)
+        if len(ranges) > MAX_RANGE_REQUESTS or requested_bytes * 2 >= self.matrix_bytes:
+            return self._download().read_rows(rows)
+
+        fetched: Dict[int, np.ndarray] = {}
+        for first, last in ranges:
+            raw = self._get_range(first * self.row_bytes, (last + 1) * self.row_bytes - 1)
+            block = np.frombuffer(raw, dtype=self.dtype).reshape(-1, self.dim)
+            for offset, vector in enumerate(block):
+                fetched[first + offset] = vector
+        return np.stack([fetched[row] for row in rows])
+
+    def _download(self) -> EmbeddingShard:
+        """part 전체를 로컬에 내려받아 memmap으로 전환 (다음 실행에서도 재사용)"""
+        with self._download_lock:
+            if self._local is None:
+                obj = self.s3.get_object(Bucket=self.bucket, Key=self.object_key)
+                self.local_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.local_path.with_suffix(f".{uuid.uuid4().hex[:12]}.tmp")
+                with open(tmp_path, "wb") as f:
+                    f.write(obj["Body"].read())
+                tmp_path.replace(self.local_path)
+                self._local = EmbeddingShard(self.local_path)
+            return self._local
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """전체 행렬 (compaction용, part 전체 다운로드)"""
+        return self._download().matrix
+
+
+ShardPart = Union[EmbeddingShard, RemoteEmbeddingShard]
+
+
+class EmbeddingShardSet:
+    """prefix 하나의 part 목록 (앞선 part 우선 조회)"""
+
+    def __init__(self, parts: List[Tuple[str, ShardPart]]):
+        """
+        Args:
+            parts: [(S3 object key, EmbeddingShard | RemoteEmbeddingShard)] (오래된 순)
+        """
+        self.parts = parts
+        self.dim = next((shard.dim for _, shard in parts if shard.keys), None)
+
+    @property
+    def keys(self) -> Dict[str, None]:
+        keys: Dict[str, None] = {}
+        for _, shard in self.parts:
+            keys.update(dict.fromkeys(shard.keys))
+        return keys
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """키 목록 조회 (part별 필요한 행만 한 번에 읽음)"""
+        found: Dict[str, np.ndarray] = {}
+        remaining = list(dict.fromkeys(keys))
+        for _, shard in list(self.parts):
+            if not remaining:
+                break
+            located = [(key, shard.rows[key]) for key in remaining if key in shard.rows]
+            if not located:
+                continue
+            matrix = shard.read_rows([row for _, row in located])
+            for (key, _), vector in zip(located, matrix):
+                found[key] = np.asarray(vector, dtype=np.float32)
+            remaining = [key for key in remaining if key not in found]
+        return found
+
+
+class ShardedS3EmbeddingCache:
+    """
+    SHA-256 prefix 단위 샤드 S3 캐시 (TieredEmbeddingCache의 S3 tier)
+
+    - get_many(): 필요한 prefix만 프로세스당 1회 동기화 (index만) 후 필요한 행만 조회,
+                  (read_legacy=True면) 샤드에 없는 키는 per-object 레이아웃에서 읽고 이관 예약
+    - put_many(): 메모리에 버퍼링, flush() 시 prefix당 새 part PUT 1회
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        s3_client,
+        bucket: str,
+        embedding_model: str,
+        local_dir: str,
+        prefix_length: int = 2,
+        dtype: str = "float32",
+        min_flush_rows: int = 256,
+        read_legacy: bool = False,
+        max_parts: int = 16
+    ):
+        """
+        Args:
+            s3_client: boto3 S3 클라이언트
+            bucket: S3 버킷
+            embedding_model: 임베딩 모델 ID (모델별로 샤드 분리)
+            local_dir: 샤드 로컬 저장 디렉토리
+            prefix_length: 샤드를 나누는 SHA-256 hex prefix 길이 (2 → 256 샤드)
+            dtype: 샤드 저장 dtype ("float32" | "float16")
+            min_flush_rows: flush() 시 실제 업로드를 수행하는 최소 버퍼 크기
+            read_legacy: per-object 레이아웃 fallback 조회 여부 (샤드 미스 키마다 GET 1회,
+                기존 캐시를 샤드로 이관하는 마이그레이션 기간에만 사용)
+            max_parts: prefix당 part 수 상한 (초과 시 flush에서 compaction)
+        """
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.embedding_model = embedding_model
+        self.prefix_length = prefix_length
+        self.dtype = np.dtype(dtype)
+        self.min_flush_rows = min_flush_rows
+        self.max_parts = max_parts
+        self.writer_id = uuid.uuid4().hex[:12]
+
+        self.local_dir = Path(local_dir) / "shards" / embedding_model.replace("/", "_")
+        self.local_dir.mkdir(parents=True, exist_ok=True)
+
+        self.legacy = S3EmbeddingCache(s3_client, bucket, embedding_model) if read_legacy else None
+
+        self._shards: Dict[str, EmbeddingShardSet] = {}
+        self._pending: Dict[str, Dict[str, np.ndarray]] = {}
+        # flush()가 업로드 중인 항목 (업로드 완료 전까지 조회 가능)
+        self._flushing: Dict[str, Dict[str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def _prefix(self, key: str) -> str:
+        return key[:self.prefix_length]
+
+    def _prefix_key(self, prefix: str) -> str:
+        return f"embeddings/{self.embedding_model}/shards/{prefix}"
+
+    def _local_path(self, object_key: str) -> Path:
+        # shards/{prefix}/{part}.shard → {local_dir}/{prefix}/{part}.shard
+        # shards/{prefix}.shard (이전 단일 샤드) → {local_dir}/{prefix}.shard
+        relative = object_key[len(f"embeddings/{self.embedding_model}/shards/"):]
+        return self.local_dir / relative
+
+    def _list_parts(self, prefix: str) -> List[Tuple[str, int]]:
+        """prefix의 part 목록 [(object key, size)] (오래된 순)"""
+        prefix_key = self._prefix_key(prefix)
+        legacy_key = f"{prefix_key}.shard"
+        parts = []
+        token = None
+        while True:
+            kwargs = {"Bucket": self.bucket, "Prefix": prefix_key}
+            if token:
+                kwargs["ContinuationToken"] = token
+            response = self.s3.list_objects_v2(**kwargs)
+            for obj in response.get("Contents", []):
+                key = obj["Key"]
+                if key == legacy_key or (key.startswith(f"{prefix_key}/") and key.endswith(".shard")):
+                    parts.append((key, obj["Size"]))
+            if not response.get("IsTruncated"):
+                break
+            token = response.get("NextContinuationToken")
+
+        # 이전 단일 샤드를 가장 먼저, part는 이름(time_ns) 순
+        parts.sort(key=lambda part: (part[0] != legacy_key, part[0]))
+        return parts
+
+    def _sync_shard(self, prefix: str) -> EmbeddingShardSet:
+        """prefix의 part 목록 (프로세스당 prefix별 1회 로드, S3 요청은 잠금 밖에서 수행)"""
+        with self._lock:
+            shard_set = self._shards.get(prefix)
+        if shard_set is not None:
+            return shard_set
+
+        shard_set = self._load_shard_set(prefix)
+        with self._lock:
+            # 동시에 로드한 다른 스레드의 결과가 있으면 그것을 사용
+            return self._shards.setdefault(prefix, shard_set)
+
+    def _load_shard_set(self, prefix: str) -> EmbeddingShardSet:
+        """
+        S3 part 목록을 로컬 사본과 대조하여 로드 (잠금 없이 호출)
+
+        part는 불변이므로 로컬에 같은 크기의 사본이 있으면 memmap으로 재사용하고,
+        없는 part는 index만 ranged GET 합니다. 원격에서 사라진 (병합된) part의 로컬 사본은 삭제합니다.
+        """
+        parts: List[Tuple[str, ShardPart]] = []
+        try:
+            listed = self._list_parts(prefix)
+            listed_paths = set()
+            for object_key, size in listed:
+                local_path = self._local_path(object_key)
+                listed_paths.add(local_path)
+                try:
+                    if local_path.exists() and local_path.stat().st_size == size:
+                        parts.append((object_key, EmbeddingShard(local_path)))
+                    else:
+                        parts.append((object_key, RemoteEmbeddingShard(
+                            self.s3, self.bucket, object_key, size, local_path
+                        )))
+                except self.s3.exceptions.NoSuchKey:
+                    # LIST 이후 다른 워커의 compaction으로 삭제됨
+                    continue
+                except ValueError as e:
+                    print(f"⚠️  Skipping invalid shard part ({object_key}): {e}")
+
+            part_dir = self.local_dir / prefix
+            if part_dir.exists():
+                for stale in part_dir.glob("*.shard"):
+                    if stale not in listed_paths:
+                        stale.unlink(missing_ok=True)
+
+        except Exception as e:
+            print(f"⚠️  Shard read error ({self._prefix_key(prefix)}): {e}")
+
+        return EmbeddingShardSet(parts)
+
+    def _write_local(self, local_path: Path, parts: List[bytes]):
+        """임시 파일에 쓰고 rename (memmap 중인 reader 보호)"""
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = local_path.with_suffix(f".{self.writer_id}.tmp")
+        with open(tmp_path, "wb") as f:
+            for part in parts:
+                f.write(part)
+        tmp_path.replace(local_path)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        by_prefix: Dict[str, List[str]] = {}
+
+        with self._lock:
+            for key in keys:
+                prefix = self._prefix(key)
+                pending = self._pending.get(prefix, {}).get(key)
+                if pending is None:
+                    pending = self._flushing.get(prefix, {}).get(key)
+                if pending is not None:
+                    found[key] = pending
+                else:
+                    by_prefix.setdefault(prefix, []).append(key)
+
+        # S3 동기화/행 조회는 잠금 밖에서 (다른 스레드의 조회/버퍼링을 막지 않음)
+        missing: List[str] = []
+        for prefix, prefix_keys in by_prefix.items():
+            try:
+                prefix_found = self._sync_shard(prefix).get_many(prefix_keys)
+            except Exception as e:
+                # 조회 중 compaction으로 part가 삭제된 경우 등: 다음 조회에서 다시 LIST
+                print(f"⚠️  Shard read error ({self._prefix_key(prefix)}): {e}")
+                with self._lock:
+                    self._shards.pop(prefix, None)
+                prefix_found = {}
+            found.update(prefix_found)
+            missing.extend(key for key in prefix_keys if key not in prefix_found)
+
+        # per-object 레이아웃 fallback → 샤드로 이관 예약
+        if missing and self.legacy:
+            legacy_found = self.legacy.get_many(missing)
+            if legacy_found:
+                found.update(legacy_found)
+                self.put_many(legacy_found)
+
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        with self._lock:
+            for key, embedding in items.items():
+                self._pending.setdefault(self._prefix(key), {})[key] = embedding
+
+    def pending_count(self) -> int:
+        return sum(len(items) for items in self._pending.values())
+
+    def flush(self, force: bool = False) -> int:
+        """
+        버퍼링된 임베딩을 샤드로 업로드 (prefix당 새 part PUT 1회)
+
+        업로드 중인 항목은 _flushing으로 옮겨 조회에 계속 보이게 하고,
+        S3 요청은 버퍼 잠금 밖에서 수행합니다 (flush끼리는 _flush_lock으로 직렬화).
+
+        Args:
+            force: min_flush_rows 미만이어도 업로드
+
+        Returns:
+            업로드한 임베딩 수
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending or (not force and self.pending_count() < self.min_flush_rows):
+                    return 0
+                self._flushing, self._pending = self._pending, {}
+
+            flushed = 0
+            failed: Dict[str, Dict[str, np.ndarray]] = {}
+            for prefix, items in self._flushing.items():
+                try:
+                    flushed += self._flush_shard(prefix, items)
+                except Exception as e:
+                    print(f"⚠️  Shard write error ({self._prefix_key(prefix)}): {e}")
+                    failed[prefix] = items
+
+            with self._lock:
+                # 실패한 prefix는 다음 flush에서 재시도 (그 사이 새로 버퍼링된 항목 우선)
+                for prefix, items in failed.items():
+                    self._pending[prefix] = {**items, **self._pending.get(prefix, {})}
+                self._flushing = {}
+
+        if flushed:
+            print(f"✅ Flushed {flushed} embeddings to S3 shards")
+        return flushed
+
+    def _new_part_key(self, prefix: str) -> str:
+        return f"{self._prefix_key(prefix)}/{time.time_ns():020d}-{self.writer_id}.shard"
+
+    def _put_part(self, prefix: str, matrix: np.ndarray, keys: List[str]) -> Tuple[str, ShardPart]:
+        """새 불변 part 업로드 + 로컬 사본 저장"""
+        object_key = self._new_part_key(prefix)
+        body = encode_shard(matrix, keys)
+        self.s3.put_object(Bucket=self.bucket, Key=object_key, Body=body)
+
+        local_path = self._local_path(object_key)
+        self._write_local(local_path, [body])
+        return object_key, EmbeddingShard(local_path)
+
+    def _flush_shard(self, prefix: str, items: Dict[str, np.ndarray]) -> int:
+        """기존 part에 없는 행만 새 part로 업로드"""
+        # 다른 워커가 추가한 행과 중복 저장하지 않도록 업로드 직전 재동기화
+        shard_set = self._load_shard_set(prefix)
+        with self._lock:
+            self._shards[prefix] = shard_set
+
+        existing_rows = shard_set.keys
+        new_items = [(key, vec) for key, vec in items.items() if key not in existing_rows]
+        if not new_items:
+            return 0
+
+        dim = shard_set.dim or len(new_items[0][1])
+        new_items = [(key, vec) for key, vec in new_items if len(vec) == dim]
+        if not new_items:
+            return 0
+
+        matrix = np.stack([vec for _, vec in new_items]).astype(self.dtype)
+        shard_set.parts.append(self._put_part(prefix, matrix, [key for key, _ in new_items]))
+        shard_set.dim = dim
+
+        if len(shard_set.parts) > self.max_parts:
+            self._compact(prefix, shard_set)
+        return len(new_items)
+
+    def _compact(self, prefix: str, shard_set: EmbeddingShardSet):
+        """현재 part들을 하나로 병합 후 병합된 part만 삭제
+
+        병합 중 다른 워커가 추가한 part는 목록에 없으므로 삭제되지 않습니다.
+        """
+        keys: List[str] = []
+        rows: List[np.ndarray] = []
+        seen = set()
+        for _, shard in shard_set.parts:
+            if shard.dim != shard_set.dim:
+                continue
+            matrix = shard.matrix
+            for row, key in enumerate(shard.keys):
+                if key not in seen:
+                    seen.add(key)
+                    keys.append(key)
+                    rows.append(np.asarray(matrix[row], dtype=self.dtype))
+        if not keys:
+            return
+
+        merged = self._put_part(prefix, np.stack(rows), keys)
+        merged_keys = [object_key for object_key, _ in shard_set.parts]
+        for start in range(0, len(merged_keys), 1000):
+            self.s3.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in merged_keys[start:start + 1000]]}
+            )
+        for object_key, _ in shard_set.parts:
+            self._local_path(object_key).unlink(missing_ok=True)
+
+        shard_set.parts = [merged]
+        print(f"🧹 Compacted {len(merged_keys)} shard parts ({self._prefix_key(prefix)})")
+
+    def close(self):
+        self.flush(force=True)
+        if self.legacy:
+            self.legacy.close()
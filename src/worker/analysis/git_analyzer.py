@@ -1,9 +1,40 @@
+import json
+import os
+import re
 import subprocess
 import tempfile
 import shutil
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Optional
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+
+from .blame_engine import PATHSPEC_CHUNK_SIZE, BlameEngine
+from .repo_cache import RepositoryMirrorCache
+
+if TYPE_CHECKING:
+    from .commit_store import CommitStatsStore
+
+
+# git log 커밋 헤더 구분자 (RS) / 필드 구분자 (US)
+_RECORD_SEP = "\x1e"
+_FIELD_SEP = "\x1f"
+_LOG_FORMAT = f"--pretty=format:{_RECORD_SEP}%H{_FIELD_SEP}%an{_FIELD_SEP}%ae{_FIELD_SEP}%at"
+
+# numstat rename 표기: "dir/{old => new}/file" 또는 "old => new"
+_BRACE_RENAME = re.compile(r"\{([^{}]*) => ([^{}]*)\}")
+
+
+@dataclass
+class CommitRecord:
+    """커밋 단위 numstat 기록"""
+    commit_hash: str
+    author_name: str
+    author_email: str
+    timestamp: int
+    added_lines: int = 0
+    deleted_lines: int = 0
+    files: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -14,6 +45,108 @@ class ContributionStats:
     deleted_lines: int
     commits: int
     files_changed: int
+    commit_records: List[CommitRecord] = field(default_factory=list)
+
+
+@dataclass
+class AuthorContribution:
+    """저자 identity ("name <email>") 단위 히스토리 통계"""
+    author_name: str
+    author_email: str
+    commits: int = 0
+    added_lines: int = 0
+    deleted_lines: int = 0
+    files: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ContributionIndex:
+    """HEAD 커밋 기준 전체 저자 기여도 테이블
+
+    authors: identity("name <email>") → 히스토리 통계
+    blame_lines: 저자명 → HEAD 트리에서 해당 저자가 소유한 라인 수
+    """
+    head_commit: str
+    authors: Dict[str, AuthorContribution] = field(default_factory=dict)
+    blame_lines: Dict[str, int] = field(default_factory=dict)
+
+    def lookup(self, target_user: str) -> ContributionStats:
+        """사용자 기여도 조회 (analyze_contributions와 동일한 매칭 규칙)
+
+        히스토리 통계는 git log --author처럼 "name <email>"에 대한 패턴 검색으로,
+        blame 라인은 저자명 일치로 집계합니다. commit_records는 포함되지 않습니다.
+        """
+        matches = _author_matcher(target_user)
+
+        files = set()
+        commits = added_lines = deleted_lines = 0
+        for identity, author in self.authors.items():
+            if not matches(identity):
+                continue
+            commits += author.commits
+            added_lines += author.added_lines
+            deleted_lines += author.deleted_lines
+            files.update(author.files)
+
+        return ContributionStats(
+            total_lines=self.blame_lines.get(target_user, 0),
+            added_lines=added_lines,
+            deleted_lines=deleted_lines,
+            commits=commits,
+            files_changed=len(files)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "head_commit": self.head_commit,
+            "authors": {identity: vars(author) for identity, author in self.authors.items()},
+            "blame_lines": self.blame_lines
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ContributionIndex":
+        return cls(
+            head_commit=data["head_commit"],
+            authors={identity: AuthorContribution(**author) for identity, author in data["authors"].items()},
+            blame_lines=data["blame_lines"]
+        )
+
+
+def _author_matcher(target_user: str) -> Callable[[str], bool]:
+    """git log --author와 같은 "name <email>" 패턴 검색 함수"""
+    try:
+        return re.compile(target_user).search
+    except re.error:
+        return lambda identity: target_user in identity
+
+
+def _aggregate_authors(records: Iterable[CommitRecord]) -> Dict[str, AuthorContribution]:
+    """커밋 기록 → 저자 identity ("name <email>") 단위 집계"""
+    authors: Dict[str, AuthorContribution] = {}
+    author_files: Dict[str, set] = {}
+    for record in records:
+        identity = f"{record.author_name} <{record.author_email}>"
+        author = authors.get(identity)
+        if author is None:
+            author = authors[identity] = AuthorContribution(record.author_name, record.author_email)
+            author_files[identity] = set()
+        author.commits += 1
+        author.added_lines += record.added_lines
+        author.deleted_lines += record.deleted_lines
+        author_files[identity].update(record.files)
+
+    for identity, author in authors.items():
+        author.files = sorted(author_files[identity])
+    return authors
+
+
+def _numstat_path(path: str) -> str:
+    """numstat 경로의 rename 표기를 새 경로로 변환"""
+    if " => " not in path:
+        return path
+    if "{" in path:
+        return _BRACE_RENAME.sub(lambda match: match.group(2), path).replace("//", "/")
+    return path.split(" => ", 1)[1]
 
 
 class GitAnalyzer:
@@ -22,19 +155,52 @@ class GitAnalyzer:
     Celery/AWS Batch 환경과 독립적인 순수 분석 로직
     """
 
-    def __init__(self, work_dir: Optional[Path] = None):
+    # HEAD 커밋 → ContributionIndex (프로세스 내 LRU, 같은 워커의 후속 태스크 재사용)
+    _index_cache: "OrderedDict[str, ContributionIndex]" = OrderedDict()
+    _index_cache_size = 16
+
+    def __init__(
+        self,
+        work_dir: Optional[Path] = None,
+        contribution_cache_dir: Optional[Path] = None,
+        blame_engine: Optional[BlameEngine] = None,
+        mirror_cache: Optional[RepositoryMirrorCache] = None,
+        commit_store: Optional["CommitStatsStore"] = None
+    ):
         """
         Args:
             work_dir: 작업 디렉토리 (None이면 임시 디렉토리 생성)
+            contribution_cache_dir: 전체 저자 기여도 인덱스 디스크 캐시 디렉토리
+                (None이면 프로세스 메모리 캐시만 사용)
+            blame_engine: blame 라인 집계 엔진 (None이면 기본 설정 BlameEngine)
+            mirror_cache: bare 미러 캐시 (설정 시 클론 대신 fetch + worktree 사용)
+            commit_store: 커밋 numstat 저장소 (설정 시 last_hash..HEAD 범위만 git log 처리)
         """
         self.work_dir = work_dir or Path(tempfile.mkdtemp())
-
-    def clone_repository(self, repo_url: str, branch: str = "main") -> Path:
+        self.contribution_cache_dir = Path(contribution_cache_dir) if contribution_cache_dir else None
+        self.blame_engine = blame_engine or BlameEngine()
+        self.mirror_cache = mirror_cache
+        self.commit_store = commit_store
+        # 클론 경로 → 브랜치 (commit_store 키)
+        self._branches: Dict[Path, str] = {}
+
+    def clone_repository(
+        self,
+        repo_url: str,
+        branch: str = "main",
+        clone_filter: Optional[str] = None,
+        sparse_extensions: Optional[Iterable[str]] = None
+    ) -> Path:
         """저장소 클론
 
         Args:
             repo_url: GitHub 저장소 URL
             branch: 클론할 브랜치
+            clone_filter: partial clone 필터 (None이면 전체 클론)
+                - "blob:none": 커밋/트리만 받고 blob은 필요 시 fetch (기여도/그래프 분석)
+                - "tree:0": 커밋만 받음 (커밋 메타데이터만 읽는 단계 전용)
+            sparse_extensions: 작업 트리에 체크아웃할 확장자 목록
+                (예: GraphLoader.LANGUAGE_PARSERS.keys(), None이면 전체 체크아웃)
 
         Returns:
             클론된 저장소 경로
@@ -45,6 +211,22 @@ class GitAnalyzer:
         repo_name = repo_url.rstrip('/').split('/')[-1].replace('.git', '')
         repo_path = self.work_dir / repo_name
 
+        self._branches[repo_path] = branch
+        if self.mirror_cache is not None:
+            return self.mirror_cache.checkout(
+                repo_url,
+                branch,
+                repo_path,
+                clone_filter=clone_filter,
+                sparse_extensions=sparse_extensions
+            )
+
+        clone_args = ["git", "clone", "--branch", branch, "--single-branch"]
+        if clone_filter:
+            clone_args.append(f"--filter={clone_filter}")
+        if sparse_extensions is not None:
+            clone_args.append("--no-checkout")
+
         try:
             # 이미 존재하면 삭제
             if repo_path.exists():
@@ -52,140 +234,616 @@ class GitAnalyzer:
 
             # Git clone 실행
             subprocess.run(
-                ["git", "clone", "--branch", branch, "--single-branch", repo_url, str(repo_path)],
+                clone_args + [repo_url, str(repo_path)],
                 check=True,
                 capture_output=True,
                 text=True
             )
+
+            if sparse_extensions is not None:
+                # 확장자 패턴은 cone 모드로 표현할 수 없으므로 non-cone 패턴 사용
+                patterns = [f"*{ext}" for ext in sparse_extensions]
+                subprocess.run(
+                    ["git", "sparse-checkout", "set", "--no-cone", *patterns],
+                    cwd=repo_path,
+                    check=True,
+                    capture_output=True,
+                    text=True
+                )
+                # partial clone이면 체크아웃 대상 blob만 한 번에 fetch
+                subprocess.run(
+                    ["git", "checkout", branch],
+                    cwd=repo_path,
+                    check=True,
+                    capture_output=True,
+                    text=True
+                )
             return repo_path
 
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Failed to clone repository: {e.stderr}")
 
-    def analyze_contributions(self, repo_path: Path, target_user: str) -> ContributionStats:
-        """특정 사용자의 기여도 분석
+    def get_partial_clone_filter(self, repo_path: Path) -> Optional[str]:
+        """partial clone 필터 (전체 클론이면 None)"""
+        result = subprocess.run(
+            ["git", "config", "--get", "remote.origin.partialclonefilter"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True
+        )
+        return result.stdout.strip() or None
+
+    def prefetch_blobs(
+        self,
+        repo_path: Path,
+        log_args: Optional[List[str]] = None,
+        paths: Optional[Set[str]] = None,
+        revision: str = "HEAD"
+    ) -> int:
+        """partial clone에서 diff/blame에 필요한 blob을 요청 1회로 미리 fetch
+
+        git은 누락된 blob을 발견할 때마다 개별 fetch하므로 (numstat은 커밋 단위,
+        blame/ls-files --eol은 blob 단위 왕복) 분석 전에 필요한 blob을 모아 받습니다.
 
         Args:
             repo_path: Git 저장소 경로
-            target_user: 분석할 GitHub 사용자명
+            log_args: 대상 커밋 제한 인자 (예: ["--author=..."])
+            paths: 대상 파일 제한 (None이면 모든 파일)
+            revision: 대상 리비전 범위 (예: "abc123..HEAD")
 
         Returns:
-            ContributionStats: 기여도 통계
+            fetch한 blob 수 (blob 필터 partial clone이 아니면 0)
 
         Raises:
             RuntimeError: Git 명령 실패 시
         """
+        clone_filter = self.get_partial_clone_filter(repo_path)
+        # tree 필터 클론은 트리 자체가 없어 raw diff 계산에 lazy fetch가 필요하므로 제외
+        if not clone_filter or not clone_filter.startswith("blob:"):
+            return 0
+
         try:
-            # 커밋 수 계산
-            commits_result = subprocess.run(
-                ["git", "log", f"--author={target_user}", "--oneline"],
+            # --raw는 blob 내용 없이 트리만으로 변경 blob ID를 출력
+            raw_log = subprocess.run(
+                ["git", "-c", "core.quotepath=off", "log", "--raw", "--no-abbrev", "--no-renames",
+                 "--format=", "-z", *(log_args or []), revision],
                 cwd=repo_path,
+                check=True,
                 capture_output=True,
-                text=True,
-                check=True
+                text=True
             )
-            commits = len(commits_result.stdout.strip().split('\n')) if commits_result.stdout.strip() else 0
-
-            # 변경된 파일 수 계산
-            files_result = subprocess.run(
-                ["git", "log", f"--author={target_user}", "--name-only", "--pretty=format:"],
+            # blob ID → 경로 (범위 밖 blob 확인 시 트리 순회를 경로로 제한)
+            needed: Dict[str, Set[str]] = {}
+            fields = raw_log.stdout.lstrip('\n').split('\0')
+            for meta, path in zip(fields[0::2], fields[1::2]):
+                if paths is not None and path not in paths:
+                    continue
+                # ":<old_mode> <new_mode> <old_sha> <new_sha> <status>"
+                for blob_sha in meta.split()[2:4]:
+                    if blob_sha.strip('0'):
+                        needed.setdefault(blob_sha, set()).add(path)
+            if not needed:
+                return 0
+
+            # 로컬에 없는 객체만 (--missing=print는 lazy fetch 없이 누락 객체를 "?"로 출력)
+            # git log와 같은 리비전 범위만 순회
+            visited, missing = self._missing_objects(repo_path, [revision], needed)
+
+            # "last..HEAD" 범위의 수정 전 blob은 경계 커밋 트리에만 있으므로
+            # 경계 커밋 트리에서 해당 경로만 순회
+            leftover_paths = sorted({
+                path for blob_sha, blob_paths in needed.items()
+                if blob_sha not in visited
+                for path in blob_paths
+            })
+            if leftover_paths:
+                boundary = subprocess.run(
+                    ["git", "rev-list", "--boundary", revision],
+                    cwd=repo_path,
+                    check=True,
+                    capture_output=True,
+                    text=True
+                )
+                boundary_trees = [
+                    f"{line[1:]}^{{tree}}" for line in boundary.stdout.split('\n')
+                    if line.startswith('-')
+                ]
+                if boundary_trees:
+                    for start in range(0, len(leftover_paths), PATHSPEC_CHUNK_SIZE):
+                        _, boundary_missing = self._missing_objects(
+                            repo_path,
+                            [*boundary_trees, "--", *leftover_paths[start:start + PATHSPEC_CHUNK_SIZE]],
+                            needed
+                        )
+                        missing.update(boundary_missing)
+            if not missing:
+                return 0
+            missing = sorted(missing)
+
+            # git의 lazy fetch와 같은 방식의 객체 ID 지정 fetch (요청 1회)
+            subprocess.run(
+                ["git", "-c", "fetch.negotiationAlgorithm=noop", "fetch", "origin",
+                 "--no-tags", "--no-write-fetch-head", "--recurse-submodules=no",
+                 f"--filter={clone_filter}", "--stdin"],
                 cwd=repo_path,
+                input="\n".join(missing) + "\n",
+                check=True,
                 capture_output=True,
-                text=True,
-                check=True
+                text=True
             )
-            files_changed = len(set(filter(None, files_result.stdout.strip().split('\n'))))
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to prefetch blobs: {e.stderr}")
 
-            # 추가/삭제된 라인 수 계산
-            stats_result = subprocess.run(
-                ["git", "log", f"--author={target_user}", "--numstat", "--pretty=format:"],
-                cwd=repo_path,
-                capture_output=True,
-                text=True,
-                check=True
-            )
+        print(f"✅ Prefetched {len(missing)} blobs for partial clone")
+        return len(missing)
+
+    @staticmethod
+    def _missing_objects(
+        repo_path: Path,
+        rev_list_args: List[str],
+        wanted: Iterable[str]
+    ) -> Tuple[Set[str], Set[str]]:
+        """rev-list 순회 범위 안에서 wanted 객체의 (순회된 ID, 누락된 ID)
 
-            added_lines = 0
-            deleted_lines = 0
+        Raises:
+            subprocess.CalledProcessError: git rev-list 실패 시
+        """
+        result = subprocess.run(
+            ["git", "--literal-pathspecs", "rev-list", "--objects", "--missing=print", *rev_list_args],
+            cwd=repo_path,
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        visited, missing = set(), set()
+        for line in result.stdout.split('\n'):
+            if not line:
+                continue
+            object_id = line.lstrip('?').split(' ', 1)[0]
+            if object_id not in wanted:
+                continue
+            visited.add(object_id)
+            if line.startswith('?'):
+                missing.add(object_id)
+        return visited, missing
+
+    def analyze_contributions(
+        self,
+        repo_path: Path,
+        target_user: str,
+        use_index: bool = False
+    ) -> ContributionStats:
+        """특정 사용자의 기여도 분석
+
+        Args:
+            repo_path: Git 저장소 경로
+            target_user: 분석할 GitHub 사용자명
+            use_index: True면 HEAD 커밋 단위 전체 저자 인덱스에서 조회
+                (같은 저장소의 여러 사용자 분석 시 히스토리/blame 1회만 수행,
+                commit_records는 비어 있음)
 
-            for line in stats_result.stdout.strip().split('\n'):
-                if not line:
+        Returns:
+            ContributionStats: 기여도 통계
+
+        Raises:
+            RuntimeError: Git 명령 실패 시
+        """
+        if use_index:
+            return self.build_contribution_index(repo_path).lookup(target_user)
+
+        commit_records = None
+        if self.commit_store is not None:
+            # 저장된 커밋 기록 (새 커밋만 git log로 추가)
+            # 조회 시점에 다른 워커가 HEAD를 바꿨다면 None → git log로 대체
+            repo_key = self.sync_commit_store(repo_path)
+            head_commit = self.get_head_commit(repo_path)
+            authors = self.commit_store.author_contributions(repo_key, head_commit)
+            if authors is not None:
+                matches = _author_matcher(target_user)
+                identities = [
+                    (author.author_name, author.author_email)
+                    for identity, author in authors.items()
+                    if matches(identity)
+                ]
+                commit_records = self.commit_store.commit_records(repo_key, identities, head_commit)
+
+        if commit_records is None:
+            # git log 1회 (--numstat + 커밋 헤더)로 커밋 수/파일/라인 통계를 함께 집계
+            self.prefetch_blobs(repo_path, [f"--author={target_user}"])
+            commit_records = list(self.iter_commit_log(repo_path, [f"--author={target_user}"]))
+
+        files = set()
+        added_lines = 0
+        deleted_lines = 0
+        for record in commit_records:
+            files.update(record.files)
+            added_lines += record.added_lines
+            deleted_lines += record.deleted_lines
+
+        # git blame으로 현재 코드베이스에서 해당 사용자가 작성한 라인 수 계산
+        # (대상 저자가 한 번도 수정하지 않은 파일은 blame 대상에서 제외,
+        #  이후 다른 사용자가 rename/이동한 파일은 HEAD 경로로 추적)
+        blame_candidates = self._follow_renames(repo_path, files)
+        self.prefetch_blobs(repo_path, paths=blame_candidates)
+        total_lines = self._count_blame_lines(repo_path, target_user, blame_candidates)
+
+        return ContributionStats(
+            total_lines=total_lines,
+            added_lines=added_lines,
+            deleted_lines=deleted_lines,
+            commits=len(commit_records),
+            files_changed=len(files),
+            commit_records=commit_records
+        )
+
+    def iter_commit_log(self, repo_path: Path, extra_args: Optional[List[str]] = None) -> Iterator[CommitRecord]:
+        """git log --numstat 출력을 파이프에서 스트리밍 파싱
+
+        커밋마다 헤더(RS + hash/author/email/timestamp) 뒤에 numstat 라인이 이어지는
+        형식을 한 번의 히스토리 순회로 읽습니다.
+
+        Args:
+            repo_path: Git 저장소 경로
+            extra_args: 추가 git log 인자 (예: ["--author=alice"], ["abc..HEAD"])
+
+        Yields:
+            CommitRecord (git log 순서: 최신 커밋부터)
+
+        Raises:
+            RuntimeError: Git 명령 실패 시
+        """
+        command = ["git", "-c", "core.quotepath=off", "log", "--numstat", _LOG_FORMAT] + list(extra_args or [])
+        process = subprocess.Popen(
+            command,
+            cwd=repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace"
+        )
+
+        record: Optional[CommitRecord] = None
+        completed = False
+        try:
+            for line in process.stdout:
+                line = line.rstrip("\n")
+                if line.startswith(_RECORD_SEP):
+                    if record is not None:
+                        yield record
+                    commit_hash, author_name, author_email, timestamp = line[1:].split(_FIELD_SEP)
+                    record = CommitRecord(commit_hash, author_name, author_email, int(timestamp))
                     continue
-                parts = line.split('\t')
-                if len(parts) >= 2:
-                    try:
-                        added_lines += int(parts[0])
-                        deleted_lines += int(parts[1])
-                    except ValueError:
-                        # Binary 파일 등은 숫자가 아닐 수 있음
-                        continue
-
-            # git blame으로 현재 코드베이스에서 해당 사용자가 작성한 라인 수 계산
-            total_lines = self._count_blame_lines(repo_path, target_user)
-
-            return ContributionStats(
-                total_lines=total_lines,
-                added_lines=added_lines,
-                deleted_lines=deleted_lines,
-                commits=commits,
-                files_changed=files_changed
-            )
 
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Failed to analyze contributions: {e.stderr}")
+                parts = line.split("\t", 2)
+                if record is None or len(parts) != 3:
+                    continue
 
-    def _count_blame_lines(self, repo_path: Path, target_user: str) -> int:
+                record.files.append(_numstat_path(parts[2]))
+                # Binary 파일은 "-\t-"로 표시됨 (파일 수에는 포함, 라인 수는 제외)
+                if parts[0] != "-":
+                    record.added_lines += int(parts[0])
+                    record.deleted_lines += int(parts[1])
+
+            if record is not None:
+                yield record
+            completed = True
+        finally:
+            if not completed:
+                # 소비자가 중간에 멈춘 경우 (generator close)
+                process.kill()
+            process.stdout.close()
+            stderr = process.stderr.read()
+            process.stderr.close()
+            returncode = process.wait()
+
+        if returncode != 0:
+            raise RuntimeError(f"Failed to analyze contributions: {stderr}")
+
+    def _count_blame_lines(
+        self,
+        repo_path: Path,
+        target_user: str,
+        candidate_files: Optional[Set[str]] = None
+    ) -> int:
         """git blame을 사용하여 현재 코드베이스에서 해당 사용자가 작성한 라인 수 계산
 
         Args:
             repo_path: Git 저장소 경로
             target_user: 분석할 사용자명
+            candidate_files: blame할 파일 후보 (None이면 모든 텍스트 파일)
 
         Returns:
             해당 사용자가 작성한 라인 수
         """
+        return self.blame_engine.count_lines(repo_path, candidate_files).get(target_user, 0)
+
+    def get_repo_key(self, repo_path: Path) -> str:
+        """저장소 식별자 "origin URL#브랜치" (URL이 없으면 로컬 경로)
+
+        브랜치는 clone_repository()에 전달된 값, 없으면 현재 체크아웃된 브랜치입니다.
+        """
+        url = subprocess.run(
+            ["git", "config", "--get", "remote.origin.url"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True
+        ).stdout.strip() or str(Path(repo_path).resolve())
+
+        branch = self._branches.get(Path(repo_path))
+        if branch is None:
+            branch = subprocess.run(
+                ["git", "symbolic-ref", "--short", "-q", "HEAD"],
+                cwd=repo_path,
+                capture_output=True,
+                text=True
+            ).stdout.strip() or "HEAD"
+        return f"{url}#{branch}"
+
+    def sync_commit_store(self, repo_path: Path) -> str:
+        """커밋 numstat 저장소를 현재 HEAD까지 갱신
+
+        저장된 HEAD가 현재 HEAD의 조상이면 last_hash..HEAD 범위만 읽어 추가하고,
+        아니면 (force-push, 히스토리 재작성) 전체 히스토리로 재구축합니다.
+
+        Args:
+            repo_path: Git 저장소 경로
+
+        Returns:
+            저장소 식별자 (commit_store 조회 키)
+
+        Raises:
+            RuntimeError: Git 명령 실패 시
+        """
+        repo_key = self.get_repo_key(repo_path)
+        head_commit = self.get_head_commit(repo_path)
+        last_commit = self.commit_store.get_head(repo_key)
+
+        if last_commit == head_commit:
+            return repo_key
+
+        if last_commit is not None and self._is_ancestor(repo_path, last_commit, head_commit):
+            revision = f"{last_commit}..{head_commit}"
+            self.prefetch_blobs(repo_path, revision=revision)
+            count = self.commit_store.append(repo_key, self.iter_commit_log(repo_path, [revision]), head_commit)
+            print(f"🔁 Commit store updated: {count} new commits since {last_commit[:12]}")
+            return repo_key
+
+        if last_commit is not None:
+            print(f"⚠️ {last_commit[:12]} is not an ancestor of HEAD (history rewritten), rebuilding commit store")
+        self.prefetch_blobs(repo_path)
+        count = self.commit_store.replace(repo_key, self.iter_commit_log(repo_path), head_commit)
+        print(f"✅ Commit store built: {count} commits")
+        return repo_key
+
+    def _is_ancestor(self, repo_path: Path, ancestor: str, commit: str) -> bool:
+        """ancestor가 commit의 조상인지 (객체가 없으면 False)"""
+        result = subprocess.run(
+            ["git", "merge-base", "--is-ancestor", ancestor, commit],
+            cwd=repo_path,
+            capture_output=True,
+            text=True
+        )
+        return result.returncode == 0
+
+    def get_head_commit(self, repo_path: Path) -> str:
+        """HEAD 커밋 해시"""
         try:
-            # 모든 추적되는 파일 목록 가져오기
-            files_result = subprocess.run(
-                ["git", "ls-files"],
+            result = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
                 cwd=repo_path,
+                check=True,
                 capture_output=True,
-                text=True,
-                check=True
+                text=True
             )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to resolve HEAD: {e.stderr}")
+        return result.stdout.strip()
 
-            total_lines = 0
-            for file_path in files_result.stdout.strip().split('\n'):
-                if not file_path:
-                    continue
+    def build_contribution_index(self, repo_path: Path) -> ContributionIndex:
+        """전체 저자 기여도 인덱스 (HEAD 커밋 해시 단위 캐시)
+
+        캐시 미스 시 git log --numstat 1회 + 저장소 blame 1회로 모든 저자의
+        커밋/라인/파일/blame 라인을 집계합니다. 이후 사용자별 조회는 lookup()
+        딕셔너리 조회입니다.
 
-                try:
-                    # git blame으로 각 파일 분석
-                    blame_result = subprocess.run(
-                        ["git", "blame", "--line-porcelain", file_path],
-                        cwd=repo_path,
-                        capture_output=True,
-                        text=True,
-                        check=True
+        Args:
+            repo_path: Git 저장소 경로
+
+        Returns:
+            ContributionIndex
+
+        Raises:
+            RuntimeError: Git 명령 실패 시
+        """
+        head_commit = self.get_head_commit(repo_path)
+
+        index = self._load_contribution_index(head_commit)
+        if index is not None:
+            return index
+
+        authors = None
+        if self.commit_store is not None:
+            authors = self.commit_store.author_contributions(self.sync_commit_store(repo_path), head_commit)
+        if authors is None:
+            self.prefetch_blobs(repo_path)
+            authors = _aggregate_authors(self.iter_commit_log(repo_path))
+
+        index = ContributionIndex(
+            head_commit=head_commit,
+            authors=authors,
+            blame_lines=self.blame_engine.count_lines(repo_path)
+        )
+        self._store_contribution_index(index)
+        print(f"✅ Contribution index built for {head_commit[:12]}: {len(authors)} authors")
+        return index
+
+    def _contribution_index_path(self, head_commit: str) -> Optional[Path]:
+        if self.contribution_cache_dir is None:
+            return None
+        return self.contribution_cache_dir / f"{head_commit}.json"
+
+    def _load_contribution_index(self, head_commit: str) -> Optional[ContributionIndex]:
+        """메모리 → 디스크 순서로 캐시 조회"""
+        cache = GitAnalyzer._index_cache
+        if head_commit in cache:
+            cache.move_to_end(head_commit)
+            return cache[head_commit]
+
+        path = self._contribution_index_path(head_commit)
+        if path is None or not path.exists():
+            return None
+        try:
+            index = ContributionIndex.from_dict(json.loads(path.read_text()))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Ignoring unreadable contribution index {path}: {e}")
+            return None
+
+        self._remember_contribution_index(index)
+        return index
+
+    def _store_contribution_index(self, index: ContributionIndex):
+        self._remember_contribution_index(index)
+
+        path = self._contribution_index_path(index.head_commit)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 동시 실행 워커가 부분 파일을 읽지 않도록 임시 파일 → rename
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(index.to_dict()))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Failed to persist contribution index: {e}")
+
+    @classmethod
+    def _remember_contribution_index(cls, index: ContributionIndex):
+        cls._index_cache[index.head_commit] = index
+        cls._index_cache.move_to_end(index.head_commit)
+        while len(cls._index_cache) > cls._index_cache_size:
+            cls._index_cache.popitem(last=False)
+
+    def _follow_renames(self, repo_path: Path, paths: Set[str]) -> Set[str]:
+        """히스토리 경로 집합에 이후 rename/이동된 경로를 추가
+
+        HEAD에 없는 경로만 대상으로, 해당 경로를 삭제한 커밋에서만 rename 검출(-M)을
+        수행합니다. rename 대상 경로도 HEAD에 없으면 반복해서 따라갑니다.
+
+        Args:
+            repo_path: Git 저장소 경로
+            paths: 히스토리상 경로
+
+        Returns:
+            paths ∪ rename된 이후 경로들
+
+        Raises:
+            RuntimeError: Git 명령 실패 시
+        """
+        if not paths:
+            return set(paths)
+
+        try:
+            head_paths = set(self._git_lines(repo_path, ["ls-files", "-z"], sep='\0'))
+            followed = set(paths)
+            frontier = followed - head_paths
+            visited_commits = set()
+
+            while frontier:
+                # 경로를 삭제한 커밋 (rename 검출 없이 빠르게 조회)
+                deleting_commits = []
+                frontier_list = sorted(frontier)
+                for start in range(0, len(frontier_list), PATHSPEC_CHUNK_SIZE):
+                    for commit in self._git_lines(
+                        repo_path,
+                        ["log", "--no-renames", "--diff-filter=D", "--format=%H", "HEAD", "--",
+                         *frontier_list[start:start + PATHSPEC_CHUNK_SIZE]]
+                    ):
+                        if commit not in visited_commits:
+                            visited_commits.add(commit)
+                            deleting_commits.append(commit)
+
+                renamed = set()
+                for commit in deleting_commits:
+                    # "R<score>\0<old>\0<new>\0" / "<status>\0<path>\0"
+                    fields = self._git_lines(
+                        repo_path,
+                        ["diff-tree", "-r", "-M", "--name-status", "-z", f"{commit}^", commit],
+                        sep='\0'
                     )
+                    index = 0
+                    while index < len(fields):
+                        status = fields[index]
+                        if status.startswith(('R', 'C')):
+                            old_path, new_path = fields[index + 1], fields[index + 2]
+                            if status.startswith('R') and old_path in frontier:
+                                renamed.add(new_path)
+                            index += 3
+                        else:
+                            index += 2
+
+                frontier = renamed - followed - head_paths
+                followed |= renamed
 
-                    # author로 시작하는 라인에서 사용자명 확인
-                    for line in blame_result.stdout.split('\n'):
-                        if line.startswith('author '):
-                            author = line.replace('author ', '').strip()
-                            if author == target_user:
-                                total_lines += 1
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to follow renames: {e.stderr}")
+
+        return followed
+
+    @staticmethod
+    def _git_lines(repo_path: Path, args: List[str], sep: str = '\n') -> List[str]:
+        result = subprocess.run(
+            ["git", "--literal-pathspecs", "-c", "core.quotepath=off", *args],
+            cwd=repo_path,
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        return [line for line in result.stdout.split(sep) if line]
+
+    def get_changed_files(
+        self,
+        repo_path: Path,
+        base_commit: str,
+        head_commit: str = "HEAD"
+    ) -> Dict[str, List[str]]:
+        """두 커밋 사이 변경 파일 목록 (증분 벡터 인덱싱용)
 
-                except subprocess.CalledProcessError:
-                    # Binary 파일이나 권한 문제 등은 건너뛰기
-                    continue
+        Args:
+            repo_path: Git 저장소 경로
+            base_commit: 이전 스냅샷 커밋
+            head_commit: 현재 커밋
 
-            return total_lines
+        Returns:
+            {"changed": 추가/수정 파일, "deleted": 삭제 파일}
+            (rename은 이전 경로 삭제 + 새 경로 추가)
 
+        Raises:
+            RuntimeError: base_commit이 히스토리에 없는 경우 등 Git 명령 실패 시
+        """
+        try:
+            result = subprocess.run(
+                ["git", "diff", "--name-status", "--no-renames", "-z", base_commit, head_commit],
+                cwd=repo_path,
+                check=True,
+                capture_output=True,
+                text=True
+            )
         except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Failed to count blame lines: {e.stderr}")
+            raise RuntimeError(f"Failed to diff commits: {e.stderr}")
+
+        changed, deleted = [], []
+        fields = result.stdout.split('\0')
+        for status, path in zip(fields[0::2], fields[1::2]):
+            if status.startswith('D'):
+                deleted.append(path)
+            elif status:
+                changed.append(path)
+
+        return {"changed": changed, "deleted": deleted}
 
     def cleanup(self):
-        """작업 디렉토리 정리"""
+        """작업 디렉토리 정리 (미러 캐시 worktree는 등록 해제 후 삭제, 미러는 유지)"""
+        if self.mirror_cache is not None:
+            self.mirror_cache.release_all()
         if self.work_dir.exists():
             shutil.rmtree(self.work_dir)
@@ -272,7 +272,8 @@ class GraphLoader:
                         "type": "Class",
                         "name": class_name,
                         "file_path": file_path,
-                        "start_line": node.start_point[0] + 1
+                        "start_line": node.start_point[0] + 1,
+                        "end_line": node.end_point[0] + 1
                     })
 
                     # File → Class 엣지
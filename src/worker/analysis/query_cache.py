@@ -0,0 +1,103 @@
+"""
+Graph-RAG v2: 쿼리 임베딩 / k-NN 결과 캐시
+
+에이전트는 템플릿 기반 쿼리("Similar code patterns and algorithms for {file}")를
+반복 실행하고, 인덱스 스냅샷은 빌드 후 변경되지 않으므로
+재실행/재시도 시 동일한 임베딩 호출과 k-NN 호출이 반복됩니다.
+
+Levels:
+1. 쿼리 임베딩 LRU  - key: (embedding_model, query text)
+2. k-NN 결과 LRU    - key: (실제 인덱스 이름 (alias 해석 후), vector hash, k, filter)
+
+쿼리 임베딩은 인덱스 내용과 무관하므로 모델 단위로만 구분하고,
+결과 캐시는 해당 인덱스가 재빌드/삭제될 때 invalidate_index()로 무효화합니다.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+ResultKey = Tuple[str, str, int, str]
+
+
+class QueryCache:
+    """쿼리 임베딩 + k-NN 결과 2단계 LRU 캐시"""
+
+    def __init__(self, max_embeddings: int = 1024, max_results: int = 4096):
+        self.max_embeddings = max_embeddings
+        self.max_results = max_results
+
+        self._embeddings: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._results: "OrderedDict[ResultKey, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.embedding_hits = 0
+        self.result_hits = 0
+
+    # ------------------------------------------------------------------
+    # 쿼리 임베딩
+    # ------------------------------------------------------------------
+
+    def get_embedding(self, model: str, text: str) -> Optional[np.ndarray]:
+        key = (model, text)
+        with self._lock:
+            embedding = self._embeddings.get(key)
+            if embedding is not None:
+                self._embeddings.move_to_end(key)
+                self.embedding_hits += 1
+            return embedding
+
+    def put_embedding(self, model: str, text: str, embedding: np.ndarray):
+        with self._lock:
+            self._embeddings[(model, text)] = embedding
+            self._embeddings.move_to_end((model, text))
+            while len(self._embeddings) > self.max_embeddings:
+                self._embeddings.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # k-NN 결과
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def result_key(
+        index_name: str,
+        query_vector: np.ndarray,
+        k: int,
+        filter_dict: Optional[Dict[str, Any]] = None
+    ) -> ResultKey:
+        vector_hash = hashlib.sha1(np.asarray(query_vector, dtype=np.float32).tobytes()).hexdigest()
+        filter_key = json.dumps(filter_dict or {}, sort_keys=True, default=str)
+        return (index_name, vector_hash, k, filter_key)
+
+    def get_results(self, key: ResultKey) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            results = self._results.get(key)
+            if results is None:
+                return None
+            self._results.move_to_end(key)
+            self.result_hits += 1
+            return list(results)
+
+    def put_results(self, key: ResultKey, results: List[Dict[str, Any]]):
+        with self._lock:
+            self._results[key] = list(results)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def invalidate_index(self, index_name: str) -> int:
+        """인덱스 재빌드/삭제 시 해당 인덱스의 결과 캐시 제거"""
+        with self._lock:
+            stale = [key for key in self._results if key[0] == index_name]
+            for key in stale:
+                del self._results[key]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._embeddings.clear()
+            self._results.clear()
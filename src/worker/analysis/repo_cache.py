@@ -0,0 +1,319 @@
+"""
+저장소 bare 미러 캐시
+
+analyze_repository 태스크마다 임시 디렉토리에 새로 클론하면 인기 저장소를
+반복해서 전체 전송하게 됩니다. URL별 bare 저장소를 캐시 디렉토리에 유지하고,
+재분석 시에는 git fetch로 새 객체만 받은 뒤 worktree를 만들어 사용합니다.
+
+Layout:
+    {cache_dir}/{sha1(url)[:16]}-{repo_name}.git   bare 미러 (worktree 객체 저장소 공유)
+    {cache_dir}/{sha1(url)[:16]}-{repo_name}.lock  미러 flock 파일 (mtime = 마지막 사용 시각)
+    {cache_dir}/{sha1(url)[:16]}-{repo_name}.size  미러 크기 캐시 (fetch 후 갱신)
+    {cache_dir}/{sha1(url)[:16]}-{repo_name}.worktrees/{id}.lock  worktree별 flock 파일
+
+Locking:
+- 클론/fetch/worktree 생성·삭제: 미러 배타 잠금 (LOCK_EX), 작업 직후 해제
+- worktree 사용 중: 해당 worktree 잠금 파일만 배타 잠금 유지 (미러 잠금은 잡지 않으므로
+  같은 미러의 다른 체크아웃/fetch를 막지 않음), release() 시 해제 및 삭제
+- LRU 정리: 미러 잠금을 즉시 얻고, 잠긴 worktree 잠금 파일이 없는 미러만 삭제
+  (worktree 잠금 파일은 미러 잠금 아래에서만 생성되므로 경합 없음)
+- 크기: 정리 시 미러를 순회하지 않고 fetch 후 기록한 .size 파일 사용
+"""
+import fcntl
+import hashlib
+import os
+import shutil
+import subprocess
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class RepositoryMirrorCache:
+    """URL별 bare 미러 + worktree 체크아웃
+
+    Usage:
+        cache = RepositoryMirrorCache("/var/cache/repos", max_size_bytes=50 * 1024 ** 3)
+        worktree = cache.checkout(repo_url, "main", work_dir / "repo")
+        ...
+        cache.release(worktree)
+    """
+
+    def __init__(self, cache_dir: Path, max_size_bytes: int = 20 * 1024 ** 3):
+        """
+        Args:
+            cache_dir: 미러 저장 디렉토리
+            max_size_bytes: 미러 전체 크기 상한 (초과 시 오래 사용하지 않은 미러부터 삭제)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # worktree 경로 → (미러 경로, worktree 잠금 파일 경로, 잠금 fd)
+        self._checkouts: Dict[Path, Tuple[Path, Path, int]] = {}
+
+    def mirror_path(self, repo_url: str) -> Path:
+        repo_name = repo_url.rstrip('/').split('/')[-1].replace('.git', '')
+        url_hash = hashlib.sha1(repo_url.encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"{url_hash}-{repo_name}.git"
+
+    @staticmethod
+    def _lock_path(mirror: Path) -> Path:
+        return mirror.with_suffix('.lock')
+
+    @staticmethod
+    def _size_path(mirror: Path) -> Path:
+        return mirror.with_suffix('.size')
+
+    @staticmethod
+    def _worktree_locks_dir(mirror: Path) -> Path:
+        return mirror.with_suffix('.worktrees')
+
+    # ------------------------------------------------------------------
+    # 체크아웃
+    # ------------------------------------------------------------------
+
+    def checkout(
+        self,
+        repo_url: str,
+        branch: str,
+        worktree_path: Path,
+        clone_filter: Optional[str] = None,
+        sparse_extensions: Optional[Iterable[str]] = None
+    ) -> Path:
+        """미러 갱신 후 브랜치 worktree 생성
+
+        Args:
+            repo_url: 저장소 URL
+            branch: 체크아웃할 브랜치
+            worktree_path: worktree 생성 경로 (존재하면 삭제 후 생성)
+            clone_filter: 미러 최초 생성 시 partial clone 필터
+                (기존 미러는 생성 당시 필터 유지)
+            sparse_extensions: 작업 트리에 체크아웃할 확장자 목록
+
+        Returns:
+            worktree 경로 (HEAD는 브랜치 최신 커밋에 detached)
+
+        Raises:
+            RuntimeError: Git 명령 실패 시
+        """
+        mirror = self.mirror_path(repo_url)
+        worktree_path = Path(worktree_path)
+        worktree_lock_path = self._worktree_locks_dir(mirror) / f"{uuid.uuid4().hex}.lock"
+        worktree_lock_fd = None
+
+        with self._mirror_lock(mirror):
+            try:
+                if mirror.exists():
+                    self._git(mirror, "fetch", "--no-tags", "origin",
+                              f"+refs/heads/{branch}:refs/heads/{branch}")
+                    print(f"🔁 Reusing mirror {mirror.name} (fetched {branch})")
+                else:
+                    clone_args = ["clone", "--bare", "--no-tags", "--branch", branch, "--single-branch"]
+                    if clone_filter:
+                        clone_args.append(f"--filter={clone_filter}")
+                    self._git(self.cache_dir, *clone_args, repo_url, str(mirror))
+                    # 다른 worktree가 읽는 중에 객체가 정리되지 않도록 자동 gc 비활성화
+                    self._git(mirror, "config", "gc.auto", "0")
+                    print(f"✅ Created mirror {mirror.name}")
+                self._record_size(mirror)
+
+                # worktree 사용 표시 (미러 잠금 아래에서 생성하므로 LRU 정리와 경합 없음)
+                worktree_lock_path.parent.mkdir(parents=True, exist_ok=True)
+                worktree_lock_fd = os.open(worktree_lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(worktree_lock_fd, fcntl.LOCK_EX)
+
+                if worktree_path.exists():
+                    shutil.rmtree(worktree_path)
+                # 비정상 종료로 남은 worktree 등록 정리
+                self._git(mirror, "worktree", "prune")
+
+                ref = f"refs/heads/{branch}"
+                if sparse_extensions is None:
+                    self._git(mirror, "worktree", "add", "--detach", str(worktree_path), ref)
+                else:
+                    self._git(mirror, "worktree", "add", "--no-checkout", "--detach", str(worktree_path), ref)
+                    patterns = [f"*{ext}" for ext in sparse_extensions]
+                    self._git(worktree_path, "sparse-checkout", "set", "--no-cone", *patterns)
+                    self._git(worktree_path, "checkout", "--detach", ref)
+            except Exception:
+                if worktree_lock_fd is not None:
+                    _unlink_quietly(worktree_lock_path)
+                    os.close(worktree_lock_fd)
+                raise
+
+        self._checkouts[worktree_path] = (mirror, worktree_lock_path, worktree_lock_fd)
+        self._evict(exclude={mirror})
+        return worktree_path
+
+    def release(self, worktree_path: Path):
+        """worktree 삭제 및 worktree 잠금 해제"""
+        worktree_path = Path(worktree_path)
+        entry = self._checkouts.pop(worktree_path, None)
+        if entry is None:
+            return
+
+        mirror, worktree_lock_path, worktree_lock_fd = entry
+        try:
+            with self._mirror_lock(mirror):
+                try:
+                    self._git(mirror, "worktree", "remove", "--force", str(worktree_path))
+                except RuntimeError as e:
+                    print(f"⚠️ Failed to remove worktree {worktree_path}: {e}")
+                    shutil.rmtree(worktree_path, ignore_errors=True)
+                    subprocess.run(["git", "worktree", "prune"], cwd=mirror, capture_output=True)
+        finally:
+            _unlink_quietly(worktree_lock_path)
+            os.close(worktree_lock_fd)
+
+    def release_all(self):
+        for worktree_path in list(self._checkouts):
+            self.release(worktree_path)
+
+    # ------------------------------------------------------------------
+    # LRU 정리
+    # ------------------------------------------------------------------
+
+    def _evict(self, exclude: Iterable[Path] = ()):
+        """캐시 크기가 상한을 넘으면 마지막 사용 시각이 오래된 미러부터 삭제"""
+        excluded = set(exclude)
+        mirrors: List[Tuple[float, int, Path]] = []
+        total_size = 0
+        for mirror in self.cache_dir.glob("*.git"):
+            size = self._cached_size(mirror)
+            total_size += size
+            lock_path = self._lock_path(mirror)
+            last_used = lock_path.stat().st_mtime if lock_path.exists() else 0.0
+            mirrors.append((last_used, size, mirror))
+
+        if total_size <= self.max_size_bytes:
+            return
+
+        for _, size, mirror in sorted(mirrors):
+            if total_size <= self.max_size_bytes:
+                break
+            if mirror in excluded:
+                continue
+
+            lock_fd = os.open(self._lock_path(mirror), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # 다른 태스크가 fetch/worktree 생성 중
+                os.close(lock_fd)
+                continue
+            try:
+                if self._has_active_worktrees(mirror):
+                    continue
+                shutil.rmtree(mirror, ignore_errors=True)
+                shutil.rmtree(self._worktree_locks_dir(mirror), ignore_errors=True)
+                _unlink_quietly(self._size_path(mirror))
+                total_size -= size
+                print(f"🧹 Evicted mirror {mirror.name} ({size / 1024 ** 2:.1f} MB)")
+            finally:
+                os.close(lock_fd)
+
+    def _has_active_worktrees(self, mirror: Path) -> bool:
+        """잠긴 worktree 잠금 파일이 있으면 True (비정상 종료로 남은 파일은 삭제)"""
+        active = False
+        for lock_path in self._worktree_locks_dir(mirror).glob("*.lock"):
+            try:
+                fd = os.open(lock_path, os.O_RDWR)
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                active = True
+                continue
+            finally:
+                os.close(fd)
+            _unlink_quietly(lock_path)
+        return active
+
+    # ------------------------------------------------------------------
+    # 크기 캐시
+    # ------------------------------------------------------------------
+
+    def _record_size(self, mirror: Path) -> int:
+        """미러 크기 계산 후 .size 파일에 기록 (미러 잠금 보유 중 호출)"""
+        size = _repository_size(mirror)
+        try:
+            tmp_path = self._size_path(mirror).with_suffix(f".size.{os.getpid()}.tmp")
+            tmp_path.write_text(str(size))
+            os.replace(tmp_path, self._size_path(mirror))
+        except OSError as e:
+            print(f"⚠️ Failed to record mirror size {mirror.name}: {e}")
+        return size
+
+    def _cached_size(self, mirror: Path) -> int:
+        try:
+            return int(self._size_path(mirror).read_text())
+        except (OSError, ValueError):
+            # 이전 버전에서 만든 미러 등: 1회 계산
+            return self._record_size(mirror)
+
+    # ------------------------------------------------------------------
+    # 내부
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _git(cwd: Path, *args: str) -> str:
+        try:
+            result = subprocess.run(
+                ["git", *args],
+                cwd=cwd,
+                check=True,
+                capture_output=True,
+                text=True
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"git {args[0]} failed: {e.stderr}")
+        return result.stdout
+
+    @contextmanager
+    def _mirror_lock(self, mirror: Path):
+        """미러 배타 잠금 (mtime = 마지막 사용 시각)"""
+        lock_fd = os.open(self._lock_path(mirror), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            os.utime(lock_fd)
+            yield
+        finally:
+            os.close(lock_fd)
+
+
+def _repository_size(mirror: Path) -> int:
+    """git count-objects 기준 객체 저장소 크기 (실패 시 디렉토리 순회)"""
+    try:
+        result = subprocess.run(
+            ["git", "count-objects", "-v"],
+            cwd=mirror,
+            check=True,
+            capture_output=True,
+            text=True
+        )
+    except (subprocess.CalledProcessError, OSError):
+        return _directory_size(mirror)
+
+    stats = dict(line.split(': ', 1) for line in result.stdout.splitlines() if ': ' in line)
+    return (int(stats.get('size', 0)) + int(stats.get('size-pack', 0))) * 1024
+
+
+def _unlink_quietly(path: Path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _directory_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
@@ -5,10 +5,11 @@ AWS Bedrock 또는 OpenAI 임베딩 생성 및
 OpenSearch/Qdrant 벡터 인덱싱
 
 Features:
-- 코드 청킹 (함수 단위/토큰 단위)
-- 임베딩 생성 (Bedrock Titan, OpenAI)
+- 코드 청킹 (그래프 노드 기반 심볼 단위 / 토큰 단위)
+- 청크 중복 제거 후 임베딩 생성 (Bedrock Titan, OpenAI)
 - OpenSearch k-NN 인덱싱
-- S3 기반 임베딩 캐싱
+- 계층형 임베딩 캐싱 (메모리 LRU → 로컬 디스크 → S3)
+- 비동기 동시 임베딩 + RPM/TPM 레이트 리밋
 
 PDD v4.0 업데이트:
 - 환경변수 기반 자동 provider 선택
@@ -17,11 +18,26 @@ PDD v4.0 업데이트:
 import os
 import json
 import hashlib
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Callable, Optional, Iterable, Iterator, Tuple, Union
 from pathlib import Path
 
 import numpy as np
-from config import EmbeddingConfig
+from config import EmbeddingConfig, VectorIndexConfig
+from .embedding_engine import AsyncEmbeddingEngine, EmbeddingFailureStats, EmbeddingRetryQueue
+from .embedding_metrics import EmbeddingMetrics
+from .embedding_cache import (
+    LRUEmbeddingCache,
+    DiskEmbeddingCache,
+    S3EmbeddingCache,
+    TieredEmbeddingCache,
+)
+from .embedding_shards import ShardedS3EmbeddingCache
+from .code_chunker import CHUNKER_VERSION, SymbolChunker, iter_window_chunks
+from .chunk_dedup import DedupStats, dedup_chunks
+from .query_cache import QueryCache
+from .bulk_indexer import StreamingBulkIndexer
+from .dimension_reduction import PCAProjection
 try:
     import tiktoken
     TIKTOKEN_AVAILABLE = True
@@ -44,13 +60,41 @@ except ImportError:
 from opensearchpy import OpenSearch, RequestsHttpConnection
 
 
+# 모델별 기본 출력 차원 (차원 불일치 검증용, 목록에 없는 모델은 첫 응답 차원으로 고정)
+MODEL_DIMENSIONS = {
+    "amazon.titan-embed-text-v1": 1536,
+    "amazon.titan-embed-text-v2:0": 1024,
+    "amazon.titan-embed-g1-text-02": 1536,
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+
+def supports_native_dimensions(provider: str, model: str, dimensions: int) -> bool:
+    """provider가 출력 차원 파라미터를 지원하는지 여부
+
+    - OpenAI text-embedding-3-*: 임의 차원 (dimensions 파라미터)
+    - Bedrock Titan Text Embeddings v2: 256 / 512 / 1024
+    """
+    if provider == "openai":
+        return model.startswith("text-embedding-3")
+    if provider == "bedrock":
+        return "titan-embed-text-v2" in model and dimensions in (256, 512, 1024)
+    return False
+
+
 class SemanticSearch:
     """
     시맨틱 코드 검색 및 임베딩 관리
 
     Supported Embedding Models:
-    - AWS Bedrock: amazon.titan-embed-text-v1 (1024 dim)
-    - OpenAI: text-embedding-3-large (1536 dim)
+    - AWS Bedrock: amazon.titan-embed-text-v1 (1536 dim), amazon.titan-embed-text-v2:0 (1024 dim)
+    - OpenAI: text-embedding-3-small (1536 dim), text-embedding-3-large (3072 dim)
+
+    embedding_dimensions(EMBEDDING_DIMENSIONS)를 지정하면 출력 차원을 축소합니다:
+    - "native": provider 파라미터로 축소된 임베딩을 직접 요청
+    - "pca": 인덱스 빌드 시 인덱스별 PCA 투영을 학습/저장하고 쿼리에도 동일 투영 적용
     """
 
     def __init__(
@@ -62,7 +106,10 @@ class SemanticSearch:
         embedding_model: Optional[str] = None,
         aws_region: Optional[str] = None,
         openai_api_key: Optional[str] = None,
-        s3_cache_bucket: Optional[str] = None
+        s3_cache_bucket: Optional[str] = None,
+        embedding_dimensions: Optional[int] = None,
+        index_registry: Optional[Any] = None,
+        metrics_callback: Optional[Callable[[EmbeddingMetrics], None]] = None
     ):
         """
         Args:
@@ -74,6 +121,9 @@ class SemanticSearch:
             aws_region: AWS 리전 (None이면 환경변수 기반 자동 선택)
             openai_api_key: OpenAI API 키 (provider="openai" 시 필수, None이면 환경변수 사용)
             s3_cache_bucket: S3 캐시 버킷 (선택사항)
+            embedding_dimensions: 출력 임베딩 차원 (None이면 환경변수 EMBEDDING_DIMENSIONS, 없으면 모델 기본 차원)
+            index_registry: VectorIndexRegistry (인덱스 스냅샷 재사용, 선택사항)
+            metrics_callback: 임베딩 run 종료 시 EmbeddingMetrics를 전달받는 콜백 (선택사항)
         """
         if not TIKTOKEN_AVAILABLE:
             raise RuntimeError("tiktoken not installed. Install with: pip install tiktoken")
@@ -82,6 +132,7 @@ class SemanticSearch:
         if embedding_provider is None:
             config = EmbeddingConfig.get_provider()
             embedding_provider = config['provider']
+            embedding_dimensions = embedding_dimensions or config.get('dimensions')
 
             if embedding_provider == 'bedrock':
                 embedding_model = embedding_model or config['model_id']
@@ -92,6 +143,7 @@ class SemanticSearch:
                 embedding_model = embedding_model or config['model']
 
         # OpenSearch 클라이언트
+        self._opensearch_endpoint = opensearch_endpoint
         self.opensearch = OpenSearch(
             hosts=[opensearch_endpoint],
             http_auth=(opensearch_user, opensearch_password),
@@ -103,6 +155,46 @@ class SemanticSearch:
         # 임베딩 설정
         self.embedding_provider = embedding_provider
         self.embedding_model = embedding_model
+        self.embedding_dimensions = embedding_dimensions
+
+        # 차원 축소 방식: provider 파라미터 지원 시 native, 아니면 인덱스별 PCA
+        if not embedding_dimensions:
+            self.dimension_reduction = None
+        elif supports_native_dimensions(embedding_provider, embedding_model, embedding_dimensions):
+            self.dimension_reduction = "native"
+        else:
+            self.dimension_reduction = "pca"
+
+        # 임베딩 캐시 네임스페이스 (native 축소 벡터는 모델 기본 차원 벡터와 분리)
+        if self.dimension_reduction == "native":
+            self.embedding_namespace = f"{embedding_model}@{embedding_dimensions}"
+        else:
+            self.embedding_namespace = embedding_model
+
+        # 임베딩 응답 검증 기준 차원 (native 축소 시 목표 차원)
+        if self.dimension_reduction == "native":
+            self.expected_dimension = embedding_dimensions
+        else:
+            self.expected_dimension = MODEL_DIMENSIONS.get(embedding_model)
+
+        # 실패 임베딩 지연 재시도 설정 + 마지막 스테이지 실패 통계
+        self.retry_settings = EmbeddingConfig.get_retry_settings()
+        self.last_failure_stats = EmbeddingFailureStats()
+
+        # 임베딩 run 지표 (마지막 run / 마지막 인덱스 빌드 run)
+        self.metrics_callback = metrics_callback
+        self.last_metrics: Optional[EmbeddingMetrics] = None
+        self.last_index_metrics: Optional[EmbeddingMetrics] = None
+
+        # 인덱스별 PCA 투영 (index_name → PCAProjection)
+        self._projections: Dict[str, PCAProjection] = {}
+
+        # 벡터 인덱스 스냅샷 레지스트리 + alias → 실제 인덱스 매핑
+        self.index_registry = index_registry
+        # alias → (실제 인덱스, 만료 시각): 다른 프로세스의 alias 전환을 TTL 이내에 반영
+        self._aliases: Dict[str, Tuple[str, float]] = {}
+        # 물리 인덱스 → knn 절 filter 지원 여부 (nmslib 엔진 인덱스는 미지원)
+        self._knn_filter_support: Dict[str, bool] = {}
         self.aws_region = aws_region
         self.s3_cache_bucket = s3_cache_bucket
 
@@ -130,7 +222,27 @@ class SemanticSearch:
         else:
             self.s3 = None
 
-        print(f"✅ SemanticSearch initialized: {embedding_provider}/{embedding_model}")
+        # 계층형 임베딩 캐시 (메모리 LRU → 로컬 디스크 → S3)
+        self.embedding_cache = self._init_embedding_cache()
+
+        # 쿼리 임베딩 / k-NN 결과 캐시 (인덱스 재빌드 시 결과 무효화)
+        cache_settings = EmbeddingConfig.get_cache_settings()
+        self.query_cache = QueryCache(
+            max_embeddings=cache_settings['query_embedding_cache_size'],
+            max_results=cache_settings['query_result_cache_size']
+        )
+        self.alias_cache_ttl = cache_settings['alias_cache_ttl_seconds']
+
+        # 비동기 임베딩 엔진 (동시성 + RPM/TPM 레이트 리밋)
+        rate_limits = EmbeddingConfig.get_rate_limits(embedding_provider)
+        self.embedding_engine = AsyncEmbeddingEngine(
+            embed_batch=self._request_embeddings,
+            count_tokens=lambda text: len(self.tokenizer.encode(text)),
+            **rate_limits
+        )
+
+        dimension_note = f", {embedding_dimensions} dim ({self.dimension_reduction})" if embedding_dimensions else ""
+        print(f"✅ SemanticSearch initialized: {embedding_provider}/{embedding_model}{dimension_note}")
 
     def chunk_code(
         self,
@@ -151,151 +263,645 @@ class SemanticSearch:
         Returns:
             chunks: [{"text": "...", "metadata": {...}}, ...]
         """
-        tokens = self.tokenizer.encode(file_content)
-        chunks = []
-
-        start = 0
-        chunk_idx = 0
-
-        while start < len(tokens):
-            end = min(start + chunk_size, len(tokens))
-            chunk_tokens = tokens[start:end]
-            chunk_text = self.tokenizer.decode(chunk_tokens)
-
-            chunks.append({
-                "text": chunk_text,
-                "metadata": {
-                    "file_path": file_path,
-                    "chunk_index": chunk_idx,
-                    "token_count": len(chunk_tokens),
-                    "start_token": start,
-                    "end_token": end
-                }
-            })
+        return list(iter_window_chunks(
+            self.tokenizer, [(file_path, file_content)], chunk_size, overlap
+        ))
+
+    def iter_chunks(
+        self,
+        files: Iterable[Tuple[str, str]],
+        chunk_size: int = 200,
+        overlap: int = 50
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        저장소 전체 청킹 (lazy)
 
-            chunk_idx += 1
-            start += (chunk_size - overlap)
+        토큰 경계 오프셋을 파일당 한 번만 계산하고 원본 문자열을 슬라이싱하므로
+        윈도우마다 decode하지 않습니다.
 
-        print(f"  📄 Chunked {file_path}: {len(chunks)} chunks ({len(tokens)} tokens)")
-        return chunks
+        Args:
+            files: (file_path, file_content) 이터레이터
+            chunk_size: 청크 크기 (토큰 수)
+            overlap: 오버랩 크기 (토큰 수)
+
+        Yields:
+            {"text": "...", "metadata": {...}}
+        """
+        return iter_window_chunks(self.tokenizer, files, chunk_size, overlap)
+
+    def chunk_by_symbols(
+        self,
+        file_content: str,
+        file_path: str,
+        symbol_nodes: List[Dict[str, Any]],
+        max_tokens: int = 512
+    ) -> List[Dict[str, Any]]:
+        """
+        코드 청킹 (GraphLoader Function/Class 노드 기반 심볼 단위)
+
+        Args:
+            file_content: 파일 전체 내용
+            file_path: 파일 경로 (그래프 노드의 file_path와 동일)
+            symbol_nodes: 해당 파일의 Function/Class 노드
+                          (code_chunker.group_symbols_by_file로 그룹화)
+            max_tokens: 심볼 청크 최대 토큰 수
+
+        Returns:
+            chunks: [{"text": "...", "metadata": {..., "graph_node_id": ...}}, ...]
+        """
+        chunker = SymbolChunker(self.tokenizer, max_tokens=max_tokens)
+        return chunker.chunk_file(file_content, file_path, symbol_nodes)
 
     def generate_embeddings(
         self,
         texts: List[str],
         use_cache: bool = True
-    ) -> List[np.ndarray]:
+    ) -> List[Optional[np.ndarray]]:
         """
         텍스트 리스트를 임베딩 벡터로 변환
 
+        실패한 텍스트는 재시도 큐에 모아 스테이지 마지막에 배치로 재시도하고,
+        끝까지 실패하거나 차원이 맞지 않는 항목은 None으로 반환합니다 (제로 벡터 미사용).
+        실패 통계는 last_failure_stats에 기록됩니다.
+
         Args:
             texts: 텍스트 리스트
-            use_cache: S3 캐시 사용 여부
+            use_cache: 계층형 임베딩 캐시 사용 여부
 
         Returns:
-            embeddings: [np.ndarray, ...] (각 1024 or 1536 차원)
+            embeddings: [np.ndarray | None, ...] (texts와 같은 순서)
         """
-        embeddings = []
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        use_cache = use_cache and self.embedding_cache is not None
+        cache_keys = [self._get_cache_key(text) for text in texts]
+        stats = EmbeddingFailureStats()
+
+        metrics = EmbeddingMetrics(provider=self.embedding_provider, model=self.embedding_model, texts=len(texts))
+        hits_before = dict(self.embedding_cache.hits) if use_cache else {}
+
+        # 캐시 확인 (tier별 배치 조회, 검증 실패 항목은 재생성)
+        cached = self.embedding_cache.get_many(cache_keys) if use_cache else {}
+        if use_cache:
+            metrics.cache_hits = {
+                tier: count - hits_before.get(tier, 0) for tier, count in self.embedding_cache.hits.items()
+            }
+        missing_indices = []
+        for i, cache_key in enumerate(cache_keys):
+            vector = cached.get(cache_key)
+            if vector is not None and self._check_embedding(vector) is None:
+                embeddings[i] = vector
+            else:
+                missing_indices.append(i)
+
+        # 캐시 미스 항목만 동시 임베딩 생성
+        if missing_indices:
+            generated = self.embedding_engine.embed_sync([texts[i] for i in missing_indices], metrics=metrics)
+
+            retry_queue = EmbeddingRetryQueue(**self.retry_settings)
+            for i, embedding in zip(missing_indices, generated):
+                problem = self._check_embedding(embedding) if embedding is not None else "failed"
+                if problem is None:
+                    embeddings[i] = embedding
+                elif problem == "dimension":
+                    # 설정/모델 불일치는 재시도해도 동일하므로 즉시 제외
+                    stats.dimension_mismatch += 1
+                else:
+                    retry_queue.add(texts[i])
+
+            # 스테이지 마지막: 실패 항목 배치 재시도 (라운드별 백오프)
+            stats.queued = len(retry_queue)
+            if retry_queue:
+                recovered = retry_queue.drain(
+                    lambda batch: self.embedding_engine.embed_sync(batch, metrics=metrics),
+                    lambda vector: self._check_embedding(vector) is None
+                )
+                for i in missing_indices:
+                    if embeddings[i] is None and texts[i] in recovered:
+                        embeddings[i] = recovered[texts[i]]
+                stats.recovered = len(recovered)
+                stats.failed = len(retry_queue)
+
+            # 캐시 저장 (샤드 tier는 버퍼가 충분히 쌓였을 때만 업로드)
+            new_entries = {
+                cache_keys[i]: embeddings[i] for i in missing_indices if embeddings[i] is not None
+            }
+            if use_cache and new_entries:
+                self.embedding_cache.put_many(new_entries)
+                self.embedding_cache.flush()
+
+        self.last_failure_stats = stats
+        metrics.cache_misses = len(missing_indices)
+        metrics.failures = stats.to_dict()
+        metrics.finish()
+        self._publish_metrics(metrics)
+
+        if stats.failed or stats.dimension_mismatch:
+            print(f"⚠️  Embedding failures: {stats.failed} failed after retry, "
+                  f"{stats.dimension_mismatch} dimension mismatches (excluded from indexing)")
+
+        print(f"✅ Generated {len(embeddings)} embeddings "
+              f"({len(texts) - len(missing_indices)} cached, {len(missing_indices)} requested, "
+              f"{stats.recovered}/{stats.queued} recovered on retry)")
+        if missing_indices:
+            print(f"📊 Embedding metrics: {metrics.summary()}")
+        return embeddings
 
-        for i, text in enumerate(texts):
-            # 캐시 확인
-            if use_cache and self.s3 and self.s3_cache_bucket:
-                cached_embedding = self._get_cached_embedding(text)
-                if cached_embedding is not None:
-                    embeddings.append(cached_embedding)
-                    continue
+    def _publish_metrics(self, metrics: EmbeddingMetrics):
+        """run 지표 저장 + 콜백 호출 (콜백 오류는 임베딩 결과에 영향 없음)"""
+        self.last_metrics = metrics
+        if self.metrics_callback is None:
+            return
+        try:
+            self.metrics_callback(metrics)
+        except Exception as e:
+            print(f"⚠️  Embedding metrics callback failed: {e}")
 
-            # 임베딩 생성
-            if self.embedding_provider == "bedrock":
-                embedding = self._generate_bedrock_embedding(text)
-            elif self.embedding_provider == "openai":
-                embedding = self._generate_openai_embedding(text)
-            else:
-                raise ValueError(f"Unknown embedding provider: {self.embedding_provider}")
+    def _check_embedding(self, embedding: np.ndarray) -> Optional[str]:
+        """
+        임베딩 응답 검증
 
-            embeddings.append(embedding)
+        Returns:
+            None (정상) | "dimension" (차원 불일치) | "invalid" (제로/NaN 벡터)
+        """
+        embedding = np.asarray(embedding)
+        if self.expected_dimension is None:
+            # 알 수 없는 모델: 첫 정상 응답 차원으로 고정
+            if embedding.ndim == 1 and embedding.size:
+                self.expected_dimension = embedding.shape[0]
+        if embedding.ndim != 1 or embedding.shape[0] != self.expected_dimension:
+            return "dimension"
+        if not np.all(np.isfinite(embedding)) or not np.any(embedding):
+            return "invalid"
+        return None
+
+    def embed_chunks(
+        self,
+        chunks: List[Dict[str, Any]],
+        use_cache: bool = True
+    ) -> Tuple[List[np.ndarray], DedupStats]:
+        """
+        청크 중복 제거 후 임베딩 생성
 
-            # 캐시 저장
-            if use_cache and self.s3 and self.s3_cache_bucket:
-                self._save_embedding_to_cache(text, embedding)
+        정규화된 텍스트가 같은 청크는 한 번만 임베딩하고,
+        결과 벡터를 해당 텍스트를 참조하는 모든 청크로 fan-out 합니다.
 
-            if (i + 1) % 10 == 0:
-                print(f"  🔢 Generated {i + 1}/{len(texts)} embeddings...")
+        Args:
+            chunks: chunk_code/chunk_by_symbols 결과
+            use_cache: 계층형 임베딩 캐시 사용 여부
 
-        print(f"✅ Generated {len(embeddings)} embeddings")
-        return embeddings
+        Returns:
+            (embeddings, stats): chunks와 순서가 같은 임베딩 리스트 (영구 실패 청크는 None),
+            중복 제거 통계
+        """
+        unique_texts, assignments, stats = dedup_chunks(chunks)
+
+        print(f"🧹 Dedup: {stats.total_chunks} chunks → {stats.unique_chunks} unique "
+              f"({stats.dedup_ratio:.1%} duplicates)")
+
+        unique_embeddings = self.generate_embeddings(unique_texts, use_cache=use_cache)
+        self.last_index_metrics = self.last_metrics
+        embeddings = [unique_embeddings[position] for position in assignments]
+        return embeddings, stats
+
+    def _request_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """provider에 임베딩 배치 요청 (AsyncEmbeddingEngine 워커 스레드에서 실행)
+
+        Raises:
+            provider 에러 (Throttling 판별 및 재시도는 엔진이 담당)
+        """
+        if self.embedding_provider == "bedrock":
+            return self._generate_bedrock_embeddings(texts)
+        elif self.embedding_provider == "openai":
+            return self._generate_openai_embeddings(texts)
+        else:
+            raise ValueError(f"Unknown embedding provider: {self.embedding_provider}")
+
+    def _generate_bedrock_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """Bedrock Titan으로 임베딩 생성 (Titan은 요청당 텍스트 1개)"""
+        embeddings = []
+        for text in texts:
+            body = {"inputText": text}
+            if self.dimension_reduction == "native":
+                body["dimensions"] = self.embedding_dimensions
 
-    def _generate_bedrock_embedding(self, text: str) -> np.ndarray:
-        """Bedrock Titan으로 임베딩 생성"""
-        try:
             response = self.bedrock.invoke_model(
                 modelId=self.embedding_model,
-                body=json.dumps({"inputText": text})
+                body=json.dumps(body)
             )
 
             response_body = json.loads(response['body'].read())
-            embedding = np.array(response_body['embedding'], dtype=np.float32)
-            return embedding
+            embeddings.append(np.array(response_body['embedding'], dtype=np.float32))
 
-        except ClientError as e:
-            print(f"❌ Bedrock error: {e}")
-            # Fallback: 제로 벡터 반환
-            return np.zeros(1024, dtype=np.float32)
+        return embeddings
 
-    def _generate_openai_embedding(self, text: str) -> np.ndarray:
-        """OpenAI로 임베딩 생성"""
-        try:
-            response = self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=text
-            )
-            embedding = np.array(response.data[0].embedding, dtype=np.float32)
-            return embedding
+    def _generate_openai_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """OpenAI로 임베딩 생성 (요청 1회에 여러 텍스트)"""
+        request = {"model": self.embedding_model, "input": texts}
+        if self.dimension_reduction == "native":
+            request["dimensions"] = self.embedding_dimensions
 
-        except Exception as e:
-            print(f"❌ OpenAI error: {e}")
-            # Fallback: 제로 벡터 반환
-            return np.zeros(1536, dtype=np.float32)
+        response = self.openai_client.embeddings.create(**request)
+        data = sorted(response.data, key=lambda item: item.index)
+        return [np.array(item.embedding, dtype=np.float32) for item in data]
 
     def _get_cache_key(self, text: str) -> str:
         """텍스트의 캐시 키 생성 (SHA256 해시)"""
         return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
-    def _get_cached_embedding(self, text: str) -> Optional[np.ndarray]:
-        """S3에서 캐시된 임베딩 가져오기"""
-        cache_key = self._get_cache_key(text)
-        s3_key = f"embeddings/{self.embedding_model}/{cache_key}.npy"
+    def _init_embedding_cache(self) -> Optional[TieredEmbeddingCache]:
+        """메모리 LRU → 로컬 디스크 → S3 순서의 계층형 캐시 구성"""
+        settings = EmbeddingConfig.get_cache_settings()
+        if not settings['enabled']:
+            return None
+
+        tiers = [LRUEmbeddingCache(max_entries=settings['lru_size'])]
 
         try:
-            obj = self.s3.get_object(Bucket=self.s3_cache_bucket, Key=s3_key)
-            embedding_bytes = obj['Body'].read()
-            embedding = np.frombuffer(embedding_bytes, dtype=np.float32)
-            return embedding
+            tiers.append(DiskEmbeddingCache(settings['local_dir'], self.embedding_namespace))
+        except Exception as e:
+            print(f"⚠️  Local embedding cache disabled: {e}")
+
+        if self.s3 and self.s3_cache_bucket:
+            if settings['s3_layout'] == 'shard':
+                # 샤드 레이아웃 (per-object 레이아웃 fallback은 마이그레이션 시에만)
+                tiers.append(ShardedS3EmbeddingCache(
+                    self.s3,
+                    self.s3_cache_bucket,
+                    self.embedding_namespace,
+                    local_dir=settings['local_dir'],
+                    dtype=settings['shard_dtype'],
+                    read_legacy=settings['shard_read_legacy']
+                ))
+            else:
+                tiers.append(S3EmbeddingCache(self.s3, self.s3_cache_bucket, self.embedding_namespace))
+
+        return TieredEmbeddingCache(tiers)
+
+    # ------------------------------------------------------------------
+    # PCA 차원 축소 (provider 파라미터 미지원 모델)
+    # ------------------------------------------------------------------
+
+    def _projection_location(self, index_name: str) -> Tuple[Path, Optional[str]]:
+        """인덱스별 투영 저장 위치 (로컬 경로, S3 키)"""
+        local_path = Path(EmbeddingConfig.get_cache_settings()['local_dir']) / "projections" / f"{index_name}.npz"
+        s3_key = f"projections/{index_name}.npz" if self.s3 and self.s3_cache_bucket else None
+        return local_path, s3_key
+
+    def _load_projection(self, index_name: str) -> Optional[PCAProjection]:
+        """메모리 → 로컬 → S3 순서로 인덱스 투영 조회"""
+        index_name = self._resolve_alias(index_name)
+        if index_name in self._projections:
+            return self._projections[index_name]
+
+        local_path, s3_key = self._projection_location(index_name)
+        projection = None
+        if local_path.exists():
+            projection = PCAProjection.load(local_path)
+        elif s3_key:
+            try:
+                response = self.s3.get_object(Bucket=self.s3_cache_bucket, Key=s3_key)
+                projection = PCAProjection.from_bytes(response['Body'].read())
+                projection.save(local_path)
+            except ClientError:
+                projection = None
+
+        if projection is not None:
+            self._projections[index_name] = projection
+        return projection
+
+    def _fit_projection(self, index_name: str, embeddings: List[np.ndarray]) -> PCAProjection:
+        """인덱스 임베딩으로 PCA 투영 학습 후 로컬/S3 저장"""
+        index_name = self._resolve_alias(index_name)
+        valid = [embedding for embedding in embeddings if embedding is not None]
+        projection = PCAProjection.fit(valid, self.embedding_dimensions)
+
+        local_path, s3_key = self._projection_location(index_name)
+        projection.save(local_path)
+        if s3_key:
+            self.s3.put_object(Bucket=self.s3_cache_bucket, Key=s3_key, Body=projection.to_bytes())
+
+        self._projections[index_name] = projection
+        print(f"✅ PCA projection fitted for '{index_name}': "
+              f"{projection.source_dimension} → {projection.target_dimension} dim ({len(valid)} samples)")
+        return projection
+
+    def _to_index_space(
+        self,
+        vectors: List[np.ndarray],
+        index_name: str,
+        fit: bool = False
+    ) -> List[np.ndarray]:
+        """
+        원본 차원 벡터를 인덱스 차원으로 투영 (PCA 모드에서만)
 
-        except self.s3.exceptions.NoSuchKey:
+        이미 인덱스 차원인 벡터(저장된 벡터 등)는 그대로 반환합니다.
+
+        Args:
+            fit: 투영이 없으면 vectors로 학습 (인덱스 빌드 시)
+
+        Raises:
+            RuntimeError: 쿼리 시점에 인덱스 투영이 없는 경우
+        """
+        if self.dimension_reduction != "pca" or not vectors:
+            return vectors
+
+        projection = self._load_projection(index_name)
+        if projection is None:
+            if not fit:
+                raise RuntimeError(f"No PCA projection for index '{index_name}' (index not built with reduction)")
+            projection = self._fit_projection(index_name, vectors)
+
+        return [
+            projection.transform(vector)[0]
+            if vector is not None and len(vector) == projection.source_dimension else vector
+            for vector in vectors
+        ]
+
+    def get_dimension_info(self, index_name: str) -> Dict[str, Any]:
+        """VectorIndex 기록용 차원 정보
+
+        Returns:
+            {
+                'embedding_dimension': int | None,
+                'source_dimension': int | None,
+                'dimension_reduction': None | 'native' | 'pca',
+                'projection_uri': str | None
+            }
+        """
+        info = {
+            'embedding_dimension': self.embedding_dimensions,
+            'source_dimension': None,
+            'dimension_reduction': self.dimension_reduction,
+            'projection_uri': None
+        }
+        if self.dimension_reduction == "pca":
+            projection = self._load_projection(index_name)
+            local_path, s3_key = self._projection_location(self._resolve_alias(index_name))
+            info['source_dimension'] = projection.source_dimension if projection else None
+            info['projection_uri'] = f"s3://{self.s3_cache_bucket}/{s3_key}" if s3_key else str(local_path)
+        return info
+
+    # ------------------------------------------------------------------
+    # 인덱스 스냅샷 재사용 (commit_hash + 임베딩 모델 + 청커 버전)
+    # ------------------------------------------------------------------
+
+    @property
+    def embedding_model_id(self) -> str:
+        """VectorIndex.embedding_model 기록 형식 ("{provider}/{model}")"""
+        return f"{self.embedding_provider}/{self.embedding_model}"
+
+    def reuse_index(self, commit_hash: str, alias: Optional[str] = None) -> Optional[str]:
+        """
+        같은 커밋/모델/청커 버전/차원으로 빌드된 유효한 인덱스 재사용
+
+        OpenSearch에 실제 인덱스가 없으면 레지스트리 항목을 무효화하고 None을 반환합니다.
+
+        Args:
+            commit_hash: Git 커밋 해시
+            alias: 지정 시 재사용 인덱스를 가리키도록 alias 전환
+
+        Returns:
+            재사용할 인덱스 이름 (alias 지정 시 alias) 또는 None
+        """
+        if self.index_registry is None:
             return None
-        except Exception as e:
-            print(f"⚠️  Cache read error: {e}")
+
+        vector_index = self.index_registry.find_reusable(
+            commit_hash,
+            self.embedding_model_id,
+            CHUNKER_VERSION,
+            self.embedding_dimensions
+        )
+        if vector_index is None:
+            print(f"ℹ️  No vector index found for commit: {commit_hash[:8]}")
+            return None
+
+        if not self.opensearch.indices.exists(index=vector_index.index_name):
+            print(f"⚠️  Vector index '{vector_index.index_name}' missing in OpenSearch, invalidating")
+            self.index_registry.invalidate(vector_index.id)
             return None
 
-    def _save_embedding_to_cache(self, text: str, embedding: np.ndarray):
-        """임베딩을 S3에 캐싱"""
-        cache_key = self._get_cache_key(text)
-        s3_key = f"embeddings/{self.embedding_model}/{cache_key}.npy"
+        print(f"✅ Reusing existing vector index: {vector_index.index_name} "
+              f"(commit: {commit_hash[:8]}, {vector_index.chunk_count} chunks)")
 
-        try:
-            self.s3.put_object(
-                Bucket=self.s3_cache_bucket,
-                Key=s3_key,
-                Body=embedding.tobytes()
+        if alias:
+            self.point_alias(alias, vector_index.index_name)
+            return alias
+        return vector_index.index_name
+
+    def register_index(
+        self,
+        analysis_id: Any,
+        commit_hash: str,
+        index_name: str,
+        chunk_count: int,
+        embedding_dimension: int,
+        indexing_duration: Optional[int] = None,
+        alias: Optional[str] = None,
+        embedding_metrics: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        빌드한 인덱스를 레지스트리에 기록 (이후 reuse_index 대상)
+
+        embedding_metrics를 생략하면 마지막 embed_chunks run의 지표를 기록합니다.
+
+        Returns:
+            vector_index_id 또는 None (레지스트리 미설정)
+        """
+        if alias:
+            self.point_alias(alias, index_name)
+
+        if self.index_registry is None:
+            return None
+
+        return self.index_registry.record_index(
+            analysis_id=analysis_id,
+            index_name=index_name,
+            commit_hash=commit_hash,
+            embedding_model=self.embedding_model_id,
+            chunker_version=CHUNKER_VERSION,
+            chunk_count=chunk_count,
+            embedding_dimension=embedding_dimension,
+            indexing_duration=indexing_duration,
+            opensearch_endpoint=self._opensearch_endpoint,
+            index_settings={"alias": alias} if alias else None,
+            dimension_info=self.get_dimension_info(index_name),
+            embedding_metrics=embedding_metrics or (
+                self.last_index_metrics.to_dict() if self.last_index_metrics else None
             )
-        except Exception as e:
-            print(f"⚠️  Cache write error: {e}")
+        )
+
+    def point_alias(self, alias: str, index_name: str) -> List[str]:
+        """
+        alias가 index_name 하나만 가리키도록 원자적으로 전환
+
+        Returns:
+            alias에서 제거된 이전 인덱스 이름 리스트
+        """
+        previous = []
+        if self.opensearch.indices.exists_alias(name=alias):
+            previous = [
+                current for current in self.opensearch.indices.get_alias(name=alias)
+                if current != index_name
+            ]
+
+        actions = [{"remove": {"index": current, "alias": alias}} for current in previous]
+        actions.append({"add": {"index": index_name, "alias": alias}})
+
+        self.opensearch.indices.update_aliases(body={"actions": actions})
+        self._aliases[alias] = (index_name, time.monotonic() + self.alias_cache_ttl)
+        print(f"✅ Alias '{alias}' → '{index_name}'")
+        return previous
+
+    # ------------------------------------------------------------------
+    # 스냅샷별 인덱스 (alias 전환 + 증분 재인덱싱)
+    # ------------------------------------------------------------------
+
+    def snapshot_index_name(self, commit_hash: str, base_name: str = "code_embeddings") -> str:
+        """
+        커밋 스냅샷별 물리 인덱스 이름
+
+        임베딩 모델/차원/청커 버전이 다르면 벡터 공간이 다르므로 이름에 포함합니다.
+        예: code_embeddings-3f2a9c1b7d4e-a1b2c3
+        """
+        variant = hashlib.sha1(f"{self.embedding_namespace}|{CHUNKER_VERSION}".encode('utf-8')).hexdigest()[:6]
+        return f"{base_name}-{commit_hash[:12]}-{variant}".lower()
+
+    def publish_index(self, alias: str, index_name: str, drop_previous: bool = True) -> List[str]:
+        """
+        읽기 alias를 새 스냅샷 인덱스로 전환하고 이전 인덱스를 통째로 삭제
+
+        delete_by_query(문서 단위 삭제 + 세그먼트 단편화) 대신 인덱스 단위로 정리합니다.
+
+        Returns:
+            alias에서 제거된 이전 인덱스 이름 리스트
+        """
+        previous = self.point_alias(alias, index_name)
+        if drop_previous:
+            for old_index in previous:
+                self.drop_index(old_index)
+        return previous
+
+    def drop_index(self, index_name: str) -> bool:
+        """
+        스냅샷 인덱스 전체 삭제 (레지스트리 항목 무효화 + 캐시 정리)
+
+        Returns:
+            삭제 여부 (인덱스가 없으면 False)
+        """
+        if not self.opensearch.indices.exists(index=index_name):
+            return False
+
+        self.opensearch.indices.delete(index=index_name)
+        self.query_cache.invalidate_index(index_name)
+        self._projections.pop(index_name, None)
+        self._knn_filter_support.pop(index_name, None)
+
+        if self.index_registry is not None:
+            self.index_registry.invalidate_index_name(index_name)
+
+        print(f"🧹 Dropped vector index: {index_name}")
+        return True
+
+    def incremental_reindex(
+        self,
+        previous_index: str,
+        new_index: str,
+        changed_files: List[str],
+        deleted_files: Optional[List[str]] = None
+    ) -> int:
+        """
+        이전 스냅샷 인덱스에서 변경되지 않은 파일의 청크를 새 인덱스로 복사
+
+        _reindex로 문서(벡터 + 메타데이터)를 ID 그대로 서버 측에서 복사하므로
+        재임베딩이 필요 없습니다. 호출자는 이후 changed_files만 청킹/임베딩하여
+        index_to_opensearch(new_index)로 추가합니다.
+
+        Args:
+            previous_index: 이전 스냅샷 인덱스 (또는 alias)
+            new_index: 새 스냅샷 인덱스 (없으면 이전 인덱스와 같은 차원으로 생성)
+            changed_files: 추가/수정 파일 (복사 제외, 재임베딩 대상)
+            deleted_files: 삭제 파일 (복사 제외)
+
+        Returns:
+            copied_count: 복사된 문서 수
+        """
+        excluded = list(changed_files) + list(deleted_files or [])
+
+        if not self.opensearch.indices.exists(index=new_index):
+            mappings = self.opensearch.indices.get_mapping(index=previous_index)
+            dimension = next(iter(mappings.values()))['mappings']['properties']['vector']['dimension']
+            self._create_index(new_index, dimension=dimension)
+
+        # 복사된 벡터는 이전 인덱스의 투영 공간이므로 PCA 투영도 함께 승계
+        if self.dimension_reduction == "pca":
+            projection = self._load_projection(previous_index)
+            if projection is not None:
+                local_path, s3_key = self._projection_location(new_index)
+                projection.save(local_path)
+                if s3_key:
+                    self.s3.put_object(Bucket=self.s3_cache_bucket, Key=s3_key, Body=projection.to_bytes())
+                self._projections[new_index] = projection
+
+        query = {"match_all": {}}
+        if excluded:
+            # terms 절 최대 개수(기본 65536) 이내로 분할
+            query = {
+                "bool": {
+                    "must_not": [
+                        {"terms": {"metadata.file_path": excluded[start:start + 65536]}}
+                        for start in range(0, len(excluded), 65536)
+                    ]
+                }
+            }
+
+        response = self.opensearch.reindex(
+            body={
+                "source": {"index": previous_index, "query": query},
+                "dest": {"index": new_index}
+            },
+            wait_for_completion=True,
+            refresh=True,
+            request_timeout=3600
+        )
+        self.query_cache.invalidate_index(new_index)
+
+        copied = response.get('created', 0) + response.get('updated', 0)
+        if response.get('failures'):
+            print(f"⚠️  Reindex failures: {response['failures'][:3]}")
+
+        print(f"✅ Reindexed {copied} unchanged chunks '{previous_index}' → '{new_index}' "
+              f"({len(excluded)} files to re-embed/drop)")
+        return copied
+
+    def _resolve_alias(self, name: str) -> str:
+        """alias → 실제 인덱스 이름 (alias가 아니면 그대로)
+
+        PCA 투영 조회와 결과 캐시 키에 사용합니다. 다른 프로세스가 alias를 전환할 수
+        있으므로 조회 결과는 alias_cache_ttl 동안만 캐싱합니다.
+        """
+        cached = self._aliases.get(name)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        resolved = name
+        try:
+            if self.opensearch.indices.exists_alias(name=name):
+                indices = list(self.opensearch.indices.get_alias(name=name))
+                if len(indices) == 1:
+                    resolved = indices[0]
+        except Exception:
+            return cached[0] if cached is not None else name
+
+        self._aliases[name] = (resolved, time.monotonic() + self.alias_cache_ttl)
+        return resolved
 
     def index_to_opensearch(
         self,
         embeddings: List[np.ndarray],
         metadata: List[Dict[str, Any]],
-        index_name: str = "code_embeddings"
+        index_name: str = "code_embeddings",
+        texts: Optional[List[str]] = None
     ) -> int:
         """
         OpenSearch에 벡터 인덱싱
@@ -304,50 +910,99 @@ class SemanticSearch:
             embeddings: 임베딩 벡터 리스트
             metadata: 각 임베딩의 메타데이터
             index_name: 인덱스 이름
+            texts: 각 임베딩의 청크 텍스트 (BM25 "text" 필드, 없으면 metadata.chunk_text)
+
+        임베딩이 None인 청크(영구 실패)는 인덱싱하지 않습니다.
 
         Returns:
             indexed_count: 인덱싱된 문서 수
         """
         if len(embeddings) != len(metadata):
             raise ValueError("embeddings와 metadata 길이 불일치")
+        if texts is not None and len(texts) != len(metadata):
+            raise ValueError("texts와 metadata 길이 불일치")
 
-        # 인덱스 존재 확인 및 생성
-        if not self.opensearch.indices.exists(index=index_name):
-            self._create_index(index_name, dimension=len(embeddings[0]))
-
-        # 벌크 인덱싱
-        bulk_actions = []
-        for i, (embedding, meta) in enumerate(zip(embeddings, metadata)):
-            doc_id = meta.get('id', f"{meta['file_path']}_{i}")
-
-            bulk_actions.append({"index": {"_index": index_name, "_id": doc_id}})
-            bulk_actions.append({
-                "vector": embedding.tolist(),
-                "metadata": meta
-            })
+        skipped = sum(1 for embedding in embeddings if embedding is None)
+        if skipped == len(embeddings):
+            print(f"⚠️  No embeddings to index for '{index_name}' ({skipped} failed chunks)")
+            return 0
 
-        # 벌크 요청 실행
-        response = self.opensearch.bulk(body=bulk_actions)
+        # PCA 모드: 인덱스 투영 학습(최초 빌드) 후 인덱스 차원으로 변환
+        embeddings = self._to_index_space(embeddings, index_name, fit=True)
+        dimension = len(next(embedding for embedding in embeddings if embedding is not None))
 
-        # 성공 카운트
-        indexed_count = sum(
-            1 for item in response['items']
-            if item['index']['status'] in [200, 201]
+        # 인덱스 존재 확인 및 생성 (기존 인덱스와 차원이 다르면 저장하지 않음)
+        if not self.opensearch.indices.exists(index=index_name):
+            self._create_index(index_name, dimension=dimension)
+        else:
+            mappings = self.opensearch.indices.get_mapping(index=index_name)
+            index_dimension = next(iter(mappings.values()))['mappings']['properties']['vector']['dimension']
+            if index_dimension != dimension:
+                raise ValueError(
+                    f"Embedding dimension {dimension} does not match index '{index_name}' ({index_dimension})"
+                )
+
+        # 스트리밍 병렬 벌크 인덱싱 (문서 단위 lazy 직렬화, 실패 청크 제외)
+        def documents():
+            for i, (embedding, meta) in enumerate(zip(embeddings, metadata)):
+                if embedding is None:
+                    continue
+                doc_id = meta.get('id', f"{meta['file_path']}_{i}")
+                text = texts[i] if texts is not None else meta.get('chunk_text', '')
+                yield doc_id, {"vector": embedding, "text": text, "metadata": meta}
+
+        indexer = StreamingBulkIndexer(self.opensearch, **VectorIndexConfig.get_bulk_settings())
+        result = indexer.index(index_name, documents())
+        # 결과 캐시는 실제 인덱스 이름으로 저장되므로 alias로 쓴 경우에도 실제 인덱스 무효화
+        self.query_cache.invalidate_index(index_name)
+        self.query_cache.invalidate_index(self._resolve_alias(index_name))
+
+        if result.failed:
+            print(f"⚠️  Bulk indexing failed for {result.failed} documents: {result.errors[:3]}")
+
+        print(
+            f"✅ Indexed {result.indexed}/{len(embeddings)} documents to '{index_name}' "
+            f"({skipped} skipped: embedding failed, "
+            f"{result.requests} bulk requests, {result.retried} retries, {result.duration_seconds:.1f}s)"
         )
-
-        print(f"✅ Indexed {indexed_count}/{len(embeddings)} documents to '{index_name}'")
-        return indexed_count
+        return result.indexed
 
     def _create_index(self, index_name: str, dimension: int):
         """OpenSearch k-NN 인덱스 생성"""
         index_body = {
             "settings": {
                 "index": {
-                    "knn": True,
-                    "knn.algo_param.ef_search": 100
+                    "knn": True
+                },
+                "analysis": {
+                    # 코드 식별자 분석기: camelCase/snake_case 분리 + 원형 보존
+                    "filter": {
+                        "code_word_delimiter": {
+                            "type": "word_delimiter_graph",
+                            "preserve_original": True,
+                            "split_on_numerics": False
+                        }
+                    },
+                    "analyzer": {
+                        "code": {
+                            "type": "custom",
+                            "tokenizer": "whitespace",
+                            "filter": ["code_word_delimiter", "lowercase"]
+                        }
+                    }
                 }
             },
             "mappings": {
+                # metadata 문자열은 keyword로 매핑 (term 필터 정확 일치)
+                "dynamic_templates": [
+                    {
+                        "metadata_strings": {
+                            "path_match": "metadata.*",
+                            "match_mapping_type": "string",
+                            "mapping": {"type": "keyword", "ignore_above": 1024}
+                        }
+                    }
+                ],
                 "properties": {
                     "vector": {
                         "type": "knn_vector",
@@ -355,13 +1010,19 @@ class SemanticSearch:
                         "method": {
                             "name": "hnsw",
                             "space_type": "cosinesimil",
-                            "engine": "nmslib",
+                            # lucene 엔진: k-NN 그래프 탐색 중 필터 적용 (efficient filtering)
+                            "engine": "lucene",
                             "parameters": {
                                 "ef_construction": 128,
                                 "m": 24
                             }
                         }
                     },
+                    # 청크 텍스트 BM25 필드 (하이브리드 검색 lexical 측)
+                    "text": {
+                        "type": "text",
+                        "analyzer": "code"
+                    },
                     "metadata": {
                         "type": "object"
                     }
@@ -370,14 +1031,137 @@ class SemanticSearch:
         }
 
         self.opensearch.indices.create(index=index_name, body=index_body)
+        self.query_cache.invalidate_index(index_name)
+        self._knn_filter_support[index_name] = True
         print(f"✅ Created OpenSearch index: {index_name} ({dimension} dim)")
 
+    def _supports_knn_filter(self, index_name: str) -> bool:
+        """인덱스 vector 필드 엔진이 knn 절 filter를 지원하는지 (lucene/faiss)
+
+        이 변경 이전에 생성된 nmslib 인덱스는 knn.filter를 거부하므로 매핑에서 엔진을 확인합니다.
+        """
+        physical = self._resolve_alias(index_name)
+        if physical in self._knn_filter_support:
+            return self._knn_filter_support[physical]
+
+        try:
+            mappings = self.opensearch.indices.get_mapping(index=physical)
+        except Exception as e:
+            # 판단 불가: 모든 엔진에서 동작하는 후처리 필터 사용 (캐싱하지 않음)
+            print(f"⚠️  Failed to read mapping for {physical}: {e}")
+            return False
+
+        supported = True
+        for mapping in mappings.values():
+            vector_field = mapping.get("mappings", {}).get("properties", {}).get("vector", {})
+            engine = vector_field.get("method", {}).get("engine", "nmslib")
+            if engine not in ("lucene", "faiss"):
+                supported = False
+
+        if not supported:
+            print(f"⚠️  Index {physical} uses the nmslib engine: metadata filters are applied after k-NN "
+                  f"(may return fewer than k hits). Reindex into a lucene index for filtered k-NN.")
+        self._knn_filter_support[physical] = supported
+        return supported
+
+    @staticmethod
+    def _build_knn_query(
+        query_vector: np.ndarray,
+        k: int,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        must_not: Optional[List[Dict[str, Any]]] = None,
+        efficient_filter: bool = True
+    ) -> Dict[str, Any]:
+        """
+        k-NN 검색 바디 구성
+
+        filter_dict는 knn 절의 filter로 전달되어 lucene/faiss 엔진이
+        그래프 탐색 중에 적용합니다. (전역 top-k를 가져온 뒤 후처리 필터링하지 않으므로
+        공유 인덱스에서도 필터 범위 내 정확히 k개를 반환)
+
+        Args:
+            must_not: 제외 조건 (예: 자기 자신 문서/파일 제외)
+            efficient_filter: False면 knn을 bool 쿼리로 감싸 후처리 필터링 (nmslib 인덱스)
+        """
+        knn = {"vector": query_vector.tolist(), "k": k}
+
+        if (filter_dict or must_not) and not efficient_filter:
+            return {
+                "size": k,
+                "query": {
+                    "bool": {
+                        "must": [{"knn": {"vector": knn}}],
+                        "filter": SemanticSearch._term_filters(filter_dict),
+                        "must_not": must_not or []
+                    }
+                }
+            }
+
+        if filter_dict or must_not:
+            knn["filter"] = {
+                "bool": {
+                    "filter": SemanticSearch._term_filters(filter_dict),
+                    "must_not": must_not or []
+                }
+            }
+
+        return {"size": k, "query": {"knn": {"vector": knn}}}
+
+    @staticmethod
+    def _build_lexical_query(
+        query_text: str,
+        k: int,
+        filter_dict: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """BM25 검색 바디 구성 (text 필드 match + 메타데이터 filter)"""
+        return {
+            "size": k,
+            "_source": {"excludes": ["vector"]},
+            "query": {
+                "bool": {
+                    "must": [{"match": {"text": query_text}}],
+                    "filter": SemanticSearch._term_filters(filter_dict)
+                }
+            }
+        }
+
+    @staticmethod
+    def _reciprocal_rank_fusion(
+        rankings: List[List[Dict[str, Any]]],
+        k: int,
+        rank_constant: int = 60
+    ) -> List[Dict[str, Any]]:
+        """
+        Reciprocal Rank Fusion: score(d) = Σ 1 / (rank_constant + rank_i(d))
+
+        BM25와 코사인 점수는 스케일이 달라 직접 합산할 수 없으므로 순위만 사용합니다.
+        결과의 score는 RRF 점수로 대체됩니다.
+        """
+        fused: Dict[str, Dict[str, Any]] = {}
+        for ranking in rankings:
+            for rank, result in enumerate(ranking, start=1):
+                entry = fused.setdefault(result["id"], {**result, "score": 0.0})
+                entry["score"] += 1.0 / (rank_constant + rank)
+
+        return sorted(fused.values(), key=lambda result: result["score"], reverse=True)[:k]
+
+    @staticmethod
+    def _term_filters(filter_dict: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """메타데이터 필터 → term/terms 절 (값이 리스트이면 terms)"""
+        return [
+            {"terms": {f"metadata.{key}": list(value)}}
+            if isinstance(value, (list, tuple, set))
+            else {"term": {f"metadata.{key}": value}}
+            for key, value in (filter_dict or {}).items()
+        ]
+
     def query(
         self,
         natural_language_query: str,
         k: int = 5,
         filter_dict: Optional[Dict[str, Any]] = None,
-        index_name: str = "code_embeddings"
+        index_name: str = "code_embeddings",
+        hybrid: bool = False
     ) -> List[Dict[str, Any]]:
         """
         자연어 쿼리로 유사 코드 검색
@@ -387,51 +1171,393 @@ class SemanticSearch:
             k: 반환할 결과 수
             filter_dict: 메타데이터 필터 (예: {"analysis_id": "..."})
             index_name: 검색할 인덱스
+            hybrid: True이면 BM25 + k-NN 하이브리드 검색 (hybrid_query)
 
         Returns:
             results: [{"score": ..., "metadata": {...}, "text": "..."}, ...]
         """
-        # 쿼리 임베딩 생성
-        query_embedding = self.generate_embeddings([natural_language_query])[0]
+        if hybrid:
+            return self.hybrid_query(natural_language_query, k, filter_dict, index_name)
 
-        # k-NN 검색 쿼리 구성
-        search_body = {
-            "size": k,
-            "query": {
-                "knn": {
-                    "vector": {
-                        "vector": query_embedding.tolist(),
-                        "k": k
-                    }
-                }
-            }
-        }
+        # 결과 캐시 키와 검색 대상은 실제 인덱스 (alias 전환/인덱스 쓰기 무효화 기준)
+        index_name = self._resolve_alias(index_name)
 
-        # 필터 추가
-        if filter_dict:
-            search_body["query"] = {
-                "bool": {
-                    "must": [
-                        {"knn": {"vector": {"vector": query_embedding.tolist(), "k": k}}}
-                    ],
-                    "filter": [
-                        {"term": {f"metadata.{key}": value}}
-                        for key, value in filter_dict.items()
-                    ]
-                }
-            }
+        # 쿼리 임베딩 생성 (쿼리 임베딩 캐시)
+        query_embedding = self._to_index_space([self.embed_query(natural_language_query)], index_name)[0]
+
+        # 동일 스냅샷/벡터/k/필터 결과 캐시
+        cache_key = QueryCache.result_key(index_name, query_embedding, k, filter_dict)
+        cached_results = self.query_cache.get_results(cache_key)
+        if cached_results is not None:
+            return cached_results
+
+        # k-NN 검색 쿼리 구성 (필터는 k-NN 탐색 내부에서 적용)
+        search_body = self._build_knn_query(
+            query_embedding, k, filter_dict, efficient_filter=self._supports_knn_filter(index_name)
+        )
 
         # 검색 실행
         response = self.opensearch.search(index=index_name, body=search_body)
+        results = self._to_results(response)
+
+        self.query_cache.put_results(cache_key, results)
+
+        print(f"✅ Query returned {len(results)} results")
+        return results
+
+    def hybrid_query(
+        self,
+        query_text: str,
+        k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        index_name: str = "code_embeddings",
+        candidates: Optional[int] = None,
+        rank_constant: int = 60
+    ) -> List[Dict[str, Any]]:
+        """
+        BM25 + k-NN 하이브리드 검색 (Reciprocal Rank Fusion)
+
+        lexical/k-NN 쿼리를 하나의 _msearch 요청으로 실행하고 순위를 RRF로 결합합니다.
+        정확한 식별자 매칭(BM25)과 의미적 유사도(k-NN)를 함께 반영하여
+        작은 k에서도 재현율을 높입니다.
+
+        Args:
+            query_text: 자연어 또는 식별자 쿼리
+            k: 반환할 결과 수
+            filter_dict: 메타데이터 필터 (양쪽 쿼리에 동일 적용)
+            index_name: 검색할 인덱스
+            candidates: 각 쿼리의 후보 수 (기본 max(k * 4, 20))
+            rank_constant: RRF 상수 (클수록 하위 순위 기여 증가)
+
+        Returns:
+            results: [{"id": ..., "score": RRF 점수, "metadata": {...}, "text": "..."}, ...]
+        """
+        index_name = self._resolve_alias(index_name)
+        query_embedding = self._to_index_space([self.embed_query(query_text)], index_name)[0]
+
+        cache_key = QueryCache.result_key(
+            index_name, query_embedding, k, {**(filter_dict or {}), "__hybrid__": query_text}
+        )
+        cached_results = self.query_cache.get_results(cache_key)
+        if cached_results is not None:
+            return cached_results
+
+        candidates = candidates or max(k * 4, 20)
+        knn_body = self._build_knn_query(
+            query_embedding, candidates, filter_dict, efficient_filter=self._supports_knn_filter(index_name)
+        )
+        knn_body["_source"] = {"excludes": ["vector"]}
+        lexical_body = self._build_lexical_query(query_text, candidates, filter_dict)
+
+        lexical_response, knn_response = self._msearch(index_name, [lexical_body, knn_body])
+        results = self._reciprocal_rank_fusion(
+            [self._to_results(lexical_response), self._to_results(knn_response)],
+            k,
+            rank_constant
+        )
+
+        self.query_cache.put_results(cache_key, results)
+        return results
+
+    def batch_query(
+        self,
+        queries: List[Union[str, np.ndarray]],
+        k: int = 5,
+        filter_dict: Optional[Union[Dict[str, Any], List[Optional[Dict[str, Any]]]]] = None,
+        index_name: str = "code_embeddings"
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        다중 쿼리 배치 검색 (임베딩 배치 1회 + _msearch)
+
+        Args:
+            queries: 자연어 쿼리 또는 쿼리 벡터 리스트 (혼합 가능)
+            k: 쿼리당 반환할 결과 수
+            filter_dict: 공통 메타데이터 필터 또는 쿼리별 필터 리스트
+            index_name: 검색할 인덱스
+
+        Returns:
+            queries 순서와 정렬된 결과 리스트 (쿼리 임베딩 실패 시 빈 리스트)
+        """
+        index_name = self._resolve_alias(index_name)
+        if isinstance(filter_dict, list):
+            if len(filter_dict) != len(queries):
+                raise ValueError("queries와 filter_dict 길이 불일치")
+            filters = filter_dict
+        else:
+            filters = [filter_dict] * len(queries)
+
+        # 텍스트 쿼리만 모아서 한 번에 임베딩
+        text_positions = [i for i, query in enumerate(queries) if isinstance(query, str)]
+        text_vectors = self.embed_queries([queries[i] for i in text_positions])
+
+        vectors = [
+            query if not isinstance(query, str) else None
+            for query in queries
+        ]
+        for position, vector in zip(text_positions, text_vectors):
+            vectors[position] = vector
+        vectors = self._to_index_space(vectors, index_name)
+
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        efficient_filter = self._supports_knn_filter(index_name)
+        searches = []
+        for i, (vector, filters_i) in enumerate(zip(vectors, filters)):
+            if vector is None:
+                # 쿼리 임베딩 실패: 빈 결과
+                results[i] = []
+                continue
+            vector = np.asarray(vector, dtype=np.float32)
+            cache_key = QueryCache.result_key(index_name, vector, k, filters_i)
+            cached_results = self.query_cache.get_results(cache_key)
+            if cached_results is not None:
+                results[i] = cached_results
+            else:
+                searches.append((i, cache_key, self._build_knn_query(
+                    vector, k, filters_i, efficient_filter=efficient_filter
+                )))
+
+        for (i, cache_key, _), response in zip(searches, self._msearch(index_name, [body for _, _, body in searches])):
+            results[i] = self._to_results(response)
+            self.query_cache.put_results(cache_key, results[i])
+
+        print(f"✅ Batch query: {len(queries)} queries, {len(searches)} searched ({len(queries) - len(searches)} cached)")
+        return results
+
+    def batch_search_similar(
+        self,
+        file_paths: List[str],
+        k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        index_name: str = "code_embeddings"
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        파일별 저장 벡터 기반 유사 검색 배치 (search_similar(file_path=...)의 배치 버전)
+
+        파일 청크 벡터 조회 1회(search) + k-NN 검색 1회(_msearch)로 처리합니다.
+        저장된 벡터가 없는 파일은 빈 결과를 반환합니다.
+
+        Returns:
+            file_paths 순서와 정렬된 결과 리스트
+        """
+        index_name = self._resolve_alias(index_name)
+        centroids = self._file_centroids(file_paths, filter_dict, index_name)
+
+        results: List[List[Dict[str, Any]]] = [[] for _ in file_paths]
+        efficient_filter = self._supports_knn_filter(index_name)
+        searches = []
+        for i, file_path in enumerate(file_paths):
+            centroid = centroids.get(file_path)
+            if centroid is None:
+                continue
+            cache_key = QueryCache.result_key(
+                index_name, centroid, k, {**(filter_dict or {}), "__exclude__": file_path}
+            )
+            cached_results = self.query_cache.get_results(cache_key)
+            if cached_results is not None:
+                results[i] = cached_results
+                continue
+            must_not = [{"term": {"metadata.file_path": file_path}}]
+            searches.append((i, cache_key, self._build_knn_query(
+                centroid, k, filter_dict, must_not=must_not, efficient_filter=efficient_filter
+            )))
+
+        for (i, cache_key, _), response in zip(searches, self._msearch(index_name, [body for _, _, body in searches])):
+            results[i] = self._to_results(response)
+            self.query_cache.put_results(cache_key, results[i])
+
+        return results
+
+    def _msearch(
+        self,
+        index_name: str,
+        bodies: List[Dict[str, Any]],
+        batch_size: int = 100
+    ) -> List[Dict[str, Any]]:
+        """검색 바디 리스트를 batch_size 단위 _msearch로 실행 (응답 순서 = 입력 순서)
+
+        개별 검색 실패는 빈 hits로 대체합니다.
+        """
+        responses = []
+        for start in range(0, len(bodies), batch_size):
+            msearch_body = []
+            for body in bodies[start:start + batch_size]:
+                msearch_body.append({"index": index_name})
+                msearch_body.append(body)
+
+            for response in self.opensearch.msearch(body=msearch_body)['responses']:
+                if 'error' in response:
+                    print(f"⚠️  msearch item failed: {response['error']}")
+                    response = {"hits": {"hits": []}}
+                responses.append(response)
+        return responses
+
+    def search_similar(
+        self,
+        doc_id: Optional[str] = None,
+        file_path: Optional[str] = None,
+        k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        index_name: str = "code_embeddings"
+    ) -> List[Dict[str, Any]]:
+        """
+        저장된 벡터 기반 유사 코드 검색 ("more like this")
+
+        쿼리 임베딩을 만들지 않고 인덱스에 저장된 청크 벡터(doc_id) 또는
+        파일 청크 벡터들의 centroid(file_path)로 k-NN 검색합니다. 자기 자신은 제외합니다.
+
+        Args:
+            doc_id: 기준 청크 문서 ID
+            file_path: 기준 파일 경로 (doc_id가 없을 때 사용)
+            k: 반환할 결과 수
+            filter_dict: 메타데이터 필터 (기준 벡터 조회에도 적용)
+            index_name: 검색할 인덱스
+
+        Returns:
+            results: [{"score": ..., "metadata": {...}, "text": "..."}, ...]
+
+        Raises:
+            ValueError: doc_id/file_path 모두 없거나 저장된 벡터가 없는 경우
+        """
+        index_name = self._resolve_alias(index_name)
+        if doc_id:
+            document = self.opensearch.get(index=index_name, id=doc_id, _source_includes=["vector"])
+            query_vector = np.asarray(document['_source']['vector'], dtype=np.float32)
+            must_not = [{"ids": {"values": [doc_id]}}]
+        elif file_path:
+            query_vector = self._file_centroid(file_path, filter_dict, index_name)
+            must_not = [{"term": {"metadata.file_path": file_path}}]
+        else:
+            raise ValueError("doc_id 또는 file_path가 필요합니다")
+
+        exclude_key = {"__exclude__": doc_id or file_path}
+        cache_key = QueryCache.result_key(index_name, query_vector, k, {**(filter_dict or {}), **exclude_key})
+        cached_results = self.query_cache.get_results(cache_key)
+        if cached_results is not None:
+            return cached_results
+
+        search_body = self._build_knn_query(
+            query_vector, k, filter_dict, must_not=must_not,
+            efficient_filter=self._supports_knn_filter(index_name)
+        )
+        response = self.opensearch.search(index=index_name, body=search_body)
+        results = self._to_results(response)
+
+        self.query_cache.put_results(cache_key, results)
+        return results
 
-        # 결과 변환
+    def _file_centroid(
+        self,
+        file_path: str,
+        filter_dict: Optional[Dict[str, Any]],
+        index_name: str
+    ) -> np.ndarray:
+        """파일에 속한 청크 벡터들의 centroid (정규화 평균)"""
+        centroid = self._file_centroids([file_path], filter_dict, index_name).get(file_path)
+        if centroid is None:
+            raise ValueError(f"No stored vectors for file: {file_path}")
+        return centroid
+
+    def _file_centroids(
+        self,
+        file_paths: List[str],
+        filter_dict: Optional[Dict[str, Any]],
+        index_name: str,
+        page_size: int = 1000
+    ) -> Dict[str, np.ndarray]:
+        """파일별 청크 벡터 centroid (저장된 벡터가 없는 파일은 제외)
+
+        대상 청크 수가 index.max_result_window를 넘어도 잘리지 않도록
+        scroll(_doc 정렬)로 페이지 단위로 읽으며 파일별 정규화 벡터 합을 누적합니다.
+        """
+        sums: Dict[str, np.ndarray] = {}
+        counts: Dict[str, int] = {}
+
+        response = self.opensearch.search(index=index_name, scroll="1m", body={
+            "size": page_size,
+            "sort": ["_doc"],
+            "_source": ["vector", "metadata.file_path"],
+            "query": {
+                "bool": {
+                    "filter": [{"terms": {"metadata.file_path": list(file_paths)}}] + self._term_filters(filter_dict)
+                }
+            }
+        })
+        scroll_id = response.get('_scroll_id')
+        try:
+            while response['hits']['hits']:
+                for hit in response['hits']['hits']:
+                    file_path = hit['_source']['metadata']['file_path']
+                    vector = np.asarray(hit['_source']['vector'], dtype=np.float32)
+                    vector /= max(float(np.linalg.norm(vector)), 1e-12)
+                    if file_path in sums:
+                        sums[file_path] += vector
+                        counts[file_path] += 1
+                    else:
+                        sums[file_path] = vector
+                        counts[file_path] = 1
+
+                if len(response['hits']['hits']) < page_size or not scroll_id:
+                    break
+                response = self.opensearch.scroll(scroll_id=scroll_id, scroll="1m")
+                scroll_id = response.get('_scroll_id', scroll_id)
+        finally:
+            if scroll_id:
+                try:
+                    self.opensearch.clear_scroll(scroll_id=scroll_id)
+                except Exception:
+                    pass
+
+        return {file_path: sums[file_path] / counts[file_path] for file_path in sums}
+
+    @staticmethod
+    def _to_results(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """OpenSearch 응답 → 검색 결과 리스트"""
         results = []
         for hit in response['hits']['hits']:
             results.append({
+                "id": hit.get('_id'),
                 "score": hit['_score'],
                 "metadata": hit['_source']['metadata'],
-                "text": hit['_source']['metadata'].get('chunk_text', '')
+                "text": hit['_source'].get('text') or hit['_source']['metadata'].get('chunk_text', '')
             })
-
-        print(f"✅ Query returned {len(results)} results")
         return results
+
+    def embed_query(self, query_text: str) -> np.ndarray:
+        """
+        쿼리 텍스트 임베딩 (모델 + 텍스트 기준 LRU 캐시)
+
+        쿼리 임베딩은 디스크/S3 임베딩 캐시에 기록하지 않습니다.
+
+        Raises:
+            RuntimeError: 재시도 후에도 임베딩 생성에 실패한 경우
+        """
+        embedding = self.embed_queries([query_text])[0]
+        if embedding is None:
+            raise RuntimeError("Query embedding failed")
+        return embedding
+
+    def embed_queries(self, query_texts: List[str]) -> List[Optional[np.ndarray]]:
+        """쿼리 텍스트 배치 임베딩 (LRU 미스만 한 번의 배치로 생성, 실패 항목은 None)"""
+        embeddings: List[Optional[np.ndarray]] = [
+            self.query_cache.get_embedding(self.embedding_namespace, text) for text in query_texts
+        ]
+
+        missing = sorted({text for text, embedding in zip(query_texts, embeddings) if embedding is None})
+        if missing:
+            generated = dict(zip(missing, self.generate_embeddings(missing, use_cache=False)))
+            for text, embedding in generated.items():
+                # 실패(None)는 캐싱하지 않음
+                if embedding is not None:
+                    self.query_cache.put_embedding(self.embedding_namespace, text, embedding)
+            embeddings = [
+                embedding if embedding is not None else generated[text]
+                for text, embedding in zip(query_texts, embeddings)
+            ]
+
+        return embeddings
+
+    def close(self):
+        """버퍼링된 캐시 업로드 및 리소스 정리"""
+        if self.embedding_cache:
+            self.embedding_cache.close()
+        self.embedding_engine.close()
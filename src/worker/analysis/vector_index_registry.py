@@ -0,0 +1,128 @@
+"""
+Graph-RAG v2: 벡터 인덱스 스냅샷 레지스트리
+
+GraphLoader.reuse_snapshot(commit_hash)의 벡터 버전입니다.
+(commit_hash, embedding_model, chunker_version, 차원)이 같은 유효한 VectorIndex가
+있으면 청킹/임베딩/인덱싱 없이 기존 OpenSearch 인덱스를 재사용합니다.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import create_engine, or_
+from sqlalchemy.orm import sessionmaker
+
+# Shared 모델 import
+from shared.graph_models import VectorIndex
+
+
+class VectorIndexRegistry:
+    """PostgreSQL vector_indices 테이블 기반 인덱스 스냅샷 관리"""
+
+    def __init__(self, postgres_url: str):
+        """
+        Args:
+            postgres_url: PostgreSQL 연결 URL (스냅샷 저장용)
+        """
+        engine = create_engine(postgres_url)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self.db = SessionLocal()
+
+    def find_reusable(
+        self,
+        commit_hash: str,
+        embedding_model: str,
+        chunker_version: str,
+        embedding_dimension: Optional[int] = None
+    ) -> Optional[VectorIndex]:
+        """
+        재사용 가능한 벡터 인덱스 조회
+
+        Args:
+            commit_hash: Git 커밋 해시
+            embedding_model: "{provider}/{model}"
+            chunker_version: code_chunker.CHUNKER_VERSION
+            embedding_dimension: 축소 차원 (None이면 축소하지 않은 인덱스만)
+
+        Returns:
+            가장 최근의 유효한 VectorIndex 또는 None
+        """
+        query = self.db.query(VectorIndex).filter(
+            VectorIndex.commit_hash == commit_hash,
+            VectorIndex.embedding_model == embedding_model,
+            VectorIndex.chunker_version == chunker_version,
+            VectorIndex.is_valid == True,
+            or_(VectorIndex.expires_at == None, VectorIndex.expires_at > datetime.now(timezone.utc))
+        )
+
+        if embedding_dimension:
+            query = query.filter(VectorIndex.embedding_dimension == embedding_dimension)
+        else:
+            query = query.filter(VectorIndex.dimension_reduction == None)
+
+        return query.order_by(VectorIndex.created_at.desc()).first()
+
+    def record_index(
+        self,
+        analysis_id: UUID,
+        index_name: str,
+        commit_hash: str,
+        embedding_model: str,
+        chunker_version: str,
+        chunk_count: int,
+        embedding_dimension: int,
+        indexing_duration: Optional[int] = None,
+        opensearch_endpoint: Optional[str] = None,
+        index_settings: Optional[Dict[str, Any]] = None,
+        dimension_info: Optional[Dict[str, Any]] = None,
+        embedding_metrics: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        PostgreSQL에 벡터 인덱스 스냅샷 기록
+
+        Returns:
+            vector_index_id (str)
+        """
+        dimension_info = dimension_info or {}
+        vector_index = VectorIndex(
+            analysis_id=analysis_id,
+            index_name=index_name,
+            commit_hash=commit_hash,
+            chunk_count=chunk_count,
+            embedding_dimension=embedding_dimension,
+            embedding_model=embedding_model,
+            chunker_version=chunker_version,
+            source_dimension=dimension_info.get('source_dimension'),
+            dimension_reduction=dimension_info.get('dimension_reduction'),
+            projection_uri=dimension_info.get('projection_uri'),
+            opensearch_endpoint=opensearch_endpoint,
+            index_settings=index_settings,
+            indexing_duration_seconds=indexing_duration,
+            embedding_metrics=embedding_metrics,
+            is_valid=True
+        )
+
+        self.db.add(vector_index)
+        self.db.commit()
+        self.db.refresh(vector_index)
+
+        print(f"✅ Vector index recorded: {vector_index.id} ({index_name}, commit: {commit_hash[:8]})")
+        return str(vector_index.id)
+
+    def invalidate(self, vector_index_id: str):
+        """인덱스 스냅샷 무효화 (OpenSearch 인덱스 유실/삭제 시)"""
+        self.db.query(VectorIndex).filter(VectorIndex.id == UUID(str(vector_index_id))).update(
+            {VectorIndex.is_valid: False}
+        )
+        self.db.commit()
+
+    def invalidate_index_name(self, index_name: str):
+        """OpenSearch 인덱스 이름 기준 무효화 (스냅샷 인덱스 삭제 시)"""
+        self.db.query(VectorIndex).filter(VectorIndex.index_name == index_name).update(
+            {VectorIndex.is_valid: False}
+        )
+        self.db.commit()
+
+    def close(self):
+        """리소스 정리"""
+        self.db.close()
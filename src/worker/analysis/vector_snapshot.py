@@ -0,0 +1,270 @@
+"""
+Graph-RAG v2: 양자화 Flat 벡터 스냅샷
+
+분석 단위 검색 공간(수천 ~ 수십만 청크)에서는 원격 k-NN 호출보다
+memmap된 행렬에 대한 numpy 배치 행렬곱 정확 검색이 빠르고 정확합니다.
+
+Snapshot Layout ({snapshot_dir}/):
+- manifest.json      : dtype, dimension, count, metric
+- vectors.q.npy      : 정규화 벡터 양자화 행렬 (int8 | float16)
+- scales.npy         : int8 행별 역양자화 스케일 (float32)
+- norms.npy          : 원본 벡터 L2 norm (dot_product 점수 복원용)
+- vectors.f32.npy    : float32 원본 (상위 후보 재채점용, 선택)
+- metadata.jsonl     : 행별 메타데이터
+
+Workflow:
+1. 임베딩 완료 후 FlatVectorSnapshot.write()로 한 번 기록
+2. 워커에서 FlatVectorSnapshot.open()으로 memmap
+3. search(): 블록 단위 행렬곱 + argpartition top-k, 상위 후보 float32 재채점
+
+SemanticSearch의 OpenSearch 색인/검색 경로와는 연결되어 있지 않은 독립 모듈입니다.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+
+SNAPSHOT_DTYPES = ("int8", "float16")
+
+
+class FlatVectorSnapshot:
+    """memmap 기반 양자화 Flat 벡터 스냅샷 (읽기 전용)"""
+
+    # 행렬곱 블록당 float32 변환 임시 메모리 상한 (bytes)
+    # 1536차원 기준 약 5.4k 행 (양자화로 줄인 메모리를 블록 변환이 상쇄하지 않도록)
+    BLOCK_BYTES = 32 * 1024 * 1024
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+        with open(self.path / "manifest.json") as f:
+            self.manifest = json.load(f)
+
+        self.dtype = self.manifest["dtype"]
+        self.dimension = self.manifest["dimension"]
+        self.count = self.manifest["count"]
+        self.metric = self.manifest["metric"]
+
+        self.vectors = np.load(self.path / "vectors.q.npy", mmap_mode="r")
+        self.norms = np.load(self.path / "norms.npy", mmap_mode="r")
+        self.scales = (
+            np.load(self.path / "scales.npy", mmap_mode="r")
+            if self.dtype == "int8" else None
+        )
+
+        f32_path = self.path / "vectors.f32.npy"
+        self.vectors_f32 = np.load(f32_path, mmap_mode="r") if f32_path.exists() else None
+
+        with open(self.path / "metadata.jsonl") as f:
+            self.metadata: List[Dict[str, Any]] = [json.loads(line) for line in f]
+
+        self._columns: Dict[str, np.ndarray] = {}
+        self.block_rows = max(1, self.BLOCK_BYTES // (max(self.dimension, 1) * 4))
+
+    # ------------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def write(
+        cls,
+        path: Union[str, Path],
+        embeddings: List[np.ndarray],
+        metadata: List[Dict[str, Any]],
+        dtype: str = "int8",
+        metric: str = "cosine",
+        keep_float32: bool = True,
+        dimension: Optional[int] = None
+    ) -> "FlatVectorSnapshot":
+        """
+        임베딩을 양자화 스냅샷으로 기록
+
+        Args:
+            path: 스냅샷 디렉토리
+            embeddings: 임베딩 벡터 리스트
+            metadata: 각 임베딩의 메타데이터
+            dtype: 양자화 dtype ("int8" | "float16")
+            metric: "cosine" | "dot_product"
+            keep_float32: 재채점용 float32 원본 저장 여부
+            dimension: 임베딩 차원 (embeddings가 비어 있을 때 manifest에 기록, 생략 시 0)
+
+        Returns:
+            기록한 스냅샷 (memmap으로 열린 상태)
+        """
+        if dtype not in SNAPSHOT_DTYPES:
+            raise ValueError(f"Unsupported snapshot dtype: {dtype}")
+        if metric not in ("cosine", "dot_product"):
+            raise ValueError(f"Unsupported metric: {metric}")
+        if len(embeddings) != len(metadata):
+            raise ValueError("embeddings와 metadata 길이 불일치")
+        if embeddings and dimension is not None and len(embeddings[0]) != dimension:
+            raise ValueError(f"embedding 차원 불일치: {len(embeddings[0])} != {dimension}")
+
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        if embeddings:
+            matrix = np.asarray(np.stack(embeddings), dtype=np.float32)
+        else:
+            # 빈 스냅샷: 검색 시 쿼리마다 빈 결과
+            matrix = np.zeros((0, dimension or 0), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1).astype(np.float32)
+        unit = matrix / np.maximum(norms, 1e-12)[:, None]
+
+        if dtype == "int8":
+            # 행별 대칭 양자화: q = round(v / max|v| * 127)
+            scales = np.maximum(np.abs(unit).max(axis=1), 1e-12).astype(np.float32)
+            quantized = np.round(unit / scales[:, None] * 127).astype(np.int8)
+            np.save(path / "scales.npy", scales / 127)
+        else:
+            quantized = unit.astype(np.float16)
+
+        np.save(path / "vectors.q.npy", quantized)
+        np.save(path / "norms.npy", norms)
+        if keep_float32:
+            np.save(path / "vectors.f32.npy", matrix)
+
+        with open(path / "metadata.jsonl", "w") as f:
+            for meta in metadata:
+                f.write(json.dumps(meta) + "\n")
+
+        with open(path / "manifest.json", "w") as f:
+            json.dump({
+                "dtype": dtype,
+                "dimension": int(matrix.shape[1]),
+                "count": int(matrix.shape[0]),
+                "metric": metric,
+                "has_float32": keep_float32
+            }, f)
+
+        print(f"✅ Vector snapshot written: {path} ({matrix.shape[0]} x {matrix.shape[1]}, {dtype})")
+        return cls(path)
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "FlatVectorSnapshot":
+        """기존 스냅샷을 memmap으로 열기"""
+        return cls(Path(path))
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+
+    def _column(self, key: str) -> np.ndarray:
+        """메타데이터 필드를 필터용 배열로 캐싱"""
+        if key not in self._columns:
+            self._columns[key] = np.array([meta.get(key) for meta in self.metadata], dtype=object)
+        return self._columns[key]
+
+    def _filter_mask(self, filter_dict: Dict[str, Any]) -> np.ndarray:
+        mask = np.ones(self.count, dtype=bool)
+        for key, value in filter_dict.items():
+            column = self._column(key)
+            if isinstance(value, (list, tuple, set)):
+                mask &= np.isin(column, list(value))
+            else:
+                mask &= column == value
+        return mask
+
+    def _block_scores(self, start: int, end: int, queries: np.ndarray) -> np.ndarray:
+        """[start, end) 행 블록의 근사 코사인 점수 (rows x queries)"""
+        block = np.asarray(self.vectors[start:end], dtype=np.float32)
+        scores = block @ queries.T
+        if self.scales is not None:
+            scores *= np.asarray(self.scales[start:end])[:, None]
+        return scores
+
+    def search(
+        self,
+        queries: Union[np.ndarray, List[np.ndarray]],
+        k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        rescore: bool = True,
+        rescore_factor: int = 4
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        배치 정확 검색
+
+        Args:
+            queries: 쿼리 벡터 (n_queries x dim) 또는 벡터 리스트
+            k: 쿼리당 반환할 결과 수
+            filter_dict: 메타데이터 필터 (값이 리스트이면 IN 조건)
+            rescore: 상위 후보를 float32 원본으로 재채점
+            rescore_factor: 재채점 후보 수 = k * rescore_factor
+
+        Returns:
+            쿼리 순서와 정렬된 결과 리스트
+            [[{"score": ..., "metadata": {...}, "row": ...}, ...], ...]
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        query_norms = np.maximum(np.linalg.norm(queries, axis=1), 1e-12)
+        unit_queries = queries / query_norms[:, None]
+
+        mask = self._filter_mask(filter_dict) if filter_dict else None
+        can_rescore = rescore and self.vectors_f32 is not None
+        candidates_k = k * rescore_factor if can_rescore else k
+
+        n_queries = queries.shape[0]
+        best_rows = [np.empty(0, dtype=np.int64) for _ in range(n_queries)]
+        best_scores = [np.empty(0, dtype=np.float32) for _ in range(n_queries)]
+
+        for start in range(0, self.count, self.block_rows):
+            end = min(start + self.block_rows, self.count)
+            scores = self._block_scores(start, end, unit_queries)
+
+            if self.metric == "dot_product":
+                scores *= np.asarray(self.norms[start:end])[:, None]
+            if mask is not None:
+                scores[~mask[start:end]] = -np.inf
+
+            take = min(candidates_k, end - start)
+            top = np.argpartition(-scores, take - 1, axis=0)[:take]
+
+            # 블록 후보와 기존 후보 병합
+            for q in range(n_queries):
+                rows = np.concatenate([best_rows[q], top[:, q] + start])
+                merged = np.concatenate([best_scores[q], scores[top[:, q], q]])
+                keep = np.argpartition(-merged, min(candidates_k, len(merged)) - 1)[:candidates_k]
+                best_rows[q], best_scores[q] = rows[keep], merged[keep]
+
+        results = []
+        for q in range(n_queries):
+            rows, scores = best_rows[q], best_scores[q]
+            valid = np.isfinite(scores)
+            rows, scores = rows[valid], scores[valid]
+
+            if can_rescore and len(rows):
+                scores = self._rescore(rows, unit_queries[q])
+
+            order = np.argsort(-scores)[:k]
+            if self.metric == "dot_product":
+                scale = query_norms[q]
+            else:
+                scale = 1.0
+
+            results.append([
+                {
+                    "score": float(scores[i] * scale),
+                    "metadata": self.metadata[int(rows[i])],
+                    "row": int(rows[i])
+                }
+                for i in order
+            ])
+
+        return results
+
+    def _rescore(self, rows: np.ndarray, unit_query: np.ndarray) -> np.ndarray:
+        """후보 행만 float32 원본에서 읽어 정확 점수 계산"""
+        order = np.argsort(rows)
+        sorted_rows = rows[order]
+        vectors = np.asarray(self.vectors_f32[sorted_rows], dtype=np.float32)
+        norms = np.asarray(self.norms[sorted_rows])
+
+        exact = vectors @ unit_query
+        if self.metric == "cosine":
+            exact /= np.maximum(norms, 1e-12)
+
+        scores = np.empty_like(exact)
+        scores[order] = exact
+        return scores
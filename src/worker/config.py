@@ -25,9 +25,12 @@ class EmbeddingConfig:
                 'provider': 'bedrock' | 'openai',
                 'model_id': str,
                 'region': str (Bedrock 전용),
-                'api_key': str (OpenAI 전용)
+                'api_key': str (OpenAI 전용),
+                'dimensions': int | None (출력 차원, None이면 모델 기본 차원)
             }
         """
+        dimensions = int(os.environ.get('EMBEDDING_DIMENSIONS') or 0) or None
+
         use_bedrock = os.environ.get('USE_BEDROCK', 'false').lower() == 'true'
 
         if use_bedrock:
@@ -38,14 +41,90 @@ class EmbeddingConfig:
                     'amazon.titan-embed-text-v1'
                 ),
                 'region': os.environ.get('AWS_REGION', 'us-east-1'),
-                's3_cache_bucket': os.environ.get('S3_EMBEDDING_CACHE_BUCKET')
+                's3_cache_bucket': os.environ.get('S3_EMBEDDING_CACHE_BUCKET'),
+                'dimensions': dimensions
             }
         else:
             return {
                 'provider': 'openai',
                 'api_key': os.environ.get('OPENAI_API_KEY'),
-                'model': os.environ.get('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
+                'model': os.environ.get('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small'),
+                'dimensions': dimensions
+            }
+
+    @staticmethod
+    def get_rate_limits(provider: str) -> Dict[str, int]:
+        """provider별 임베딩 동시성/레이트 리밋 설정
+
+        기본값은 각 provider의 기본 쿼터 기준이며, 계정 쿼터에 맞게
+        환경변수로 조정합니다.
+
+        Returns:
+            {
+                'max_concurrency': int,
+                'requests_per_minute': int,
+                'tokens_per_minute': int,
+                'batch_size': int,
+                'max_retries': int
             }
+        """
+        if provider == 'bedrock':
+            # Titan Embeddings v1은 요청당 텍스트 1개만 지원
+            defaults = {'rpm': 2000, 'tpm': 300000, 'batch_size': 1}
+        else:
+            defaults = {'rpm': 3000, 'tpm': 1000000, 'batch_size': 64}
+
+        return {
+            'max_concurrency': int(os.environ.get('EMBEDDING_MAX_CONCURRENCY') or 8),
+            'requests_per_minute': int(os.environ.get('EMBEDDING_RPM_LIMIT') or defaults['rpm']),
+            'tokens_per_minute': int(os.environ.get('EMBEDDING_TPM_LIMIT') or defaults['tpm']),
+            'batch_size': int(os.environ.get('EMBEDDING_BATCH_SIZE') or defaults['batch_size']),
+            'max_retries': int(os.environ.get('EMBEDDING_MAX_RETRIES') or 5)
+        }
+
+    @staticmethod
+    def get_retry_settings() -> Dict[str, float]:
+        """실패 임베딩 지연 재시도 설정 (스테이지 종료 시 배치 재시도)
+
+        Returns:
+            {
+                'max_rounds': int,
+                'base_delay': float
+            }
+        """
+        return {
+            'max_rounds': int(os.environ.get('EMBEDDING_RETRY_ROUNDS') or 3),
+            'base_delay': float(os.environ.get('EMBEDDING_RETRY_DELAY') or 5.0)
+        }
+
+    @staticmethod
+    def get_cache_settings() -> Dict[str, Any]:
+        """계층형 임베딩 캐시 설정 (메모리 LRU → 로컬 디스크 → S3)
+
+        Returns:
+            {
+                'enabled': bool,
+                'lru_size': int,
+                'local_dir': str,
+                's3_layout': 'shard' | 'object',
+                'shard_dtype': 'float32' | 'float16',
+                'shard_read_legacy': bool,
+                'query_embedding_cache_size': int,
+                'query_result_cache_size': int,
+                'alias_cache_ttl_seconds': float
+            }
+        """
+        return {
+            'enabled': os.environ.get('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true',
+            'lru_size': int(os.environ.get('EMBEDDING_LRU_SIZE') or 50000),
+            'local_dir': os.environ.get('EMBEDDING_CACHE_DIR') or '/tmp/embedding_cache',
+            's3_layout': os.environ.get('EMBEDDING_S3_CACHE_LAYOUT') or 'shard',
+            'shard_dtype': os.environ.get('EMBEDDING_SHARD_DTYPE') or 'float32',
+            'shard_read_legacy': os.environ.get('EMBEDDING_SHARD_READ_LEGACY', 'false').lower() == 'true',
+            'query_embedding_cache_size': int(os.environ.get('QUERY_EMBEDDING_CACHE_SIZE') or 1024),
+            'query_result_cache_size': int(os.environ.get('QUERY_RESULT_CACHE_SIZE') or 4096),
+            'alias_cache_ttl_seconds': float(os.environ.get('INDEX_ALIAS_CACHE_TTL_SECONDS') or 30)
+        }
 
     @staticmethod
     def is_bedrock_enabled() -> bool:
@@ -53,6 +132,116 @@ class EmbeddingConfig:
         return os.environ.get('USE_BEDROCK', 'false').lower() == 'true'
 
 
+class VectorIndexConfig:
+    """OpenSearch 벡터 인덱스 설정"""
+
+    @staticmethod
+    def get_bulk_settings() -> Dict[str, int]:
+        """스트리밍 bulk 인덱싱 설정
+
+        Returns:
+            {
+                'max_chunk_bytes': int,
+                'max_chunk_docs': int,
+                'thread_count': int,
+                'max_retries': int
+            }
+        """
+        return {
+            'max_chunk_bytes': int(os.environ.get('OPENSEARCH_BULK_MAX_BYTES') or 10 * 1024 * 1024),
+            'max_chunk_docs': int(os.environ.get('OPENSEARCH_BULK_MAX_DOCS') or 2000),
+            'thread_count': int(os.environ.get('OPENSEARCH_BULK_THREADS') or 4),
+            'max_retries': int(os.environ.get('OPENSEARCH_BULK_MAX_RETRIES') or 3)
+        }
+
+
+class GitAnalysisConfig:
+    """Git 기여도 분석 설정"""
+
+    @staticmethod
+    def get_contribution_index_settings() -> Dict[str, Any]:
+        """전체 저자 기여도 인덱스 설정 (HEAD 커밋 단위 캐시)
+
+        인덱스 빌드는 전체 히스토리 blob fetch + 전체 텍스트 파일 blame이 필요하므로
+        기본값은 비활성화입니다 (같은 저장소의 여러 사용자를 분석하는 배치용).
+
+        Returns:
+            {
+                'enabled': bool,
+                'cache_dir': str
+            }
+        """
+        return {
+            'enabled': os.environ.get('CONTRIBUTION_INDEX_ENABLED', 'false').lower() == 'true',
+            'cache_dir': os.environ.get('CONTRIBUTION_INDEX_CACHE_DIR') or '/tmp/contribution_index'
+        }
+
+    @staticmethod
+    def get_clone_settings() -> Dict[str, Any]:
+        """저장소 클론 전략 설정
+
+        Returns:
+            {
+                'filter': str | None,      # partial clone 필터 (빈 값이면 전체 클론)
+                'sparse_checkout': bool    # 지원 언어 확장자만 작업 트리에 체크아웃
+            }
+        """
+        return {
+            'filter': os.environ.get('GIT_CLONE_FILTER', 'blob:none') or None,
+            'sparse_checkout': os.environ.get('GIT_SPARSE_CHECKOUT', 'false').lower() == 'true'
+        }
+
+    @staticmethod
+    def get_mirror_cache_settings() -> Dict[str, Any]:
+        """bare 미러 저장소 캐시 설정
+
+        Returns:
+            {
+                'enabled': bool,
+                'cache_dir': str,
+                'max_size_bytes': int
+            }
+        """
+        return {
+            'enabled': os.environ.get('GIT_MIRROR_CACHE_ENABLED', 'false').lower() == 'true',
+            'cache_dir': os.environ.get('GIT_MIRROR_CACHE_DIR') or '/tmp/git_mirrors',
+            'max_size_bytes': int(os.environ.get('GIT_MIRROR_CACHE_MAX_BYTES') or 20 * 1024 ** 3)
+        }
+
+    @staticmethod
+    def get_commit_store_settings() -> Dict[str, Any]:
+        """커밋 numstat 저장소 설정 (재분석 시 새 커밋만 처리)
+
+        첫 동기화는 모든 저자의 전체 히스토리 blob을 받으므로 (blob:none 클론 이점 상실)
+        기본 비활성화. db_path가 실행 간 유지되는 영구 볼륨 (예: EFS)일 때만 활성화합니다.
+
+        Returns:
+            {
+                'enabled': bool,
+                'db_path': str
+            }
+        """
+        return {
+            'enabled': os.environ.get('COMMIT_STORE_ENABLED', 'false').lower() == 'true',
+            'db_path': os.environ.get('COMMIT_STORE_PATH') or '/tmp/commit_stats.sqlite3'
+        }
+
+    @staticmethod
+    def get_blame_settings() -> Dict[str, Any]:
+        """병렬 blame 엔진 설정
+
+        Returns:
+            {
+                'max_workers': int,
+                'cache_dir': str
+            }
+        """
+        return {
+            'max_workers': int(os.environ.get('BLAME_MAX_WORKERS') or os.cpu_count() or 4),
+            'cache_dir': os.environ.get('BLAME_CACHE_DIR') or '/tmp/blame_cache'
+        }
+
+
 class LLMConfig:
     """LLM 호출 설정
 
@@ -9,7 +9,7 @@ PDD v4.0 업데이트:
 - config.py 통합
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import time
 import json
 
@@ -58,6 +58,15 @@ class IL3Agent(ABC):
         """
         pass
 
+    def prefetch(self, file_paths: List[str]) -> None:
+        """
+        여러 파일 분석 전 벡터 검색 등을 배치로 미리 수행합니다 (선택 구현).
+
+        수백 개 파일을 처리하는 스테이지에서 파일별 왕복 대신
+        몇 번의 배치 요청으로 필요한 검색 결과를 준비합니다.
+        """
+        return None
+
     def execute(self, file_path: str, context: Dict[str, Any] = None) -> L3AgentOutput:
         """
         분석을 실행하고 표준 Event Envelope 형식으로 반환합니다.
@@ -117,6 +126,31 @@ class IL3Agent(ABC):
                 }
             )
 
+    def execute_batch(
+        self,
+        file_paths: List[str],
+        contexts: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> List[L3AgentOutput]:
+        """
+        스테이지 단위 실행: prefetch() 후 파일별 execute()를 순서대로 수행합니다.
+
+        Args:
+            file_paths: L2-Filter를 통과한 분석 대상 파일 목록
+            contexts: 파일 경로 → L3-Tool 결과물 등 컨텍스트 정보
+
+        Returns:
+            파일 순서대로의 L3AgentOutput 목록
+        """
+        contexts = contexts or {}
+
+        try:
+            self.prefetch(file_paths)
+        except Exception as e:
+            # prefetch는 최적화일 뿐이므로 실패해도 파일별 조회로 진행
+            print(f"⚠️  {self.agent_name} prefetch failed: {e}")
+
+        return [self.execute(file_path, contexts.get(file_path)) for file_path in file_paths]
+
     @abstractmethod
     def get_version(self) -> str:
         """에이전트 버전 반환"""
@@ -167,6 +201,59 @@ class IL3Agent(ABC):
         except Exception as e:
             raise AgentExecutionError(f"Vector 쿼리 실패: {e}")
 
+    def query_vector_batch(self, query_texts: List[str], k: int = 5, filters: Dict = None) -> List[Any]:
+        """
+        OpenSearch Vector-RAG 배치 쿼리 (임베딩 배치 1회 + _msearch)
+
+        Returns:
+            query_texts 순서와 정렬된 검색 결과 리스트
+        """
+        if not self.vector_service:
+            raise AgentExecutionError("Vector service가 주입되지 않음")
+
+        try:
+            return self.vector_service.batch_query(query_texts, k=k, filter_dict=filters)
+        except Exception as e:
+            raise AgentExecutionError(f"Vector 배치 쿼리 실패: {e}")
+
+    def query_similar_batch(self, file_paths: List[str], k: int = 5, filters: Dict = None) -> List[Any]:
+        """
+        저장된 벡터 기반 유사 코드 배치 검색 (벡터 조회 1회 + _msearch)
+
+        Returns:
+            file_paths 순서와 정렬된 검색 결과 리스트
+        """
+        if not self.vector_service:
+            raise AgentExecutionError("Vector service가 주입되지 않음")
+
+        try:
+            return self.vector_service.batch_search_similar(file_paths, k=k, filter_dict=filters)
+        except Exception as e:
+            raise AgentExecutionError(f"Vector 유사 배치 검색 실패: {e}")
+
+    def query_similar(self, file_path: str, k: int = 5, filters: Dict = None) -> Any:
+        """
+        저장된 벡터 기반 유사 코드 검색 (도구로 사용)
+
+        쿼리 임베딩 없이 인덱스에 저장된 파일 청크 벡터의 centroid로 검색하며,
+        파일 자신의 청크는 결과에서 제외됩니다.
+
+        Args:
+            file_path: 기준 파일 경로
+            k: 반환할 결과 수
+            filters: 메타데이터 필터
+
+        Returns:
+            유사 코드 블록 검색 결과
+        """
+        if not self.vector_service:
+            raise AgentExecutionError("Vector service가 주입되지 않음")
+
+        try:
+            return self.vector_service.search_similar(file_path=file_path, k=k, filter_dict=filters)
+        except Exception as e:
+            raise AgentExecutionError(f"Vector 유사 검색 실패: {e}")
+
     def invoke_llm(self, prompt: str, system_prompt: Optional[str] = None) -> Dict[str, Any]:
         """
         LLM 호출 (환경변수 기반 자동 provider 선택)
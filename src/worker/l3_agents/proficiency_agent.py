@@ -4,7 +4,7 @@ Proficiency Agent: 코드 숙련도 평가 (PDD v4.0 핵심)
 Graph-RAG + Vector-RAG + LLM을 통합하여
 개발자의 코드 작성 수준을 심층 분석합니다.
 """
-from typing import Dict, Any
+from typing import Dict, Any, List
 from pathlib import Path
 
 from .base_agent import IL3Agent, AgentExecutionError
@@ -38,6 +38,18 @@ class ProficiencyAgent(IL3Agent):
             vector_service=vector_service,
             llm_client=llm_client
         )
+        # prefetch()로 미리 조회한 파일별 유사 코드 검색 결과
+        self._similar_code_cache: Dict[str, List[Dict[str, Any]]] = {}
+
+    def prefetch(self, file_paths: List[str]) -> None:
+        """분석 대상 파일들의 유사 코드 검색을 배치로 미리 수행"""
+        try:
+            results = self.query_similar_batch(file_paths, k=5)
+        except AgentExecutionError as e:
+            print(f"⚠️  Vector prefetch failed, falling back to per-file queries: {e}")
+            return
+
+        self._similar_code_cache.update(zip(file_paths, results))
 
     def analyze(self, file_path: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -175,15 +187,15 @@ class ProficiencyAgent(IL3Agent):
         - 유사 코드 패턴 찾기
         - 알고리즘 효율성 비교
         - 베스트 프랙티스 참조
-        """
-        file_name = Path(file_path).name
-
-        # 자연어 쿼리: "이 파일과 유사한 알고리즘 패턴"
-        query_text = f"Similar code patterns and algorithms for {file_name}"
 
+        파일명 템플릿 쿼리 대신 파일에 이미 저장된 청크 벡터로 검색하므로
+        쿼리 임베딩 호출이 없고, 실제 코드 내용 기준으로 유사 코드를 찾습니다.
+        """
         try:
-            # Vector 검색 (상위 5개)
-            similar_codes = self.query_vector(query_text, k=5)
+            # 저장된 벡터 기반 유사 검색 (상위 5개, 자기 자신 제외)
+            similar_codes = self._similar_code_cache.pop(file_path, None)
+            if similar_codes is None:
+                similar_codes = self.query_similar(file_path, k=5)
 
             if not similar_codes or len(similar_codes) == 0:
                 return {
@@ -10,6 +10,10 @@ from sqlalchemy.orm import sessionmaker
 
 from celery_app import celery_app
 from analysis import GitAnalyzer
+from analysis.blame_engine import BlameEngine
+from analysis.commit_store import CommitStatsStore
+from analysis.repo_cache import RepositoryMirrorCache
+from config import GitAnalysisConfig
 
 # Shared 모듈에서 공통 모델 import
 from shared.models import Analysis, AnalysisState, utc_now
@@ -44,6 +48,7 @@ def analyze_repository(
     print(f"[Task {self.request.id}] Analysis started for {repo_url}")
     db = SessionLocal()
     analyzer = None
+    commit_store = None
 
     try:
         # 1. DB에서 Analysis 레코드 조회 및 상태 업데이트
@@ -57,12 +62,40 @@ def analyze_repository(
         self.update_state(state='PROGRESS', meta={'status': 'Cloning repository...'})
 
         # 2. GitAnalyzer로 분석 수행
-        analyzer = GitAnalyzer()
-        repo_path = analyzer.clone_repository(repo_url, branch)
+        index_settings = GitAnalysisConfig.get_contribution_index_settings()
+        mirror_settings = GitAnalysisConfig.get_mirror_cache_settings()
+        mirror_cache = None
+        if mirror_settings['enabled']:
+            mirror_cache = RepositoryMirrorCache(
+                mirror_settings['cache_dir'],
+                max_size_bytes=mirror_settings['max_size_bytes']
+            )
+        store_settings = GitAnalysisConfig.get_commit_store_settings()
+        if store_settings['enabled']:
+            commit_store = CommitStatsStore(store_settings['db_path'])
+        analyzer = GitAnalyzer(
+            contribution_cache_dir=index_settings['cache_dir'],
+            blame_engine=BlameEngine(**GitAnalysisConfig.get_blame_settings()),
+            mirror_cache=mirror_cache,
+            commit_store=commit_store
+        )
+        clone_settings = GitAnalysisConfig.get_clone_settings()
+        sparse_extensions = None
+        if clone_settings['sparse_checkout']:
+            from analysis.graph_loader import GraphLoader
+            sparse_extensions = GraphLoader.LANGUAGE_PARSERS.keys()
+        repo_path = analyzer.clone_repository(
+            repo_url,
+            branch,
+            clone_filter=clone_settings['filter'],
+            sparse_extensions=sparse_extensions
+        )
 
         self.update_state(state='PROGRESS', meta={'status': 'Analyzing contributions...'})
 
-        stats = analyzer.analyze_contributions(repo_path, target_user)
+        stats = analyzer.analyze_contributions(
+            repo_path, target_user, use_index=index_settings['enabled']
+        )
 
         # 3. 분석 결과를 DB에 저장
         analysis.status = AnalysisState.COMPLETED
@@ -111,6 +144,8 @@ def analyze_repository(
         # 정리
         if analyzer:
             analyzer.cleanup()
+        if commit_store:
+            commit_store.close()
         if db:
             db.close()
 